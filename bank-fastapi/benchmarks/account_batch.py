@@ -0,0 +1,91 @@
+"""
+Benchmark de criação de contas em massa (onboarding de um banco parceiro).
+
+Cria ``--accounts`` contas de quatro formas e reporta contas por segundo:
+
+- ``legacy``: o fluxo anterior de ``AccountService.create``, INSERT seguido de um SELECT, uma transação por conta;
+- ``single``: ``AccountService.create`` atual, uma transação por conta com ``INSERT ... RETURNING``;
+- ``batch``: ``AccountService.create_many`` em lotes de ``--batch-size``, INSERT multi-linha por bloco;
+- ``http``: ``POST /accounts/batch`` em lotes de ``--batch-size``, com validação e serialização da API.
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=sqlite:///./bench.db ENVIRONMENT=development \
+        python -m benchmarks.account_batch --accounts 20000 --batch-size 1000
+"""
+import argparse
+import asyncio
+import time
+
+from src.database import database, engine, metadata
+from src.models.account import accounts
+from src.schemas.account import AccountIn
+from src.services.account import AccountService
+
+
+class LegacyAccountService(AccountService):
+    @database.transaction()
+    async def create(self, account: AccountIn):
+        command = accounts.insert().values(user_id=account.user_id, balance=account.balance)
+        account_id = await database.execute(command)
+
+        query = accounts.select().where(accounts.c.id == account_id)
+        created = await database.fetch_one(query)
+        await self.balance_service.record([(created.id, created.created_at, created.balance)])
+        return created
+
+
+async def run_http(items: list[AccountIn], batch_size: int) -> int:
+    from httpx import ASGITransport, AsyncClient
+
+    from src.main import app
+
+    payloads = [item.model_dump(mode="json") for item in items]
+    created = 0
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        token = (await client.post("/auth/login", json={"user_id": 1})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for start in range(0, len(payloads), batch_size):
+            response = await client.post("/accounts/batch", json=payloads[start : start + batch_size], headers=headers)
+            assert response.status_code == 201, response.text
+            created += len(response.json())
+    return created
+
+
+async def main(args: argparse.Namespace) -> None:
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        items = [AccountIn(user_id=index % 1000 + 1, balance=100.0) for index in range(args.accounts)]
+        service = AccountService()
+
+        async def one_by_one(service: AccountService) -> int:
+            return len([await service.create(item) for item in items])
+
+        async def in_batches() -> int:
+            created = 0
+            for start in range(0, len(items), args.batch_size):
+                created += len(await service.create_many(items[start : start + args.batch_size]))
+            return created
+
+        runs = {
+            "legacy": lambda: one_by_one(LegacyAccountService()),
+            "single": lambda: one_by_one(service),
+            "batch": in_batches,
+            "http": lambda: run_http(items, args.batch_size),
+        }
+        print(f"{database.url.dialect} accounts={args.accounts} batch_size={args.batch_size}")
+        for name, run in runs.items():
+            start = time.perf_counter()
+            created = await run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<8} created={created} elapsed={elapsed:.3f}s accounts/s={created / elapsed:,.0f}")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""
+Benchmark do resumo de conta (``GET /accounts/{id}/summary``) sobre contas com milhões de transações.
+
+Gera ``--rows`` transações para uma conta (e outras tantas para uma conta vizinha), distribuídas ao longo de
+``--days`` dias, direto no banco. Mede o tempo de ``TransactionService.summarize`` (mediana de ``--repeat``
+execuções) nos totais de todo o histórico, por mês em todo o histórico e por dia nos últimos 30 dias, e
+compara com o caminho anterior: trazer as transações para a aplicação e agregar em Python.
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=postgresql://postgres@127.0.0.1:5432/bank ENVIRONMENT=production \
+        python -m benchmarks.account_summary --rows 1000000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+
+from src.database import database, engine, metadata
+from src.models.account import accounts
+from src.services.transaction import TransactionService
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+POSTGRES_SEED = """
+INSERT INTO transactions (account_id, type, amount, timestamp)
+SELECT :account_id,
+       (CASE WHEN g % 3 = 0 THEN 'WITHDRAWAL' ELSE 'DEPOSIT' END)::transaction_types,
+       100 + g % 10000,
+       :start + g * :step * interval '1 second'
+FROM generate_series(1, :rows) AS g
+"""
+
+SQLITE_SEED = """
+WITH RECURSIVE g(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM g WHERE n < :rows)
+INSERT INTO transactions (account_id, type, amount, timestamp)
+SELECT :account_id,
+       CASE WHEN n % 3 = 0 THEN 'WITHDRAWAL' ELSE 'DEPOSIT' END,
+       100 + n % 10000,
+       datetime(:start, '+' || CAST(n * :step AS INTEGER) || ' seconds')
+FROM g
+"""
+
+
+def seed(rows: int, days: int) -> int:
+    step = days * 86400 / rows
+    with engine.begin() as connection:
+        account_ids = [
+            connection.execute(accounts.insert().values(user_id=1, balance=0).returning(accounts.c.id)).scalar_one()
+            for _ in range(2)
+        ]
+        if engine.dialect.name == "postgresql":
+            statement, start = POSTGRES_SEED, START
+        else:
+            statement, start = SQLITE_SEED, START.strftime("%Y-%m-%d %H:%M:%S")
+        for account_id in account_ids:
+            parameters = {"account_id": account_id, "rows": rows, "start": start, "step": step}
+            connection.execute(sa.text(statement), parameters)
+    # Index-only scans on Postgres need the visibility map that VACUUM builds
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(sa.text("VACUUM ANALYZE transactions" if engine.dialect.name == "postgresql" else "ANALYZE"))
+    return account_ids[0]
+
+
+async def aggregate_in_python(service: TransactionService, account_id: int, start, end, bucket) -> dict:
+    totals: dict = {}
+    async for row in service.iterate(account_id=account_id, start=start, end=end):
+        key = (row.type, row.timestamp.date() if bucket else None)
+        count, total = totals.get(key, (0, 0))
+        totals[key] = (count + 1, total + row.amount)
+    return totals
+
+
+async def main(args: argparse.Namespace) -> None:
+    metadata.create_all(engine)
+    start = time.perf_counter()
+    account_id = seed(args.rows, args.days)
+    print(f"seeded {2 * args.rows:,} transactions in {time.perf_counter() - start:.1f}s ({engine.dialect.name})")
+
+    await database.connect()
+    try:
+        service = TransactionService()
+        end = START + timedelta(days=args.days)
+        cases = [
+            ("totals, all history", None, None, None),
+            ("by month, all history", None, None, "month"),
+            ("by day, last 30 days", end - timedelta(days=30), end, "day"),
+        ]
+        print(f"{'query':<24} {'rows':>10} {'summary ms':>11} {'python ms':>11}")
+        for name, since, until, bucket in cases:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                summary = await service.summarize(account_id, start=since, end=until, bucket=bucket)
+                timings.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await aggregate_in_python(service, account_id, since, until, bucket)
+            python = time.perf_counter() - started
+            count = summary["totals"]["count"]
+            print(f"{name:<24} {count:>10,} {statistics.median(timings) * 1000:>11,.1f} {python * 1000:>11,.0f}")
+        assert summary["totals"]["deposits"] + summary["totals"]["withdrawals"] == count
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""
+Benchmark de conta quente: depósitos concorrentes em uma única conta (um lojista recebendo pagamentos).
+
+Compara ``TransactionService.create`` chamado diretamente (uma transação do banco por depósito, todas
+disputando a mesma linha) com ``TransactionScheduler.submit``, que serializa a conta no processo e aplica
+as rajadas em uma única transação. Reporta vazão, erros, tamanho médio dos grupos e se o saldo final bate
+com as transações gravadas.
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=sqlite:///./bench.db ENVIRONMENT=development \
+        python -m benchmarks.hot_account --operations 5000 --concurrency 100
+"""
+import argparse
+import asyncio
+import time
+
+import sqlalchemy as sa
+
+from src.config import settings
+from src.database import database, engine, metadata
+from src.models.account import accounts
+from src.models.transaction import transactions
+from src.schemas.transaction import TransactionIn
+from src.services.scheduler import TransactionScheduler, coalesced_transactions
+from src.services.transaction import TransactionService
+
+
+async def run(name: str, create, operations: int, concurrency: int) -> None:
+    account_id = await database.execute(accounts.insert().values(user_id=1, balance=1))
+    transaction = TransactionIn(account_id=account_id, type="deposit", amount=1.0)
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+    groups = (coalesced_transactions.count(), coalesced_transactions.sum())
+
+    async def deposit() -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                await create(transaction)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(deposit() for _ in range(operations)))
+    elapsed = time.perf_counter() - start
+
+    balance = await database.fetch_val(
+        accounts.select().with_only_columns(accounts.c.balance).where(accounts.c.id == account_id)
+    )
+    count = await database.fetch_val(
+        sa.select(sa.func.count()).select_from(transactions).where(transactions.c.account_id == account_id)
+    )
+    batches = coalesced_transactions.count() - groups[0]
+    group_size = (coalesced_transactions.sum() - groups[1]) / batches if batches else 1
+    print(
+        f"{name:<9} ops={operations} concurrency={concurrency} elapsed={elapsed:.3f}s "
+        f"rps={operations / elapsed:,.0f} errors={errors} rows={count} avg_group={group_size:.1f} "
+        f"consistent={balance == 1 + transaction.amount * count}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        service = TransactionService()
+        scheduler = TransactionScheduler(service, stripes=settings.transaction_lock_stripes, limit=args.limit)
+        await run("direct", service.create, args.operations, args.concurrency)
+        await run("scheduler", scheduler.submit, args.operations, args.concurrency)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=settings.transaction_coalesce_limit)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""
+Benchmark da serialização das listagens: Records validados em modelos pydantic pelo ``response_model`` x
+``RecordsJSON`` (colunas lidas por posição e JSON gerado em uma passada), por tamanho de página.
+
+Duas medições para cada tamanho de página (``--page-sizes``):
+
+- ``serialize``: só a CPU para transformar a página de transações já lida do banco no corpo da resposta. O
+  caminho pydantic é o que o FastAPI faz com o ``response_model`` (``serialize_response`` e ``JSONResponse``);
+- ``http``: ``GET /accounts/{id}/transactions`` completo pela aplicação no mesmo processo (``httpx.AsyncClient``),
+  com ``FAST_JSON_RESPONSES`` desligado e ligado, em requisições por segundo (mediana de ``--repeat``).
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=sqlite:///./bench.db ENVIRONMENT=development \
+        python -m benchmarks.json_responses --page-sizes 10 100 1000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.config import settings
+from src.database import database, engine, metadata
+from src.models.account import accounts
+from src.models.transaction import TransactionType, transactions
+from src.responses import RecordsJSON, orjson
+from src.services.transaction import TransactionService
+from src.views.account import TransactionOut
+
+
+async def measure_serialize(rows: list, calls: int) -> tuple[float, float]:
+    field = create_response_field(name="response", type_=list[TransactionOut], mode="serialization")
+    encoder = RecordsJSON(TransactionOut)
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        content = await serialize_response(field=field, response_content=rows, is_coroutine=True)
+        pydantic_body = JSONResponse(content).body
+    pydantic = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        fast_body = encoder.encode(rows)
+    fast = (time.perf_counter() - start) / calls
+
+    assert fast_body == pydantic_body
+    return pydantic, fast
+
+
+async def measure_http(account_id: int, page_size: int, calls: int, repeat: int) -> tuple[float, float]:
+    from httpx import AsyncClient
+
+    from src.main import app
+
+    rates = {False: [], True: []}
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        token = (await client.post("/auth/login", json={"user_id": 1})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"/accounts/{account_id}/transactions?limit={page_size}"
+        for _ in range(repeat):
+            for fast in rates:
+                settings.fast_json_responses = fast
+                start = time.perf_counter()
+                for _ in range(calls):
+                    response = await client.get(url, headers=headers)
+                    assert response.status_code == 200
+                rates[fast].append(calls / (time.perf_counter() - start))
+    settings.fast_json_responses = True
+    return statistics.median(rates[False]), statistics.median(rates[True])
+
+
+async def main(page_sizes: list[int], calls: int, repeat: int) -> None:
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        account_id = await database.execute(accounts.insert().values(user_id=1, balance=0))
+        rows = [
+            {"account_id": account_id, "type": TransactionType.DEPOSIT, "amount": amount}
+            for amount in range(1, max(page_sizes) + 1)
+        ]
+        await database.execute_many(transactions.insert(), rows)
+        service = TransactionService()
+
+        print(f"JSON encoder: {'orjson' if orjson is not None else 'json'}, banco: {database.url.dialect}")
+        print(
+            f"{'page size':>9} {'pydantic ms':>12} {'fast ms':>9} {'speedup':>8}"
+            f" {'pydantic req/s':>15} {'fast req/s':>11} {'gain':>7}"
+        )
+        for page_size in page_sizes:
+            page = await service.read_all(account_id=account_id, limit=page_size)
+            # Same work per size: fewer calls for bigger pages
+            size_calls = max(calls * 100 // page_size, 1)
+            pydantic, fast = await measure_serialize(page, size_calls)
+            pydantic_rate, fast_rate = await measure_http(account_id, page_size, max(size_calls // 10, 5), repeat)
+            print(
+                f"{page_size:>9} {pydantic * 1000:>12.3f} {fast * 1000:>9.3f} {pydantic / fast:>7.1f}x"
+                f" {pydantic_rate:>15,.0f} {fast_rate:>11,.0f} {fast_rate / pydantic_rate - 1:>6.0%}"
+            )
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.page_sizes, args.calls, args.repeat))
@@ -0,0 +1,44 @@
+"""
+Microbenchmark do custo de autenticação por requisição em JWTBearer.
+
+Mede o tempo médio de ``JWTBearer.__call__`` reutilizando o mesmo token, com o cache de tokens
+verificados desligado (jwt.decode + validação pydantic a cada chamada) e ligado.
+
+Uso:
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.jwt_auth --calls 50000
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.requests import Request
+
+from src.security import JWTBearer, sign_jwt, token_cache
+
+
+async def measure(calls: int, maxsize: int) -> float:
+    token = sign_jwt(user_id=1)["access_token"]
+    request = Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+    bearer = JWTBearer()
+    token_cache.clear()
+    token_cache.maxsize = maxsize
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        await bearer(request)
+    return (time.perf_counter() - start) / calls
+
+
+async def main(args: argparse.Namespace) -> None:
+    maxsize = token_cache.maxsize
+    uncached = await measure(args.calls, maxsize=0)
+    cached = await measure(args.calls, maxsize=maxsize)
+    print(f"uncached {uncached * 1e6:8.2f} us/request")
+    print(f"cached   {cached * 1e6:8.2f} us/request  ({uncached / cached:.1f}x)  {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,237 @@
+"""
+Teste de carga da API com um workload misto, rodando a aplicação no mesmo processo.
+
+A aplicação é servida por um ``httpx.AsyncClient`` com ``ASGITransport`` (lifespan incluso, então o banco é
+conectado como em produção). ``--concurrency`` clientes virtuais, cada um com o seu token, sorteiam operações
+conforme os pesos de ``--mix`` até completar ``--requests`` requisições (ou ``--duration`` segundos):
+
+- ``login``: ``POST /auth/login``
+- ``create_account``: ``POST /accounts/``
+- ``deposit`` / ``withdraw``: ``POST /transactions/`` em uma das ``--accounts`` contas pré-criadas
+- ``list_transactions``: ``GET /accounts/{id}/transactions``
+
+Para cada operação reporta a vazão, a latência p50/p95/p99 e as respostas por status. Com ``--output`` o
+resultado é gravado em JSON; ``--compare`` compara o resultado com um JSON de uma execução anterior.
+
+Uso (sem DATABASE_URL usa um SQLite local, ``loadtest.db``):
+
+    python -m benchmarks.load_test --requests 5000 --concurrency 50 --output results.json
+    python -m benchmarks.load_test --requests 5000 --concurrency 50 --compare results.json
+
+    DATABASE_URL=postgresql://postgres@127.0.0.1:5432/bank ENVIRONMENT=production \
+        python -m benchmarks.load_test --mix deposit=1 --accounts 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+OPERATIONS = ("login", "create_account", "deposit", "withdraw", "list_transactions")
+DEFAULT_MIX = "login=1,create_account=1,deposit=4,withdraw=2,list_transactions=2"
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: list[float], percent: float) -> float:
+    # Nearest rank on an already sorted list
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def summarize(latencies: list[float], statuses: Counter, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "statuses": dict(sorted(statuses.items())),
+    }
+    if latencies:
+        summary["mean_ms"] = round(sum(latencies) / len(latencies) * 1000, 3)
+        for percent in PERCENTILES:
+            summary[f"p{percent}_ms"] = round(percentile(latencies, percent) * 1000, 3)
+        summary["max_ms"] = round(latencies[-1] * 1000, 3)
+    return summary
+
+
+class VirtualUser:
+    def __init__(self, client, user_id: int, account_ids: list[int], rng: random.Random):
+        self.client = client
+        self.user_id = user_id
+        self.account_ids = account_ids
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+
+    async def login(self):
+        response = await self.client.post("/auth/login", json={"user_id": self.user_id})
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def create_account(self):
+        payload = {"user_id": self.user_id, "balance": 100.0}
+        return await self.client.post("/accounts/", json=payload, headers=self.headers)
+
+    async def deposit(self):
+        return await self.__transaction("deposit", self.rng.choice((10.0, 25.0, 50.0)))
+
+    async def withdraw(self):
+        return await self.__transaction("withdrawal", self.rng.choice((5.0, 20.0, 40.0)))
+
+    async def list_transactions(self):
+        account_id = self.rng.choice(self.account_ids)
+        return await self.client.get(f"/accounts/{account_id}/transactions?limit=20", headers=self.headers)
+
+    async def __transaction(self, type: str, amount: float):
+        payload = {"account_id": self.rng.choice(self.account_ids), "type": type, "amount": amount}
+        return await self.client.post("/transactions/", json=payload, headers=self.headers)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from httpx import ASGITransport, AsyncClient
+
+    from src.database import database, engine, metadata
+    from src.main import app
+    from src.models.account import accounts
+
+    metadata.create_all(engine)
+    names, weights = zip(*args.mix.items())
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    remaining = args.requests
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    async def virtual_user(user: VirtualUser) -> None:
+        nonlocal remaining
+        await user.login()
+        while remaining > 0 and (deadline is None or time.perf_counter() < deadline):
+            remaining -= 1
+            name = user.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = str((await getattr(user, name)()).status_code)
+            except Exception as exc:
+                status = type(exc).__name__
+            latencies[name].append(time.perf_counter() - start)
+            statuses[name][status] += 1
+
+    async with app.router.lifespan_context(app):
+        account_ids = [
+            await database.execute(accounts.insert().values(user_id=1, balance=100_000)) for _ in range(args.accounts)
+        ]
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            users = [
+                VirtualUser(client, user_id=index + 1, account_ids=account_ids, rng=random.Random(args.seed + index))
+                for index in range(args.concurrency)
+            ]
+            start = time.perf_counter()
+            await asyncio.gather(*(virtual_user(user) for user in users))
+            elapsed = time.perf_counter() - start
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": database.url.dialect,
+            "concurrency": args.concurrency,
+            "accounts": args.accounts,
+            "mix": args.mix,
+            "seed": args.seed,
+            "elapsed_s": round(elapsed, 3),
+        },
+        "total": summarize(all_latencies, sum(statuses.values(), Counter()), elapsed),
+        "endpoints": {name: summarize(latencies[name], statuses[name], elapsed) for name in sorted(latencies)},
+    }
+
+
+def print_report(result: dict) -> None:
+    meta = result["meta"]
+    print(
+        f"{meta['database']} concurrency={meta['concurrency']} accounts={meta['accounts']} "
+        f"elapsed={meta['elapsed_s']}s commit={meta['commit'] or '-'}"
+    )
+    print(f"{'operation':<18} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for name, summary in [*result["endpoints"].items(), ("total", result["total"])]:
+        statuses = " ".join(f"{code}={count}" for code, count in summary["statuses"].items())
+        print(
+            f"{name:<18} {summary['requests']:>8} {summary['rps']:>8,.0f} {summary.get('p50_ms', 0):>8.2f} "
+            f"{summary.get('p95_ms', 0):>8.2f} {summary.get('p99_ms', 0):>8.2f}  {statuses}"
+        )
+
+
+def print_comparison(baseline: dict, result: dict) -> None:
+    # Positive change is better for rps and worse for latencies
+    print(f"\ncompared to {baseline['meta'].get('commit') or '-'} ({baseline['meta']['timestamp']}):")
+    print(f"{'operation':<18} {'rps':>16} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16}")
+    rows = [*result["endpoints"].items(), ("total", result["total"])]
+    for name, summary in rows:
+        before = baseline["total"] if name == "total" else baseline["endpoints"].get(name)
+        if not before:
+            continue
+        cells = [_change(before.get(key), summary.get(key)) for key in ("rps", "p50_ms", "p95_ms", "p99_ms")]
+        print(f"{name:<18} " + " ".join(f"{cell:>16}" for cell in cells))
+
+
+def _change(before: float | None, after: float | None) -> str:
+    if not before or after is None:
+        return "-"
+    return f"{after:,.1f} ({(after - before) / before:+.0%})"
+
+
+def _git_commit() -> str | None:
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--duration", type=float, help="stop after this many seconds, even if requests remain")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"default: {DEFAULT_MIX}")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the result as JSON to this file")
+    parser.add_argument("--compare", help="JSON result of a previous run to compare with")
+    args = parser.parse_args()
+
+    # A local SQLite database stands in for the real one when none is configured
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./loadtest.db")
+    os.environ.setdefault("ENVIRONMENT", "development")
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+            file.write("\n")
+    if args.compare:
+        with open(args.compare) as file:
+            print_comparison(json.load(file), result)
+    if result["total"]["statuses"].keys() - {"200", "201", "404", "409"}:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Custo da instrumentação de métricas por requisição.
+
+Executa o mesmo conjunto de requisições (login e leitura de saldo) com METRICS_ENABLED ligado e
+desligado, cada um em um processo, e reporta o tempo médio por requisição.
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=sqlite:///./bench.db ENVIRONMENT=development \
+        python -m benchmarks.metrics_overhead --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+async def run(requests: int) -> dict:
+    from httpx import ASGITransport, AsyncClient
+
+    from src.database import database, engine, metadata
+    from src.main import app
+    from src.models.account import accounts
+
+    metadata.create_all(engine)
+    account_id = await database.execute(accounts.insert().values(user_id=1, balance=100))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        token = (await client.post("/auth/login", json={"user_id": 1})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        results = {}
+        for name, request in (
+            ("login", lambda: client.post("/auth/login", json={"user_id": 1})),
+            ("balance", lambda: client.get(f"/accounts/{account_id}/balance", headers=headers)),
+        ):
+            start = time.perf_counter()
+            for _ in range(requests):
+                await request()
+            results[name] = (time.perf_counter() - start) / requests
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run(args.requests))))
+        return
+
+    for enabled in ("false", "true"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.metrics_overhead", "--worker", *sys.argv[1:]],
+            env={**os.environ, "METRICS_ENABLED": enabled},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results = json.loads(output.splitlines()[-1])
+        timings = " ".join(f"{name}={value * 1e6:,.0f}µs" for name, value in results.items())
+        print(f"metrics_enabled={enabled:<5} {timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Custo de validação e serialização dos valores monetários: centavos inteiros contra o antigo Decimal/float.
+
+Compara, por item, os modelos atuais (``PositiveMoney``/``PositiveMoneyOut``, centavos inteiros) com os
+equivalentes anteriores (``PositiveFloat`` na entrada; ``Numeric(10, 2)`` lido como ``Decimal`` e convertido
+em ``float`` na saída):
+
+- ``parse``: ``TransactionIn.model_validate_json`` de um corpo de requisição;
+- ``serialize``: ``TransactionOut`` montado a partir da linha do banco e serializado em JSON;
+- ``arithmetic``: aplicar o valor ao saldo (``Decimal(str(float))`` antes, soma de inteiros agora).
+
+Uso:
+
+    DATABASE_URL=sqlite:///./bench.db ENVIRONMENT=development python -m benchmarks.money --items 200000
+"""
+import argparse
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import AwareDatetime, BaseModel, NaiveDatetime, PositiveFloat, TypeAdapter
+
+from src.schemas.transaction import TransactionIn, TransactionType
+from src.views.transaction import TransactionOut
+
+
+class LegacyTransactionIn(BaseModel):
+    account_id: int
+    type: TransactionType
+    amount: PositiveFloat
+
+    class Config:
+        use_enum_values = True
+
+
+class LegacyTransactionOut(BaseModel):
+    id: int
+    account_id: int
+    type: str
+    amount: PositiveFloat
+    timestamp: AwareDatetime | NaiveDatetime
+
+
+def measure(function, items: int) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) / items * 1e9
+
+
+def main(args: argparse.Namespace) -> None:
+    timestamp = datetime(2024, 1, 1, 12)
+    cents = [index % 10_000_000 + 1 for index in range(args.items)]
+    bodies = [f'{{"account_id": 1, "type": "deposit", "amount": {value // 100}.{value % 100:02d}}}' for value in cents]
+    rows = [{"id": 1, "account_id": 1, "type": "deposit", "amount": value, "timestamp": timestamp} for value in cents]
+    legacy_rows = [{**row, "amount": Decimal(row["amount"]).scaleb(-2)} for row in rows]
+    legacy_out = TypeAdapter(list[LegacyTransactionOut])
+    out = TypeAdapter(list[TransactionOut])
+
+    results = {
+        "parse": (
+            measure(lambda: [LegacyTransactionIn.model_validate_json(body) for body in bodies], args.items),
+            measure(lambda: [TransactionIn.model_validate_json(body) for body in bodies], args.items),
+        ),
+        "serialize": (
+            measure(lambda: legacy_out.dump_json(legacy_out.validate_python(legacy_rows)), args.items),
+            measure(lambda: out.dump_json(out.validate_python(rows)), args.items),
+        ),
+    }
+
+    legacy_amounts = [LegacyTransactionIn.model_validate_json(body).amount for body in bodies]
+    amounts = [TransactionIn.model_validate_json(body).amount for body in bodies]
+
+    def legacy_arithmetic():
+        balance = Decimal(0)
+        for amount in legacy_amounts:
+            balance += Decimal(str(amount))
+
+    def arithmetic():
+        balance = 0
+        for amount in amounts:
+            balance += amount
+
+    results["arithmetic"] = (measure(legacy_arithmetic, args.items), measure(arithmetic, args.items))
+
+    print(f"{'step':<12} {'legacy ns':>10} {'cents ns':>10} {'speedup':>8}")
+    for step, (legacy, cents) in results.items():
+        print(f"{step:<12} {legacy:>10,.0f} {cents:>10,.0f} {legacy / cents:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000)
+    main(parser.parse_args())
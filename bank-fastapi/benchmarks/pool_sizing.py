@@ -0,0 +1,117 @@
+"""
+Teste de carga do pool de conexões: vazão, latência e espera por conexão por tamanho de pool.
+
+Para cada tamanho em ``--sizes`` executa um processo com ``DATABASE_POOL_MAX_SIZE`` ajustado, que
+dispara depósitos concorrentes (``TransactionService.create``) em contas aleatórias e reporta a
+vazão, a latência p50/p99, a espera média por conexão e a maior fila observada no pool.
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=postgresql://postgres@127.0.0.1:5432/bank ENVIRONMENT=production \
+        python -m benchmarks.pool_sizing --sizes 1 2 5 10 20 --operations 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from src.database import database, engine, metadata, pool, pool_acquire_seconds, pool_acquire_timeouts
+    from src.models.account import accounts
+    from src.schemas.transaction import TransactionIn
+    from src.services.transaction import TransactionService
+
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        account_ids = [
+            await database.execute(accounts.insert().values(user_id=1, balance=0)) for _ in range(args.accounts)
+        ]
+        service = TransactionService()
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies: list[float] = []
+        errors = max_waiting = 0
+
+        async def deposit() -> None:
+            nonlocal errors
+            transaction = TransactionIn(account_id=random.choice(account_ids), type="deposit", amount=1.0)
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await service.create(transaction)
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    errors += 1
+
+        async def sample_queue() -> None:
+            nonlocal max_waiting
+            while True:
+                max_waiting = max(max_waiting, pool.waiting)
+                await asyncio.sleep(0.001)
+
+        waits = (pool_acquire_seconds.count(), pool_acquire_seconds.sum())
+        sampler = asyncio.create_task(sample_queue())
+        start = time.perf_counter()
+        await asyncio.gather(*(deposit() for _ in range(args.operations)))
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+        count = pool_acquire_seconds.count() - waits[0]
+        wait = pool_acquire_seconds.sum() - waits[1]
+    finally:
+        await database.disconnect()
+
+    latencies.sort()
+    return {
+        "size": pool.max_size,
+        "rps": args.operations / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else None,
+        "acquire_wait_ms": wait / count * 1000 if count else 0,
+        "max_waiting": max_waiting,
+        "timeouts": pool_acquire_timeouts.value(),
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run(args))))
+        return
+
+    print(
+        f"{'size':>5} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8} {'wait ms':>8} {'queue':>6} {'timeouts':>9} {'errors':>7}"
+    )
+    for size in args.sizes:
+        # Settings are read at import time: each size runs in its own process
+        env = {**os.environ, "DATABASE_POOL_MAX_SIZE": str(size), "DATABASE_POOL_MIN_SIZE": str(size)}
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.pool_sizing", "--worker", *sys.argv[1:]],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f"{result['size']:>5} {result['rps']:>8,.0f} {result['p50_ms'] or 0:>8.1f} {result['p99_ms'] or 0:>8.1f} "
+            f"{result['acquire_wait_ms']:>8.1f} {result['max_waiting']:>6} {result['timeouts']:>9.0f} "
+            f"{result['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark dos statements pré-compilados (``PreparedStatement``) das consultas quentes dos serviços.
+
+Duas medições:
+
+- ``compile``: CPU por chamada para chegar ao SQL e aos argumentos que vão para o driver, sem banco. O caminho
+  anterior monta a expressão Core e a compila pelo backend do ``databases`` a cada chamada; o atual só
+  associa os valores ao statement já compilado. Medido para os dialetos Postgres e SQLite;
+- ``roundtrip``: chamadas por segundo executando de fato no banco de DATABASE_URL (mediana de ``--repeat``).
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=postgresql://postgres@127.0.0.1:5432/bank ENVIRONMENT=production \
+        python -m benchmarks.prepared_statements --calls 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from databases.backends.postgres import PostgresBackend
+from databases.backends.sqlite import SQLiteBackend
+
+from src.database import _with_prepared_statements, database, engine, metadata
+from src.models.account import accounts
+from src.models.transaction import TransactionType, transactions
+from src.services.account import SELECT_ACCOUNT, SELECT_ACCOUNTS_PAGE
+from src.services.balance import UPSERT_DAILY_BALANCE, _upsert_command
+from src.services.transaction import (
+    DEPOSIT,
+    INSERT_TRANSACTION,
+    SELECT_TRANSACTIONS_AFTER,
+    SELECT_TRANSACTIONS_PAGE,
+    WITHDRAW,
+)
+
+AFTER = (datetime(2024, 1, 1, tzinfo=timezone.utc), 10)
+
+
+def legacy_statements(dialect: str) -> dict:
+    # The Core expressions the services built on every call before the prepared statements
+    def transactions_after():
+        columns = (transactions.c.timestamp, transactions.c.id)
+        values = (sa.literal(value, column.type) for value, column in zip(AFTER, columns))
+        return (
+            transactions.select()
+            .where(transactions.c.account_id == 1, sa.tuple_(*columns) > sa.tuple_(*values))
+            .order_by(transactions.c.timestamp, transactions.c.id)
+            .limit(50)
+        )
+
+    return {
+        "account": lambda: accounts.select().where(accounts.c.id == 1),
+        "accounts page": lambda: accounts.select().order_by(accounts.c.id).limit(50).offset(0),
+        "transactions page": lambda: transactions.select()
+        .where(transactions.c.account_id == 1)
+        .order_by(transactions.c.timestamp, transactions.c.id)
+        .limit(50)
+        .offset(0),
+        "transactions after": transactions_after,
+        "deposit": lambda: accounts.update()
+        .where(accounts.c.id == 1)
+        .values(balance=accounts.c.balance + 100)
+        .returning(accounts.c.balance),
+        "withdrawal": lambda: accounts.update()
+        .where(accounts.c.id == 1)
+        .where(accounts.c.balance >= 100)
+        .values(balance=accounts.c.balance - 100)
+        .returning(accounts.c.balance),
+        "insert transaction": lambda: transactions.insert()
+        .values(account_id=1, type=TransactionType.DEPOSIT, amount=100)
+        .returning(*transactions.c),
+        "daily balance": lambda: _upsert_command(dialect).values(
+            [{"account_id": 1, "day": AFTER[0].date(), "balance": 100}]
+        ),
+    }
+
+
+PREPARED = {
+    "account": (SELECT_ACCOUNT, {"account_id": 1}),
+    "accounts page": (SELECT_ACCOUNTS_PAGE, {"limit": 50, "skip": 0}),
+    "transactions page": (SELECT_TRANSACTIONS_PAGE, {"account_id": 1, "limit": 50, "skip": 0}),
+    "transactions after": (
+        SELECT_TRANSACTIONS_AFTER,
+        {"account_id": 1, "after_timestamp": AFTER[0], "after_id": AFTER[1], "limit": 50},
+    ),
+    "deposit": (DEPOSIT, {"account_id": 1, "amount": 100}),
+    "withdrawal": (WITHDRAW, {"account_id": 1, "amount": 100}),
+    "insert transaction": (INSERT_TRANSACTION, {"account_id": 1, "type": TransactionType.DEPOSIT, "amount": 100}),
+    "daily balance": (UPSERT_DAILY_BALANCE, {"account_id": 1, "day": AFTER[0].date(), "balance": 100}),
+}
+
+
+def per_call(function, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def measure_compile(calls: int) -> None:
+    backends = {
+        "postgresql": PostgresBackend("postgresql://bank@localhost/bank"),
+        "sqlite": SQLiteBackend("sqlite:///bench.db"),
+    }
+    print(f"{'compile (CPU per call)':<24} {'dialect':<11} {'legacy µs':>10} {'prepared µs':>12} {'saved':>7}")
+    for dialect, backend in backends.items():
+        # Connections from src.database go through the same hook
+        connection = _with_prepared_statements(backend.connection())
+        for name, build in legacy_statements(dialect).items():
+            statement, values = PREPARED[name]
+            statement.compile(connection._dialect)
+            legacy = per_call(lambda: connection._compile(build()), calls)
+            prepared = per_call(lambda: connection._compile(statement.values(**values)), calls)
+            print(f"{name:<24} {dialect:<11} {legacy:>10.1f} {prepared:>12.1f} {1 - prepared / legacy:>6.0%}")
+
+
+async def measure_roundtrip(calls: int, repeat: int) -> None:
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        account_id = await database.execute(accounts.insert().values(user_id=1, balance=0))
+        rows = [{"account_id": account_id, "type": TransactionType.DEPOSIT, "amount": 100} for _ in range(100)]
+        await database.execute_many(transactions.insert(), rows)
+
+        cases = {
+            "account": (
+                lambda: accounts.select().where(accounts.c.id == account_id),
+                SELECT_ACCOUNT,
+                {"account_id": account_id},
+            ),
+            "transactions page": (
+                lambda: transactions.select()
+                .where(transactions.c.account_id == account_id)
+                .order_by(transactions.c.timestamp, transactions.c.id)
+                .limit(50)
+                .offset(0),
+                SELECT_TRANSACTIONS_PAGE,
+                {"account_id": account_id, "limit": 50, "skip": 0},
+            ),
+        }
+        print(f"\n{'roundtrip (' + database.url.dialect + ')':<24} {'legacy /s':>10} {'prepared /s':>12} {'gain':>7}")
+        for name, (build, statement, values) in cases.items():
+            legacy, prepared = [], []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in range(calls):
+                    await database.fetch_all(build())
+                legacy.append(calls / (time.perf_counter() - start))
+                start = time.perf_counter()
+                for _ in range(calls):
+                    await database.fetch_all(statement, values)
+                prepared.append(calls / (time.perf_counter() - start))
+            legacy_rate, prepared_rate = statistics.median(legacy), statistics.median(prepared)
+            print(f"{name:<24} {legacy_rate:>10,.0f} {prepared_rate:>12,.0f} {prepared_rate / legacy_rate - 1:>6.0%}")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    measure_compile(args.calls)
+    asyncio.run(measure_roundtrip(args.calls // 5, args.repeat))
@@ -0,0 +1,122 @@
+"""
+Benchmark de inicialização da API: tempo de import, de startup e até a primeira requisição respondida.
+
+Cada execução roda em um processo Python novo (como um worker recém-criado pelo autoscaler) e mede:
+
+- ``import``: ``import src.main`` (módulos, modelos, rotas e a aplicação);
+- ``startup``: o lifespan da aplicação (conexão com o banco);
+- ``first_request``: a primeira requisição (``POST /auth/login`` e ``GET /accounts/?limit=1``);
+- ``total``: do início do processo até a primeira resposta, incluindo a inicialização do interpretador.
+
+Reporta a mediana de ``--runs`` execuções. Com ``--importtime`` roda também um processo com
+``python -X importtime`` e resume o relatório: tempo próprio por pacote e os módulos mais caros da aplicação.
+
+Uso:
+
+    DATABASE_URL=sqlite:///./bench.db ENVIRONMENT=development python -m benchmarks.startup --runs 10 --importtime
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+PHASES = ("import", "startup", "first_request", "total")
+
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import src.main
+from httpx import ASGITransport, AsyncClient
+imported = time.perf_counter()
+
+async def main():
+    app = src.main.app
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://startup") as client:
+            token = (await client.post("/auth/login", json={"user_id": 1})).json()["access_token"]
+            response = await client.get("/accounts/?limit=1", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200, response.text
+        return started, time.perf_counter(), time.time()
+
+started, answered, wall = asyncio.run(main())
+print(json.dumps({
+    "import": imported - start,
+    "startup": started - imported,
+    "first_request": answered - started,
+    "wall": wall,
+}))
+"""
+
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run_once() -> dict[str, float]:
+    # httpx is imported before the clock starts in the child; it is not part of the application
+    launched = time.time()
+    output = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout.splitlines()[-1])
+    result["total"] = result.pop("wall") - launched
+    return result
+
+
+def importtime_report(top: int) -> None:
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"], capture_output=True, text=True, check=True
+    )
+    packages: Counter = Counter()
+    modules: list[tuple[int, str]] = []
+    total = 0
+    for line in output.stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if not match:
+            continue
+        own, cumulative, name = int(match.group(1)), int(match.group(2)), match.group(4)
+        packages[name.split(".")[0]] += own
+        total += own
+        if name.startswith("src."):
+            modules.append((cumulative, name))
+
+    print(f"import src.main: {total / 1000:.0f} ms of module execution (-X importtime)")
+    print(f"\n{'package':<24} {'own ms':>8}")
+    for name, own in packages.most_common(top):
+        print(f"{name:<24} {own / 1000:>8.1f}")
+    print(f"\n{'application module':<32} {'cumulative ms':>14}")
+    for cumulative, name in sorted(modules, reverse=True)[:top]:
+        print(f"{name:<32} {cumulative / 1000:>14.1f}")
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", action="store_true", help="also summarize a python -X importtime run")
+    parser.add_argument("--top", type=int, default=15, help="rows of the importtime report")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+    os.environ.setdefault("ENVIRONMENT", "development")
+    if os.environ["DATABASE_URL"].startswith("sqlite"):
+        # The first request reads the accounts table
+        from src.database import engine, metadata
+        from src.main import app  # noqa: F401 registers every model
+
+        metadata.create_all(engine)
+
+    if args.importtime:
+        importtime_report(args.top)
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"{'phase':<14} {'median ms':>10} {'min ms':>8} {'max ms':>8}   ({args.runs} runs)")
+    for phase in PHASES:
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<14} {statistics.median(values):>10.1f} {min(values):>8.1f} {max(values):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark de concorrência para TransactionService.create.
+
+Dispara saques concorrentes contra uma única conta e compara a implementação
+atual (UPDATE condicional + INSERT ... RETURNING) com o antigo fluxo
+leitura-modificação-escrita, reportando vazão e verificando que o saldo final
+bate com o número de saques aceitos.
+
+Uso (SQLite ou Postgres, conforme DATABASE_URL):
+
+    DATABASE_URL=sqlite:///./bench.db ENVIRONMENT=development \
+        python -m benchmarks.transaction_concurrency --operations 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+
+import sqlalchemy as sa
+
+from src.database import database, engine, metadata
+from src.exceptions import AccountNotFoundError, BusinessError
+from src.models.account import accounts
+from src.models.transaction import transactions
+from src.schemas.transaction import TransactionIn
+from src.services.transaction import TransactionService
+
+
+@database.transaction()
+async def legacy_create(transaction: TransactionIn) -> None:
+    """Fluxo anterior: SELECT, INSERT, UPDATE com saldo calculado em Python e SELECT final."""
+    account = await database.fetch_one(accounts.select().where(accounts.c.id == transaction.account_id))
+    if not account:
+        raise AccountNotFoundError
+    balance = account.balance - transaction.amount
+    if balance < 0:
+        raise BusinessError("Operation not carried out due to lack of balance")
+    command = transactions.insert().values(
+        account_id=transaction.account_id, type=transaction.type, amount=transaction.amount
+    )
+    transaction_id = await database.execute(command)
+    await database.execute(accounts.update().where(accounts.c.id == transaction.account_id).values(balance=balance))
+    await database.fetch_one(transactions.select().where(transactions.c.id == transaction_id))
+
+
+async def run(name: str, create, operations: int, concurrency: int, amount: float) -> None:
+    account_id = await database.execute(accounts.insert().values(user_id=1, balance=0))
+    transaction = TransactionIn(account_id=account_id, type="withdrawal", amount=amount)
+    initial = transaction.amount * (operations // 2)
+    await database.execute(accounts.update().where(accounts.c.id == account_id).values(balance=initial))
+    semaphore = asyncio.Semaphore(concurrency)
+    accepted = rejected = errors = 0
+
+    async def withdraw() -> None:
+        nonlocal accepted, rejected, errors
+        async with semaphore:
+            try:
+                await create(transaction)
+                accepted += 1
+            except BusinessError:
+                rejected += 1
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(withdraw() for _ in range(operations)))
+    elapsed = time.perf_counter() - start
+
+    row = await database.fetch_one(accounts.select().where(accounts.c.id == account_id))
+    count = await database.fetch_val(
+        sa.select(sa.func.count()).select_from(transactions).where(transactions.c.account_id == account_id)
+    )
+    expected = initial - transaction.amount * count
+    consistent = row.balance == expected and row.balance >= 0
+
+    print(
+        f"{name:<8} ops={operations} concurrency={concurrency} elapsed={elapsed:.3f}s "
+        f"rps={operations / elapsed:,.0f} accepted={accepted} rejected={rejected} errors={errors} "
+        f"rows={count} balance={row.balance} expected={expected} consistent={consistent}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    metadata.create_all(engine)
+    await database.connect()
+    try:
+        service = TransactionService()
+        if not args.skip_legacy:
+            await run("legacy", legacy_create, args.operations, args.concurrency, args.amount)
+        await run("atomic", service.create, args.operations, args.concurrency, args.amount)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--amount", type=float, default=10.0)
+    parser.add_argument("--skip-legacy", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -17,6 +17,7 @@ if config.config_file_name is not None:
 from src.database import engine, metadata  # noqa
 from src.models.transaction import transactions  # noqa
 from src.models.account import accounts  # noqa
+from src.models.balance import account_daily_balances  # noqa
 
 target_metadata = metadata
 
@@ -0,0 +1,27 @@
+"""Add transactions keyset index
+
+Revision ID: 5c2d8e41a7b3
+Revises: 09f7da264602
+Create Date: 2026-10-18 10:12:41.318902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d8e41a7b3'
+down_revision: Union[str, None] = '09f7da264602'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_transactions_account_id_timestamp_id', 'transactions', ['account_id', 'timestamp', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_account_id_timestamp_id', table_name='transactions')
@@ -0,0 +1,32 @@
+"""Add account daily balances
+
+Revision ID: 8a4f0b9c3d21
+Revises: 5c2d8e41a7b3
+Create Date: 2026-10-18 11:02:17.554013
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4f0b9c3d21'
+down_revision: Union[str, None] = '5c2d8e41a7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('account_daily_balances',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('balance', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.PrimaryKeyConstraint('account_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('account_daily_balances')
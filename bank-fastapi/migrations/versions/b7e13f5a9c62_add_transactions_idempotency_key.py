@@ -0,0 +1,28 @@
+"""Add transactions idempotency key
+
+Revision ID: b7e13f5a9c62
+Revises: 8a4f0b9c3d21
+Create Date: 2026-10-18 14:05:17.402113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e13f5a9c62'
+down_revision: Union[str, None] = '8a4f0b9c3d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('idempotency_key', sa.String(length=300), nullable=True))
+    op.create_index('ux_transactions_idempotency_key', 'transactions', ['idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_transactions_idempotency_key', table_name='transactions')
+    op.drop_column('transactions', 'idempotency_key')
@@ -0,0 +1,68 @@
+"""Store money as integer cents
+
+Revision ID: d41c7e2a9b58
+Revises: b7e13f5a9c62
+Create Date: 2026-10-18 16:22:41.908215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c7e2a9b58'
+down_revision: Union[str, None] = 'b7e13f5a9c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = [
+    ('accounts', 'balance'),
+    ('transactions', 'amount'),
+    ('account_daily_balances', 'balance'),
+]
+
+
+def upgrade() -> None:
+    for table, column in MONEY_COLUMNS:
+        if op.get_context().dialect.name == 'postgresql':
+            op.alter_column(
+                table,
+                column,
+                type_=sa.BigInteger(),
+                existing_type=sa.Numeric(precision=10, scale=2),
+                existing_nullable=False,
+                postgresql_using=f'round({column} * 100)::bigint',
+            )
+            continue
+        op.execute(f'UPDATE {table} SET {column} = CAST(ROUND({column} * 100) AS INTEGER)')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                type_=sa.BigInteger(),
+                existing_type=sa.Numeric(precision=10, scale=2),
+                existing_nullable=False,
+            )
+
+
+def downgrade() -> None:
+    for table, column in MONEY_COLUMNS:
+        if op.get_context().dialect.name == 'postgresql':
+            op.alter_column(
+                table,
+                column,
+                type_=sa.Numeric(precision=10, scale=2),
+                existing_type=sa.BigInteger(),
+                existing_nullable=False,
+                postgresql_using=f'{column} / 100.0',
+            )
+            continue
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                type_=sa.Numeric(precision=10, scale=2),
+                existing_type=sa.BigInteger(),
+                existing_nullable=False,
+            )
+        op.execute(f'UPDATE {table} SET {column} = {column} / 100.0')
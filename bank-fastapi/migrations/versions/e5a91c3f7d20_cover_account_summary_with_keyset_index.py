@@ -0,0 +1,35 @@
+"""Cover account summary with keyset index
+
+Revision ID: e5a91c3f7d20
+Revises: d41c7e2a9b58
+Create Date: 2026-10-18 18:04:12.551730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a91c3f7d20'
+down_revision: Union[str, None] = 'd41c7e2a9b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same leading columns as the keyset index it replaces, plus the columns the account summary reads
+    op.create_index(
+        'ix_transactions_account_id_timestamp_id_type_amount',
+        'transactions',
+        ['account_id', 'timestamp', 'id', 'type', 'amount'],
+        unique=False,
+    )
+    op.drop_index('ix_transactions_account_id_timestamp_id', table_name='transactions')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_transactions_account_id_timestamp_id', 'transactions', ['account_id', 'timestamp', 'id'], unique=False
+    )
+    op.drop_index('ix_transactions_account_id_timestamp_id_type_amount', table_name='transactions')
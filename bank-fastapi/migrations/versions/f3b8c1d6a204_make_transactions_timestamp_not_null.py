@@ -0,0 +1,35 @@
+"""Make transactions timestamp not null
+
+Revision ID: f3b8c1d6a204
+Revises: e5a91c3f7d20
+Create Date: 2026-10-18 19:05:12.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c1d6a204'
+down_revision: Union[str, None] = 'e5a91c3f7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination orders and compares by (timestamp, id): rows without a timestamp can't be paginated.
+    # Transactions without one are placed at the opening of their account
+    op.execute(
+        'UPDATE transactions SET timestamp = COALESCE('
+        '(SELECT accounts.created_at FROM accounts WHERE accounts.id = transactions.account_id), CURRENT_TIMESTAMP'
+        ') WHERE timestamp IS NULL'
+    )
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('timestamp', existing_type=sa.TIMESTAMP(timezone=True), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('timestamp', existing_type=sa.TIMESTAMP(timezone=True), nullable=True)
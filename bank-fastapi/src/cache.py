@@ -0,0 +1,104 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class LRUCache:
+    """
+    Cache LRU em memória com tamanho máximo; ``maxsize`` igual a zero desliga o cache.
+    Com ``ttl`` cada entrada expira ``ttl`` segundos depois de gravada; ``set`` também aceita o instante de
+    expiração de cada entrada, no relógio ``clock``.
+    """
+    def __init__(self, maxsize: int, ttl: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= self.clock():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, expires_at: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        if expires_at is None and self.ttl is not None:
+            expires_at = self.clock() + self.ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class CacheBackend(ABC):
+    """
+    Interface dos backends de cache com expiração (TTL), assíncrona para admitir um backend remoto (Redis).
+    Os valores devem ser dicionários de tipos simples, serializáveis por qualquer backend.
+    """
+    @abstractmethod
+    async def get(self, key: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Backend em memória sobre um ``LRUCache`` em que cada entrada expira ``ttl`` segundos depois de gravada.
+    """
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.entries = LRUCache(maxsize, ttl=ttl, clock=clock)
+
+    async def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: dict) -> None:
+        self.entries.set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        self.entries.delete(*keys)
+
+    async def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self.entries.stats()
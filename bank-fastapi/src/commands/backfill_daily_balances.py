@@ -0,0 +1,24 @@
+"""
+Reconstrói a tabela account_daily_balances a partir do histórico de transações.
+
+Uso:
+
+    poetry run python -m src.commands.backfill_daily_balances
+"""
+import asyncio
+
+from src.database import database
+from src.services.balance import BalanceService
+
+
+async def main() -> None:
+    await database.connect()
+    try:
+        count = await BalanceService().backfill()
+        print(f"{count} daily balances rebuilt.")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
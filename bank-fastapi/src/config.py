@@ -9,6 +9,20 @@ class Settings(BaseSettings):
     jwt_secret: str = "my-secret"
     jwt_algorithm: str = "HS256"
     cors_origins: str = "*"
+    jwt_cache_size: int = 10000
+    database_pool_min_size: int = 1
+    database_pool_max_size: int = 10
+    database_pool_acquire_timeout: float = 30.0
+    database_statement_cache_size: int = 100
+    metrics_enabled: bool = True
+    fast_json_responses: bool = True
+    idempotency_cache_size: int = 10000
+    account_cache_size: int = 10000
+    account_cache_ttl: float = 10.0
+    transaction_lock_stripes: int = 64
+    transaction_coalesce_limit: int = 500
+    transaction_batch_max_items: int = 10000
+    transaction_batch_max_bytes: int = 4 * 1024 * 1024
 
 
 settings = Settings()
@@ -1,23 +1,63 @@
-from fastapi import APIRouter, Depends, status
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from enum import Enum
 
+from databases.interfaces import Record
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi.responses import StreamingResponse
+
+from src.money import format_cents, from_cents
+from src.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from src.responses import RecordsJSON
 from src.schemas.account import AccountIn
 from src.security import login_required
 from src.services.account import AccountService
+from src.services.balance import BalanceService
 from src.services.transaction import TransactionService
-from src.views.account import AccountOut, TransactionOut
+from src.views.account import AccountOut, BalanceOut, SummaryOut, TransactionOut
 
 router = APIRouter(prefix="/accounts", dependencies=[Depends(login_required)])
 
 account_service = AccountService()
 tx_service = TransactionService()
+balance_service = BalanceService()
+
+# List routes serialize the rows straight to JSON; response_model still documents them
+accounts_json = RecordsJSON(AccountOut)
+transactions_json = RecordsJSON(TransactionOut)
+
+STATEMENT_COLUMNS = ("id", "account_id", "type", "amount", "timestamp")
+STATEMENT_CHUNK_ROWS = 500
+
+
+class StatementFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class SummaryBucket(str, Enum):
+    DAY = "day"
+    MONTH = "month"
 
 
 @router.get("/", response_model=list[AccountOut])
-async def read_accounts(limit: int, skip: int = 0):
+async def read_accounts(
+    response: Response, limit: int = Query(..., gt=0, le=1000), skip: int = 0, cursor: str | None = None
+):
     """
     Lista todas as contas cadastradas, com suporte a paginação.
+
+    Quando a página está cheia, o cabeçalho `X-Next-Cursor` traz o cursor da próxima página, que deve ser
+    enviado no parâmetro `cursor` (nesse caso `skip` é ignorado).
     """
-    return await account_service.read_all(limit=limit, skip=skip)
+    after = decode_cursor(cursor, int)[0] if cursor else None
+    rows = await account_service.read_all(limit=limit, skip=skip, after=after)
+    if rows and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return accounts_json.response(rows, response)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=AccountOut)
@@ -28,9 +68,118 @@ async def create_account(account: AccountIn):
     return await account_service.create(account)
 
 
+@router.post("/batch", status_code=status.HTTP_201_CREATED, response_model=list[AccountOut])
+async def create_accounts_batch(items: list[AccountIn]):
+    """
+    Cria várias contas correntes em um único commit. Se algum item for inválido nenhuma conta é criada.
+    """
+    rows = await account_service.create_many(items)
+    return accounts_json.response(rows, status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/{id}", response_model=AccountOut)
+async def read_account(id: int):
+    """
+    Retorna uma conta pelo id. A leitura passa por um cache em memória invalidado a cada transação da conta.
+    """
+    return await account_service.read(id)
+
+
 @router.get("/{id}/transactions", response_model=list[TransactionOut])
-async def read_account_transactions(id: int, limit: int = 0, skip: int = 0):
+async def read_account_transactions(
+    id: int, response: Response, limit: int = Query(100, gt=0, le=1000), skip: int = 0, cursor: str | None = None
+):
     """
     Lista as transações de uma conta específica, com suporte a paginação.
+
+    Quando a página está cheia, o cabeçalho `X-Next-Cursor` traz o cursor da próxima página, que deve ser
+    enviado no parâmetro `cursor` (nesse caso `skip` é ignorado).
     """
-    return await tx_service.read_all(account_id=id, limit=limit, skip=skip)
+    after = decode_cursor(cursor, datetime, int) if cursor else None
+    rows = await tx_service.read_all(account_id=id, limit=limit, skip=skip, after=after)
+    if rows and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return transactions_json.response(rows, response)
+
+
+@router.get("/{id}/summary", response_model=SummaryOut)
+async def read_account_summary(
+    id: int,
+    bucket: SummaryBucket | None = None,
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+):
+    """
+    Retorna os totais das transações de uma conta (quantidade de depósitos e saques, valores movimentados,
+    mínimo, máximo e média), agregados pelo banco. Com `bucket` (`day` ou `month`, em UTC) traz também os
+    totais de cada dia ou mês com movimento. O intervalo `from` (inclusivo) e `to` (exclusivo) é opcional.
+    """
+    await account_service.read(id)
+    bucket = bucket and bucket.value
+    summary = await tx_service.summarize(account_id=id, start=start, end=end, bucket=bucket)
+    return {"account_id": id, "bucket": bucket, **summary}
+
+
+@router.get("/{id}/balance", response_model=BalanceOut)
+async def read_account_balance(id: int, at: datetime | None = None):
+    """
+    Retorna o saldo de uma conta em um instante (`at`, sem fuso é tratado como UTC) ou o saldo atual.
+    """
+    balance = await balance_service.read_at(account_id=id, at=at)
+    return {"account_id": id, "at": at, "balance": balance}
+
+
+@router.get(
+    "/{id}/statement",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def read_account_statement(
+    id: int,
+    format: StatementFormat = StatementFormat.NDJSON,
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+):
+    """
+    Exporta o extrato completo de uma conta em NDJSON ou CSV, transmitido linha a linha a partir do banco.
+    O intervalo `from` (inclusivo) e `to` (exclusivo) é opcional.
+    """
+    await account_service.read(id)
+    rows = tx_service.iterate(account_id=id, start=start, end=end)
+    if format == StatementFormat.CSV:
+        return StreamingResponse(
+            _statement_csv(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="statement-{id}.csv"'},
+        )
+    return StreamingResponse(_statement_ndjson(rows), media_type="application/x-ndjson")
+
+
+def _statement_values(row: Record, money: Callable[[int], float | str]) -> tuple:
+    return (row.id, row.account_id, row.type.value, money(row.amount), row.timestamp and row.timestamp.isoformat())
+
+
+async def _statement_ndjson(rows: AsyncIterator[Record]) -> AsyncIterator[str]:
+    chunk = []
+    async for row in rows:
+        chunk.append(json.dumps(dict(zip(STATEMENT_COLUMNS, _statement_values(row, from_cents)))))
+        if len(chunk) == STATEMENT_CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk.clear()
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+async def _statement_csv(rows: AsyncIterator[Record]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(STATEMENT_COLUMNS)
+    count = 0
+    async for row in rows:
+        writer.writerow(_statement_values(row, format_cents))
+        count += 1
+        if count % STATEMENT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
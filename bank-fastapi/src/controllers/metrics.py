@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """
+    Expõe as métricas do serviço no formato de texto do Prometheus.
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -1,15 +1,157 @@
-from fastapi import APIRouter, Depends, status
+import json
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from pydantic import ValidationError
+
+from src.config import settings
+from src.database import database
 from src.schemas.transaction import TransactionIn
 from src.security import login_required
+from src.services.scheduler import TransactionScheduler
 from src.services.transaction import TransactionService
-from src.views.transaction import TransactionOut
+from src.views.transaction import TransactionBatchOut, TransactionOut
 
 router = APIRouter(prefix="/transactions", dependencies=[Depends(login_required)])
 
 service = TransactionService()
+# SQLite has a single writer: concurrent write transactions only fail with "database is locked"
+scheduler = TransactionScheduler(
+    service,
+    stripes=1 if database.url.dialect == "sqlite" else settings.transaction_lock_stripes,
+    limit=settings.transaction_coalesce_limit,
+)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+batch_request_body = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/TransactionIn"}},
+            },
+            "application/x-ndjson": {
+                "schema": {"type": "string", "description": "Um objeto TransactionIn por linha."},
+            },
+        },
+    }
+}
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=TransactionOut)
-async def create_transaction(transaction: TransactionIn):
-    return await service.create(transaction)
+async def create_transaction(
+    transaction: TransactionIn,
+    response: Response,
+    current_user: Annotated[dict[str, int], Depends(login_required)],
+    idempotency_key: Annotated[str | None, Header(min_length=1, max_length=255)] = None,
+):
+    """
+    Cria uma transação. Com o header ``Idempotency-Key``, repetições da mesma requisição devolvem a
+    transação original (com ``Idempotent-Replayed: true``) sem aplicá-la de novo.
+    Transações simultâneas da mesma conta são aplicadas juntas, em uma única transação do banco.
+    """
+    if idempotency_key is None:
+        return await scheduler.submit(transaction)
+
+    row, replayed = await service.create_idempotent(transaction, f"{current_user['user_id']}:{idempotency_key}")
+    if replayed:
+        response.headers[IDEMPOTENT_REPLAYED_HEADER] = "true"
+    return row
+
+
+@router.post(
+    "/batch",
+    response_model=TransactionBatchOut,
+    openapi_extra=batch_request_body,
+    responses={status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {"description": "Batch over the configured limits."}},
+)
+async def create_transactions_batch(request: Request):
+    """
+    Aplica um lote de transações (array JSON ou NDJSON) em um único commit, com um resultado por item.
+    Lotes com mais de ``TRANSACTION_BATCH_MAX_ITEMS`` transações ou corpos com mais de
+    ``TRANSACTION_BATCH_MAX_BYTES`` bytes são recusados com 413, sem aplicar nenhuma transação.
+    """
+    results: list[dict] = []
+    indexes: list[int] = []
+    items: list[TransactionIn] = []
+    async for payload in _read_batch(request):
+        index = len(results)
+        try:
+            items.append(TransactionIn.model_validate(payload))
+            indexes.append(index)
+            results.append({})
+        except ValidationError as exc:
+            results.append({"index": index, "status": "rejected", "detail": _error_detail(exc)})
+
+    for index, result in zip(indexes, await service.create_batch(items) if items else []):
+        results[index] = {**result, "index": index}
+
+    created = sum(1 for result in results if result["status"] == "created")
+    return {"created": created, "rejected": len(results) - created, "items": results}
+
+
+async def _read_batch(request: Request) -> AsyncIterator[Any]:
+    # NDJSON lines are parsed and yielded as they arrive; reading stops as soon as a limit is exceeded
+    max_items = settings.transaction_batch_max_items
+    media_type = request.headers.get("content-type", "").partition(";")[0].strip()
+    if media_type not in NDJSON_MEDIA_TYPES:
+        try:
+            payload = json.loads(b"".join([chunk async for chunk in _read_body(request)]))
+        except ValueError:
+            payload = None
+        if not isinstance(payload, list):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Request body must be a JSON array of transactions.",
+            )
+        if len(payload) > max_items:
+            raise _batch_too_large(f"Batch exceeds {max_items} transactions.")
+        for item in payload:
+            yield item
+        return
+
+    count = 0
+    buffer = b""
+    async for chunk in _read_body(request):
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                count += 1
+                if count > max_items:
+                    raise _batch_too_large(f"Batch exceeds {max_items} transactions.")
+                yield _parse_line(line)
+    if buffer.strip():
+        if count + 1 > max_items:
+            raise _batch_too_large(f"Batch exceeds {max_items} transactions.")
+        yield _parse_line(buffer)
+
+
+async def _read_body(request: Request) -> AsyncIterator[bytes]:
+    max_bytes = settings.transaction_batch_max_bytes
+    if int(request.headers.get("content-length") or 0) > max_bytes:
+        raise _batch_too_large(f"Batch body exceeds {max_bytes} bytes.")
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise _batch_too_large(f"Batch body exceeds {max_bytes} bytes.")
+        yield chunk
+
+
+def _batch_too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        # Invalid lines are rejected individually by the model validation
+        return line.decode(errors="replace")
+
+
+def _error_detail(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc'])) or 'body'}: {error['msg']}" for error in exc.errors())
@@ -1,12 +1,436 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from typing import Any
+
 import databases
 import sqlalchemy as sa
+from databases.interfaces import ConnectionBackend, DatabaseBackend, Record
+from sqlalchemy.engine.interfaces import Dialect
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.util import find_tables
+from sqlalchemy.sql.visitors import replacement_traverse
 
 from src.config import settings
+from src.exceptions import PoolTimeoutError
+from src.metrics import Counter, Gauge, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+
+class MeteredBackend:
+    """
+    Envolve o backend do ``databases`` medindo a espera por conexões, as conexões em uso e a fila.
+    O backend SQLite abre uma conexão por aquisição, sem pool: nele ``max_size`` é aplicado por um semáforo.
+    """
+    def __init__(self, backend: DatabaseBackend, max_size: int, acquire_timeout: float, limit: bool = False):
+        self._backend = backend
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.limit = limit
+        self.in_use = 0
+        self.waiting = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._backend, name)
+
+    def connection(self) -> "MeteredConnection":
+        connection = _with_prepared_statements(self._backend.connection())
+        if settings.metrics_enabled:
+            return TimedConnection(self, connection)
+        return MeteredConnection(self, connection)
+
+    @property
+    def size(self) -> int:
+        pool = getattr(self._backend, "_pool", None)
+        if hasattr(pool, "get_size"):
+            return pool.get_size()
+        return self.in_use
+
+    def slots(self) -> asyncio.Semaphore | None:
+        if not self.limit:
+            return None
+        # The semaphore is bound to the loop it first waits on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._semaphore = loop, asyncio.Semaphore(self.max_size)
+        return self._semaphore
+
+
+class MeteredConnection:
+    def __init__(self, pool: MeteredBackend, connection: ConnectionBackend):
+        self._pool = pool
+        self._connection = connection
+        self._slots: asyncio.Semaphore | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    async def acquire(self) -> None:
+        pool = self._pool
+        slots = pool.slots()
+        pool.waiting += 1
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(pool.acquire_timeout):
+                if slots:
+                    await slots.acquire()
+                try:
+                    await self._connection.acquire()
+                except BaseException:
+                    if slots:
+                        slots.release()
+                    raise
+        except TimeoutError:
+            pool_acquire_timeouts.inc()
+            raise PoolTimeoutError
+        finally:
+            pool.waiting -= 1
+            pool_acquire_seconds.observe(time.perf_counter() - start)
+        self._slots = slots
+        pool.in_use += 1
+
+    async def release(self) -> None:
+        try:
+            await self._connection.release()
+        finally:
+            self._pool.in_use -= 1
+            if self._slots:
+                self._slots.release()
+                self._slots = None
+
+
+class TimedConnection(MeteredConnection):
+    """
+    Conexão que, além das métricas do pool, mede o tempo de cada statement pelo seu rótulo.
+    """
+    async def fetch_all(self, query: ClauseElement) -> list[Record]:
+        start = time.perf_counter()
+        try:
+            return await self._connection.fetch_all(query)
+        finally:
+            query_seconds.observe(time.perf_counter() - start, statement=statement_label(query))
+
+    async def fetch_one(self, query: ClauseElement) -> Record | None:
+        start = time.perf_counter()
+        try:
+            return await self._connection.fetch_one(query)
+        finally:
+            query_seconds.observe(time.perf_counter() - start, statement=statement_label(query))
+
+    async def fetch_val(self, query: ClauseElement, column: Any = 0) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self._connection.fetch_val(query, column)
+        finally:
+            query_seconds.observe(time.perf_counter() - start, statement=statement_label(query))
+
+    async def execute(self, query: ClauseElement) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self._connection.execute(query)
+        finally:
+            query_seconds.observe(time.perf_counter() - start, statement=statement_label(query))
+
+    async def execute_many(self, queries: list[ClauseElement]) -> None:
+        start = time.perf_counter()
+        try:
+            await self._connection.execute_many(queries)
+        finally:
+            if queries:
+                query_seconds.observe(time.perf_counter() - start, statement=statement_label(queries[0]))
+
+    async def iterate(self, query: ClauseElement) -> AsyncIterator[Record]:
+        # Measures the whole cursor, including the time the caller spends between rows
+        start = time.perf_counter()
+        try:
+            async for row in self._connection.iterate(query):
+                yield row
+        finally:
+            query_seconds.observe(time.perf_counter() - start, statement=statement_label(query))
+
+
+class PreparedStatement:
+    """
+    Statement parametrizado com ``sa.bindparam``, compilado uma única vez por dialeto e reutilizado.
+
+    É executado como qualquer statement, com os valores dos parâmetros: ``database.fetch_all(STATEMENT,
+    {"account_id": 1})``. As conexões reconhecem o statement e usam o SQL já compilado em vez de chamar o
+    compilador do SQLAlchemy a cada execução; como o texto do SQL não muda, o cache de prepared statements
+    do asyncpg (``statement_cache_size``) também o reaproveita no Postgres.
+
+    A forma compilada depende de detalhes internos do compilador do SQLAlchemy e dos backends do ``databases``
+    (versões fixadas no pyproject). Por isso a primeira execução em cada dialeto é conferida com a compilação
+    normal do backend; se a forma compilada não puder ser montada ou divergir, o statement volta a ser
+    compilado a cada execução, como um statement qualquer.
+
+    Parâmetros expandidos (``in_()`` com lista) mudam o SQL a cada execução e não são aceitos.
+    """
+    def __init__(
+        self,
+        statement: ClauseElement | Callable[[str], ClauseElement],
+        column_keys: Iterable[str] | None = None,
+    ):
+        """
+        :param statement: statement, ou função que o monta para um dialeto (recebe o nome do dialeto)
+        :param column_keys: colunas de um INSERT sem ``values()``; os parâmetros têm o nome das colunas
+        """
+        self._statement = statement
+        self.column_keys = list(column_keys) if column_keys is not None else None
+        self.label = statement_label(statement) if isinstance(statement, ClauseElement) else "unknown"
+        self._statements: dict[str, ClauseElement] = {}
+        self._compiled: dict[str, CompiledStatement | None] = {}
+
+    def values(self, **values: Any) -> "BoundStatement":
+        # Called by databases with the values given to fetch_*/execute/iterate
+        return BoundStatement(self, values)
+
+    def statement(self, dialect_name: str) -> ClauseElement:
+        statement = self._statements.get(dialect_name)
+        if statement is None:
+            statement = self._statement
+            if not isinstance(statement, ClauseElement):
+                statement = statement(dialect_name)
+                self.label = statement_label(statement)
+            self._statements[dialect_name] = statement
+        return statement
+
+    def query(self, dialect_name: str, values: dict[str, Any]) -> ClauseElement:
+        """
+        O statement com os valores embutidos, para a compilação normal do backend.
+        :param dialect_name: nome do dialeto
+        :param values: valores dos parâmetros
+        :return: statement pronto para o ``_compile`` dos backends do ``databases``
+        """
+        statement = self.statement(dialect_name)
+        if not values:
+            return statement
+        if self.column_keys is not None:
+            return statement.values(**values)
+
+        # Statement.params() doesn't accept INSERT/UPDATE/DELETE: replace the parameters in any statement
+        def replace(element: Any) -> ClauseElement | None:
+            if isinstance(element, BindParameter) and element.key in values:
+                return sa.bindparam(element.key, values[element.key], type_=element.type)
+            return None
 
-database = databases.Database(settings.database_url)
+        return replacement_traverse(statement, {}, replace)
+
+    def compile(self, dialect: Dialect) -> "CompiledStatement | None":
+        """
+        Forma compilada do statement para um dialeto, montada na primeira chamada.
+        :param dialect: dialeto da conexão
+        :return: o statement compilado, ou None quando ele é compilado a cada execução
+        """
+        if dialect.name in self._compiled:
+            return self._compiled[dialect.name]
+        try:
+            compiled = CompiledStatement(self.statement(dialect.name), dialect, self.column_keys)
+        except (AttributeError, ImportError, KeyError, TypeError) as exc:
+            # Internals of SQLAlchemy/databases this class relies on are missing: compile normally
+            logger.warning("Prepared statement %r compiled on every execution: %r", self.label, exc)
+            compiled = None
+        self._compiled[dialect.name] = compiled
+        return compiled
+
+    def bind(self, dialect: Dialect, values: dict[str, Any], compile_: Callable[[ClauseElement], tuple]) -> tuple:
+        """
+        Monta o resultado de ``_compile`` dos backends do ``databases`` para uma execução.
+        :param dialect: dialeto da conexão
+        :param values: valores dos parâmetros
+        :param compile_: compilação normal do backend
+        :return: SQL, argumentos posicionais, colunas do resultado e, no SQLite, o contexto de compilação
+        """
+        compiled = self.compile(dialect)
+        if compiled is None:
+            return compile_(self.query(dialect.name, values))
+        if compiled.verified:
+            return compiled.bind(values)
+
+        expected = compile_(self.query(dialect.name, values))
+        try:
+            bound = compiled.bind(values)
+        except (KeyError, TypeError):
+            bound = None
+        if bound is None or bound[:2] != expected[:2]:
+            logger.warning("Prepared statement %r differs from the backend compilation, disabled", self.label)
+            self._compiled[dialect.name] = None
+        else:
+            compiled.verified = True
+        return expected
+
+
+class BoundStatement:
+    """
+    Um ``PreparedStatement`` com os valores de uma execução.
+    """
+    __slots__ = ("prepared", "values")
+
+    def __init__(self, prepared: PreparedStatement, values: dict[str, Any]):
+        self.prepared = prepared
+        self.values = values
+
+
+class CompiledStatement:
+    """
+    Forma compilada de um ``PreparedStatement`` para um dialeto: o SQL final e, na ordem dos parâmetros
+    posicionais, o nome e o conversor de cada parâmetro.
+    """
+    def __init__(self, statement: ClauseElement, dialect: Dialect, column_keys: list[str] | None = None):
+        compiled = statement.compile(dialect=dialect, column_keys=column_keys)
+        if "POSTCOMPILE" in compiled.string:
+            raise ValueError("Prepared statements can't have expanding (IN) parameters")
+        if compiled.insert_prefetch or compiled.update_prefetch:
+            # databases doesn't run Python-side column defaults: their values must be passed explicitly
+            raise ValueError("Prepared statements can't rely on Python-side column defaults")
+
+        # Same SQL and parameter order as the compilation done by the databases backends
+        if dialect.positional:
+            keys = list(compiled.positiontup)
+            self.sql = compiled.string
+        else:
+            keys = sorted(compiled.params)
+            self.sql = compiled.string % {key: f"${position}" for position, key in enumerate(keys, start=1)}
+        processors = compiled._bind_processors
+        self.parameters = [(key, processors.get(key)) for key in keys]
+        # Values fixed in the statement itself, such as literals in the WHERE clause
+        binds = compiled.binds
+        self.defaults = {
+            key: value for key, value in compiled.construct_params(_check=False).items() if not binds[key].required
+        }
+        self.result_columns = compiled._result_columns
+        # Set once the first execution matched the backend's own compilation
+        self.verified = False
+
+        self.context = None
+        if dialect.name == "sqlite":
+            from databases.backends.sqlite import CompilationContext
+
+            execution_context = dialect.execution_ctx_cls()
+            execution_context.dialect = dialect
+            execution_context.result_column_struct = (
+                compiled._result_columns,
+                compiled._ordered_columns,
+                compiled._textual_ordered_columns,
+                compiled._ad_hoc_textual,
+                compiled._loose_column_name_matching,
+            )
+            self.context = CompilationContext(execution_context)
+
+    def bind(self, values: dict[str, Any]) -> tuple:
+        """
+        Monta o resultado de ``_compile`` dos backends do ``databases`` para uma execução.
+        :param values: valores dos parâmetros
+        :return: SQL, argumentos posicionais, colunas do resultado e, no SQLite, o contexto de compilação
+        """
+        if self.defaults:
+            values = {**self.defaults, **values}
+        args = [values[key] if processor is None else processor(values[key]) for key, processor in self.parameters]
+        if self.context is None:
+            return self.sql, args, self.result_columns
+        return self.sql, args, self.result_columns, self.context
+
+
+def _with_prepared_statements(connection: ConnectionBackend) -> ConnectionBackend:
+    # Every fetch_*/execute/iterate of the databases backends compiles through _compile: prepared statements
+    # skip the SQLAlchemy compiler there, everything else goes to the backend's own _compile
+    compile_, dialect = connection._compile, connection._dialect
+
+    def _compile(query: Any) -> tuple:
+        if isinstance(query, BoundStatement):
+            return query.prepared.bind(dialect, query.values, compile_)
+        if isinstance(query, PreparedStatement):
+            return query.bind(dialect, {}, compile_)
+        return compile_(query)
+
+    connection._compile = _compile
+    return connection
+
+
+def statement_label(query: ClauseElement) -> str:
+    """
+    Rótulo de baixa cardinalidade de um statement: a operação e as tabelas envolvidas.
+    :param query: statement já montado pelo ``databases``
+    :return: rótulo como ``select accounts`` ou ``insert transactions``
+    """
+    if isinstance(query, BoundStatement):
+        return query.prepared.label
+    if isinstance(query, PreparedStatement):
+        return query.label
+    if isinstance(query, sa.TextClause):
+        words = query.text.split(None, 1)
+        return words[0].lower() if words else "unknown"
+    table = getattr(query, "table", None)
+    if table is not None:
+        return f"{query.__visit_name__} {table.name}"
+    if isinstance(query, sa.Select):
+        # The froms of the selected columns are enough for a label and much cheaper than get_final_froms()
+        names = set()
+        for from_ in query.columns_clause_froms:
+            if isinstance(from_, sa.Table):
+                names.add(from_.name)
+            else:
+                names.update(table.name for table in find_tables(from_))
+        return f"select {','.join(sorted(names))}" if names else "select"
+    return query.__visit_name__
+
+
+pool_acquire_seconds = registry.register(
+    Histogram("db_pool_acquire_seconds", "Time spent waiting for a database connection.")
+)
+pool_acquire_timeouts = registry.register(
+    Counter("db_pool_acquire_timeouts", "Connection acquisitions that exceeded the acquire timeout.")
+)
+query_seconds = registry.register(
+    Histogram("db_query_duration_seconds", "Database statement duration by statement label.", ["statement"])
+)
+
+
+def _backend_options(url: databases.DatabaseURL) -> dict[str, Any]:
+    if url.dialect == "sqlite":
+        return {"cached_statements": settings.database_statement_cache_size}
+    return {
+        "min_size": settings.database_pool_min_size,
+        "max_size": settings.database_pool_max_size,
+        "statement_cache_size": settings.database_statement_cache_size,
+    }
+
+
+url = databases.DatabaseURL(settings.database_url)
+database = databases.Database(url, **_backend_options(url))
+database._backend = pool = MeteredBackend(
+    database._backend,
+    max_size=settings.database_pool_max_size,
+    acquire_timeout=settings.database_pool_acquire_timeout,
+    limit=url.dialect == "sqlite",
+)
 metadata = sa.MetaData()
 
-if settings.environment == "production":
-    engine = sa.create_engine(settings.database_url)
-else:
-    engine = sa.create_engine(settings.database_url, connect_args={"check_same_thread": False})
+registry.register(Gauge("db_pool_connections_in_use", "Connections currently checked out.", lambda: pool.in_use))
+registry.register(Gauge("db_pool_connections_open", "Connections currently open.", lambda: pool.size))
+registry.register(Gauge("db_pool_waiting", "Tasks waiting for a connection.", lambda: pool.waiting))
+registry.register(Gauge("db_pool_max_size", "Maximum number of connections.", lambda: pool.max_size))
+
+
+def create_sync_engine() -> sa.Engine:
+    """
+    Cria o engine síncrono do SQLAlchemy, usado só por migrações, testes e benchmarks; a aplicação usa
+    apenas o ``database`` assíncrono.
+    :return: engine para ``settings.database_url``
+    """
+    if settings.environment == "production":
+        return sa.create_engine(settings.database_url)
+    return sa.create_engine(settings.database_url, connect_args={"check_same_thread": False})
+
+
+def __getattr__(name: str) -> Any:
+    # `engine` is built on first access, so importing the application doesn't load the sync dialect and
+    # driver (psycopg2/sqlite3)
+    if name == "engine":
+        globals()["engine"] = engine = create_sync_engine()
+        return engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,10 +4,13 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from src.controllers import account, auth, transaction
+from src.controllers import account, auth, metrics, transaction
+from src.controllers.transaction import IDEMPOTENT_REPLAYED_HEADER
 from src.database import database
-from src.exceptions import AccountNotFoundError, BusinessError
+from src.exceptions import AccountNotFoundError, BusinessError, PoolTimeoutError
 from src.config import settings
+from src.metrics import Counter, MetricsMiddleware, registry
+from src.pagination import NEXT_CURSOR_HEADER
 
 
 @asynccontextmanager
@@ -43,12 +46,17 @@ Transactions API is the microservice for recording current account transactions.
 ## Account
 
 * **Create accounts**.
+* **Create accounts in batch**.
 * **List accounts**.
+* **Read an account by ID** (served from an in-process cache).
 * **List account transactions by ID**.
+* **Export account statement** (streamed NDJSON or CSV).
+* **Read account balance at a point in time**.
 
 ## Transaction
 
-* **Create transactions**.
+* **Create transactions** (safe to retry with an `Idempotency-Key` header).
+* **Create transactions in batch** (JSON array or NDJSON).
 """,
     openapi_tags=tags_metadata,
     redoc_url=None,
@@ -63,18 +71,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAYED_HEADER],
 )
 
 app.include_router(auth.router, tags=["auth"])
 app.include_router(account.router, tags=["account"])
 app.include_router(transaction.router, tags=["transaction"])
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+
+errors = registry.register(Counter("app_errors", "Domain errors returned to clients.", ["error"]))
+
 
 @app.exception_handler(AccountNotFoundError)
 async def account_not_found_error_handler(request: Request, exc: AccountNotFoundError):
+    errors.inc(error="AccountNotFoundError")
     return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Account not found."})
 
 
 @app.exception_handler(BusinessError)
 async def business_error_handler(request: Request, exc: BusinessError):
+    errors.inc(error="BusinessError")
     return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_error_handler(request: Request, exc: PoolTimeoutError):
+    errors.inc(error="PoolTimeoutError")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Database is busy, try again later."}
+    )
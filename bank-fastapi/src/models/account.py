@@ -7,6 +7,7 @@ accounts = sa.Table(
     metadata,
     sa.Column("id", sa.Integer, primary_key=True),
     sa.Column("user_id", sa.Integer, nullable=False, index=True),
-    sa.Column("balance", sa.Numeric(10, 2), nullable=False, default=0),
+    # Money columns hold integer cents
+    sa.Column("balance", sa.BigInteger, nullable=False, default=0),
     sa.Column("created_at", sa.TIMESTAMP(timezone=True), default=sa.func.now()),
 )
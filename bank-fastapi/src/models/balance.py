@@ -0,0 +1,12 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+
+# Closing balance (in cents) of each account at the end of every day (UTC) with movements
+account_daily_balances = sa.Table(
+    "account_daily_balances",
+    metadata,
+    sa.Column("account_id", sa.Integer, sa.ForeignKey("accounts.id"), primary_key=True),
+    sa.Column("day", sa.Date, primary_key=True),
+    sa.Column("balance", sa.BigInteger, nullable=False),
+)
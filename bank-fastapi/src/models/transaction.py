@@ -1,6 +1,7 @@
 from enum import Enum
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
 
 from src.database import metadata
 
@@ -10,12 +11,25 @@ class TransactionType(str, Enum):
     WITHDRAWAL = "withdrawal"
 
 
+# SQLite stores CURRENT_TIMESTAMP without microseconds; binding datetimes in the same format
+# keeps keyset comparisons on (timestamp, id) consistent with the stored values
+Timestamp = sa.TIMESTAMP(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 transactions = sa.Table(
     "transactions",
     metadata,
     sa.Column("id", sa.Integer, primary_key=True),
     sa.Column("account_id", sa.Integer, sa.ForeignKey("accounts.id"), nullable=False),
     sa.Column("type", sa.Enum(TransactionType, name="transaction_types"), nullable=False),
-    sa.Column("amount", sa.Numeric(10, 2), nullable=False),
-    sa.Column("timestamp", sa.TIMESTAMP(timezone=True), default=sa.func.now()),
+    sa.Column("amount", sa.BigInteger, nullable=False),
+    sa.Column("timestamp", Timestamp, nullable=False, default=sa.func.now()),
+    # Client-supplied Idempotency-Key, prefixed with the user id
+    sa.Column("idempotency_key", sa.String(300), nullable=True),
+    # Keyset pagination of an account's transactions; type and amount make it a covering index for the
+    # account summary aggregation
+    sa.Index("ix_transactions_account_id_timestamp_id_type_amount", "account_id", "timestamp", "id", "type", "amount"),
+    sa.Index("ux_transactions_idempotency_key", "idempotency_key", unique=True),
 )
@@ -0,0 +1,75 @@
+import math
+import re
+from decimal import Decimal
+from typing import Annotated, Any
+
+from pydantic import BeforeValidator, Field, PlainSerializer, WithJsonSchema
+
+CENTS = 100
+
+_AMOUNT = re.compile(r"(-?)(\d+)(?:\.(\d{1,2}))?")
+
+
+def to_cents(value: Any) -> int:
+    """
+    Converte um valor monetário recebido (inteiro, decimal, texto ou número JSON) em centavos, sem aritmética
+    de ponto flutuante sobre o valor final.
+    :param value: valor em reais, com no máximo duas casas decimais
+    :return: valor em centavos
+    """
+    if type(value) is float:
+        # JSON numbers arrive as floats: the float is accepted only if it is exactly the nearest float to a
+        # whole number of cents, i.e. the client wrote at most two decimal places
+        if not math.isfinite(value):
+            raise ValueError("amount must be a finite number")
+        cents = round(value * CENTS)
+        if cents / CENTS != value:
+            raise ValueError("amount must have at most 2 decimal places")
+        return cents
+    if type(value) is int:
+        return value * CENTS
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            raise ValueError("amount must be a finite number")
+        cents = value.scaleb(2)
+        if cents != cents.to_integral_value():
+            raise ValueError("amount must have at most 2 decimal places")
+        return int(cents)
+    if isinstance(value, str):
+        match = _AMOUNT.fullmatch(value.strip())
+        if not match:
+            raise ValueError("amount must be a number with at most 2 decimal places")
+        sign, units, fraction = match.groups()
+        cents = int(units) * CENTS + int((fraction or "").ljust(2, "0"))
+        return -cents if sign else cents
+    raise ValueError("amount must be a number")
+
+
+def from_cents(cents: int) -> float:
+    """
+    Valor em reais para a resposta JSON. Para valores até 2**53 centavos a divisão devolve o float mais próximo
+    do valor decimal exato, que é serializado com as mesmas (no máximo duas) casas decimais.
+    """
+    return cents / CENTS
+
+
+def format_cents(cents: int) -> str:
+    """
+    Valor em reais com duas casas decimais (``1234.50``), para exportações em texto.
+    """
+    units, remainder = divmod(abs(cents), CENTS)
+    return f"{'-' if cents < 0 else ''}{units}.{remainder:02d}"
+
+
+# Amounts are integer cents everywhere inside the service; the API keeps exchanging numbers in reais with the
+# same OpenAPI schema as before
+_serializer = PlainSerializer(from_cents, return_type=float, when_used="json")
+
+Money = Annotated[int, BeforeValidator(to_cents), _serializer, WithJsonSchema({"type": "number"})]
+PositiveMoney = Annotated[
+    int, BeforeValidator(to_cents), Field(gt=0), _serializer, WithJsonSchema({"type": "number", "exclusiveMinimum": 0})
+]
+
+# Responses are built from rows that already hold cents: no conversion on the way in
+MoneyOut = Annotated[int, _serializer, WithJsonSchema({"type": "number"})]
+PositiveMoneyOut = Annotated[int, _serializer, WithJsonSchema({"type": "number", "exclusiveMinimum": 0})]
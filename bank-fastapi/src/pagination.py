@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Gera um cursor opaco a partir da chave de ordenação do último item da página.
+    :param values: valores da chave (datetimes são serializados em ISO 8601)
+    :return: cursor em base64 url-safe
+    """
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """
+    Decodifica um cursor gerado por ``encode_cursor``.
+    :param cursor: cursor recebido do cliente
+    :param types: tipo esperado de cada valor da chave
+    :return: valores da chave convertidos
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(value) if type_ is datetime else type_(value) for type_, value in zip(types, values)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
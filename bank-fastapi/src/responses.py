@@ -0,0 +1,139 @@
+import json
+from collections.abc import Callable, Sequence
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from databases.backends.common.records import DIALECT_EXCLUDE
+from databases.interfaces import Record
+from fastapi import Response, status
+from pydantic import BaseModel, PlainSerializer
+from pydantic.fields import FieldInfo
+
+from src.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional, the json module gives the same output
+    orjson = None
+
+
+class RecordsJSON:
+    """
+    Serializa listas de Records do ``databases`` em JSON em uma única passada, sem validar cada linha em um
+    modelo pydantic. Cada campo do modelo de resposta é lido pela posição da sua coluna no resultado, com o
+    conversor do campo (``MoneyOut`` em reais, por exemplo) resolvido uma vez por formato de resultado.
+
+    O modelo continua declarado no ``response_model`` da rota e define o schema do OpenAPI; o JSON gerado é o
+    mesmo da serialização pelo pydantic. Serve para modelos planos, em que todo campo é uma coluna do resultado.
+    """
+    def __init__(self, model: type[BaseModel]):
+        self.model = model
+        self.fields = [(name, _json_serializer(field)) for name, field in model.model_fields.items()]
+        self._plans: dict[tuple, tuple] = {}
+
+    def encode(self, records: Sequence[Record]) -> bytes:
+        """
+        Serializa os Records em um array JSON.
+        :param records: linhas de uma mesma consulta
+        :return: JSON em bytes
+        """
+        items = []
+        if records:
+            plan = self._plan(records[0])
+            for record in records:
+                values = record._mapping
+                item = {}
+                for name, index, convert in plan:
+                    value = values[index]
+                    item[name] = value if convert is None or value is None else convert(value)
+                items.append(item)
+        return dumps(items)
+
+    def response(
+        self, records: Sequence[Record], response: Response | None = None, status_code: int = status.HTTP_200_OK
+    ) -> Response | Sequence[Record]:
+        """
+        Resposta já serializada para a rota devolver. Com ``FAST_JSON_RESPONSES=false`` devolve os próprios
+        Records, validados e serializados pelo ``response_model`` como nas demais rotas.
+        :param records: linhas da resposta
+        :param response: ``Response`` injetado na rota, cujos cabeçalhos são copiados para a resposta
+        :param status_code: status da resposta, o mesmo declarado na rota
+        :return: resposta JSON, ou os Records
+        """
+        if not settings.fast_json_responses:
+            return records
+        rendered = Response(self.encode(records), status_code=status_code, media_type="application/json")
+        if response is not None:
+            # Same as FastAPI does with the headers set on the injected response
+            rendered.headers.raw.extend(response.headers.raw)
+        return rendered
+
+    def _plan(self, record: Record) -> tuple:
+        # (field, column position, converter) for every field, cached by the columns of the result
+        keys = tuple(record.keys())
+        dialect = getattr(record, "_dialect", None)
+        cache_key = (dialect and dialect.name, keys)
+        plan = self._plans.get(cache_key)
+        if plan is None:
+            processors = _result_processors(record, dialect)
+            plan = []
+            for name, serializer in self.fields:
+                if name not in keys:
+                    raise ValueError(f"{self.model.__name__}.{name} isn't a column of the result")
+                index = keys.index(name)
+                plan.append((name, index, _chain(processors.get(name), serializer)))
+            plan = self._plans[cache_key] = tuple(plan)
+        return plan
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serializa em JSON compacto com orjson, ou com o módulo json quando o orjson não está instalado.
+    Datetimes em UTC saem com ``Z``, como na serialização do pydantic.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode()
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if value.utcoffset() == timedelta(0) else text
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_serializer(field: FieldInfo) -> Callable[[Any], Any] | None:
+    # Fields annotated with a PlainSerializer (money in cents) are converted the same way pydantic does
+    for metadata in field.metadata:
+        if isinstance(metadata, PlainSerializer) and metadata.when_used in ("always", "json"):
+            return metadata.func
+    return None
+
+
+def _result_processors(record: Record, dialect: Any) -> dict[str, Callable[[Any], Any]]:
+    # On Postgres the databases Record keeps the raw asyncpg row and converts each value when it is read
+    # (enum names into TransactionType, for example); reading by position needs the same conversion
+    if dialect is None or dialect.name not in DIALECT_EXCLUDE:
+        return {}
+    processors = {}
+    for key, (_, datatype) in record._column_map.items():
+        processor = datatype._cached_result_processor(dialect, None)
+        if processor is not None:
+            processors[key] = _raw_only(processor)
+    return processors
+
+
+def _raw_only(processor: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def convert(value: Any) -> Any:
+        return processor(value) if isinstance(value, (int, str, float)) else value
+
+    return convert
+
+
+def _chain(first: Callable[[Any], Any] | None, second: Callable[[Any], Any] | None) -> Callable[[Any], Any] | None:
+    if first is None or second is None:
+        return first or second
+    return lambda value: second(first(value))
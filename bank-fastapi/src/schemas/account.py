@@ -1,9 +1,11 @@
-from pydantic import BaseModel, PositiveFloat, Field, field_validator
+from pydantic import BaseModel, Field, field_validator
+
+from src.money import CENTS, PositiveMoney
 
 
 class AccountIn(BaseModel):
     user_id: int = Field(..., gt=0, example=123)
-    balance: PositiveFloat = Field(..., example=100.0)
+    balance: PositiveMoney = Field(..., example=100.0)
 
     @field_validator('user_id')
     @classmethod
@@ -15,6 +17,6 @@ class AccountIn(BaseModel):
     @field_validator('balance')
     @classmethod
     def balance_must_be_reasonable(cls, v):
-        if v > 1000000:
+        if v > 1000000 * CENTS:
             raise ValueError('balance muito alto')
         return v
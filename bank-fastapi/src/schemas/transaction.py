@@ -1,6 +1,8 @@
 from enum import Enum
 
-from pydantic import BaseModel, PositiveFloat
+from pydantic import BaseModel
+
+from src.money import PositiveMoney
 
 
 class TransactionType(Enum):
@@ -11,7 +13,7 @@ class TransactionType(Enum):
 class TransactionIn(BaseModel):
     account_id: int
     type: TransactionType
-    amount: PositiveFloat
+    amount: PositiveMoney
 
     class Config:
         use_enum_values = True
@@ -1,13 +1,15 @@
+import hashlib
 import time
 from typing import Annotated
 from uuid import uuid4
 
-import jwt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 
+from src.cache import LRUCache
 from src.config import settings
+from src.metrics import Counter, Gauge, hit_ratio, registry
 
 SECRET = settings.jwt_secret
 ALGORITHM = settings.jwt_algorithm
@@ -38,11 +40,16 @@ def sign_jwt(user_id: int) -> JWTToken:
         "nbf": now,
         "jti": uuid4().hex,
     }
+    import jwt
+
     token = jwt.encode(payload, SECRET, algorithm=ALGORITHM)
     return {"access_token": token}
 
 
 async def decode_jwt(token: str) -> JWTToken | None:
+    # PyJWT is loaded by the first token signed or verified, not at startup
+    import jwt
+
     try:
         decoded_token = jwt.decode(token, SECRET, audience="desafio-bank", algorithms=[ALGORITHM])
         _token = JWTToken.model_validate({"access_token": decoded_token})
@@ -51,6 +58,39 @@ async def decode_jwt(token: str) -> JWTToken | None:
         return None
 
 
+class TokenCache(LRUCache):
+    """
+    Cache LRU de tokens já validados, indexado pelo hash do token.
+    Cada entrada deixa de valer no ``exp`` do próprio token.
+    """
+    def __init__(self, maxsize: int):
+        # exp is a wall-clock timestamp; time.time is looked up on each call so tests can replace it
+        super().__init__(maxsize, clock=lambda: time.time())
+
+    def get(self, token: str) -> JWTToken | None:
+        return super().get(hashlib.sha256(token.encode()).digest())
+
+    def set(self, token: str, value: JWTToken) -> None:
+        super().set(hashlib.sha256(token.encode()).digest(), value, expires_at=value.access_token.exp)
+
+
+token_cache = TokenCache(maxsize=settings.jwt_cache_size)
+
+jwt_cache_requests = registry.register(
+    Counter("jwt_cache_requests", "Bearer token verifications by cache result.", ["result"])
+)
+registry.register(
+    Gauge("jwt_cache_entries", "Verified tokens currently cached in process.", lambda: token_cache.stats()["size"])
+)
+registry.register(
+    Gauge(
+        "jwt_cache_hit_ratio",
+        "Share of bearer token verifications served from the cache.",
+        lambda: hit_ratio(jwt_cache_requests.value(result="hit"), jwt_cache_requests.value(result="miss")),
+    )
+)
+
+
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True):
         super(JWTBearer, self).__init__(auto_error=auto_error)
@@ -66,12 +106,19 @@ class JWTBearer(HTTPBearer):
                     detail="Invalid authentication scheme.",
                 )
 
+            payload = token_cache.get(credentials)
+            if payload:
+                jwt_cache_requests.inc(result="hit")
+                return payload
+
+            jwt_cache_requests.inc(result="miss")
             payload = await decode_jwt(credentials)
             if not payload:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid or expired token.",
                 )
+            token_cache.set(credentials, payload)
             return payload
         else:
             raise HTTPException(
@@ -1,23 +1,92 @@
+from collections.abc import Iterable
+
+import sqlalchemy as sa
 from databases.interfaces import Record
 
-from src.database import database
+from src.cache import CacheBackend, MemoryCacheBackend
+from src.config import settings
+from src.database import PreparedStatement, database
+from src.exceptions import AccountNotFoundError
+from src.metrics import Counter, Gauge, hit_ratio, registry
 from src.models.account import accounts
 from src.schemas.account import AccountIn
+from src.services.balance import BalanceService
+
+BATCH_CHUNK_SIZE = 500
+
+# Hot queries, compiled once per dialect
+SELECT_ACCOUNT = PreparedStatement(accounts.select().where(accounts.c.id == sa.bindparam("account_id")))
+SELECT_ACCOUNTS_PAGE = PreparedStatement(
+    accounts.select().order_by(accounts.c.id).limit(sa.bindparam("limit")).offset(sa.bindparam("skip"))
+)
+SELECT_ACCOUNTS_AFTER = PreparedStatement(
+    accounts.select().where(accounts.c.id > sa.bindparam("after")).order_by(accounts.c.id).limit(sa.bindparam("limit"))
+)
+
+account_cache = MemoryCacheBackend(maxsize=settings.account_cache_size, ttl=settings.account_cache_ttl)
+
+account_cache_requests = registry.register(
+    Counter("account_cache_requests", "Account lookups by cache result.", ["result"])
+)
+registry.register(
+    Gauge("account_cache_entries", "Accounts currently cached in process.", lambda: account_cache.stats()["size"])
+)
+registry.register(
+    Gauge(
+        "account_cache_hit_ratio",
+        "Share of account lookups served from the cache.",
+        lambda: hit_ratio(account_cache_requests.value(result="hit"), account_cache_requests.value(result="miss")),
+    )
+)
 
 
 class AccountService:
     """
     Serviço responsável pelas operações de conta corrente no banco de dados.
     """
-    async def read_all(self, limit: int, skip: int = 0) -> list[Record]:
+    def __init__(self, balance_service: BalanceService | None = None, cache: CacheBackend | None = None):
+        self.balance_service = balance_service or BalanceService()
+        self.cache = cache or account_cache
+
+    async def read_all(self, limit: int, skip: int = 0, after: int | None = None) -> list[Record]:
         """
-        Lista todas as contas com paginação.
+        Lista todas as contas com paginação, ordenadas por id.
         :param limit: número máximo de contas a retornar
-        :param skip: número de contas a pular
+        :param skip: número de contas a pular (ignorado quando ``after`` é informado)
+        :param after: id da última conta da página anterior (paginação por cursor)
         :return: lista de contas
         """
-        query = accounts.select().limit(limit).offset(skip)
-        return await database.fetch_all(query)
+        if after is not None:
+            return await database.fetch_all(SELECT_ACCOUNTS_AFTER, {"after": after, "limit": limit})
+        return await database.fetch_all(SELECT_ACCOUNTS_PAGE, {"skip": skip, "limit": limit})
+
+    async def read(self, account_id: int) -> dict:
+        """
+        Busca uma conta pelo id, passando pelo cache (read-through).
+        :param account_id: id da conta
+        :return: conta encontrada, com as colunas da tabela
+        """
+        key = _cache_key(account_id)
+        account = await self.cache.get(key)
+        if account is not None:
+            account_cache_requests.inc(result="hit")
+            return account
+
+        account_cache_requests.inc(result="miss")
+        row = await database.fetch_one(SELECT_ACCOUNT, {"account_id": account_id})
+        if not row:
+            raise AccountNotFoundError
+        account = dict(row._mapping)
+        await self.cache.set(key, account)
+        return account
+
+    async def invalidate(self, account_ids: Iterable[int]) -> None:
+        """
+        Remove contas do cache. O caminho de escrita chama depois do commit: se fosse antes, uma leitura
+        concorrente poderia gravar de novo no cache o saldo anterior.
+        :param account_ids: ids das contas alteradas
+        """
+        await self.cache.delete(*(_cache_key(account_id) for account_id in account_ids))
 
     async def create(self, account: AccountIn) -> Record:
         """
@@ -25,8 +94,46 @@ class AccountService:
         :param account: dados da conta
         :return: conta criada
         """
-        command = accounts.insert().values(user_id=account.user_id, balance=account.balance)
-        account_id = await database.execute(command)
+        return (await self.create_many([account]))[0]
+
+    @database.transaction()
+    async def create_many(self, items: list[AccountIn]) -> list[Record]:
+        """
+        Cria várias contas correntes em um único commit, com um INSERT multi-linha (``RETURNING``) por bloco
+        de ``BATCH_CHUNK_SIZE`` contas.
+        :param items: dados das contas
+        :return: contas criadas, na ordem recebida
+        """
+        rows = [{"user_id": item.user_id, "balance": item.balance} for item in items]
+        created: list[Record] = []
+        for start in range(0, len(rows), BATCH_CHUNK_SIZE):
+            chunk = rows[start : start + BATCH_CHUNK_SIZE]
+            if _insert_returning():
+                command = accounts.insert().values(chunk).returning(*accounts.c)
+                # Ids follow the order of the VALUES list
+                created.extend(sorted(await database.fetch_all(command), key=lambda row: row.id))
+            else:
+                created.extend(await self.__insert_many(chunk))
+        await self.balance_service.record([(row.id, row.created_at, row.balance) for row in created])
+        return created
+
+    async def __insert_many(self, rows: list[dict]) -> list[Record]:
+        # The transaction holds SQLite's write lock from the first insert on, so the chunk gets consecutive
+        # rowids ending at last_insert_rowid()
+        await database.execute_many(accounts.insert(), rows)
+        last_id = await database.fetch_val(sa.text("SELECT last_insert_rowid()"))
+        query = accounts.select().where(accounts.c.id.between(last_id - len(rows) + 1, last_id)).order_by(accounts.c.id)
+        return await database.fetch_all(query)
+
+
+def _insert_returning() -> bool:
+    # INSERT ... RETURNING needs SQLite 3.35+; older libraries insert with executemany and read the rows back
+    if database.url.dialect != "sqlite":
+        return True
+    import sqlite3
+
+    return sqlite3.sqlite_version_info >= (3, 35)
+
 
-        query = accounts.select().where(accounts.c.id == account_id)
-        return await database.fetch_one(query)
+def _cache_key(account_id: int) -> str:
+    return f"account:{account_id}"
@@ -0,0 +1,166 @@
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta, timezone
+
+import sqlalchemy as sa
+
+from src.database import PreparedStatement, database
+from src.exceptions import AccountNotFoundError
+from src.models.account import accounts
+from src.models.balance import account_daily_balances
+from src.models.transaction import TransactionType, transactions
+
+UPSERT_CHUNK_SIZE = 500
+
+
+def _upsert_command(dialect: str) -> sa.Insert:
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    command = insert(account_daily_balances)
+    return command.on_conflict_do_update(
+        index_elements=[account_daily_balances.c.account_id, account_daily_balances.c.day],
+        set_={"balance": command.excluded.balance},
+    )
+
+
+# Single-day upsert of every transaction, compiled once per dialect
+UPSERT_DAILY_BALANCE = PreparedStatement(_upsert_command, column_keys=["account_id", "day", "balance"])
+
+
+class BalanceService:
+    """
+    Serviço responsável pelos saldos diários consolidados (UTC) das contas.
+    """
+    async def record(self, movements: Iterable[tuple[int, datetime, int]]) -> None:
+        """
+        Grava o saldo de fechamento do dia de cada movimento, sobrescrevendo o saldo já consolidado.
+        :param movements: tuplas (id da conta, momento do movimento, saldo em centavos após o movimento)
+        """
+        rows = [
+            {"account_id": account_id, "day": _day(moment), "balance": balance}
+            for account_id, moment, balance in movements
+        ]
+        await self.__upsert(rows)
+
+    async def read_at(self, account_id: int, at: datetime | None = None) -> int:
+        """
+        Calcula o saldo de uma conta em um instante a partir do último saldo diário consolidado e dos
+        movimentos posteriores a ``at`` no mesmo dia.
+        :param account_id: id da conta
+        :param at: instante desejado (sem fuso é tratado como UTC); o saldo atual quando omitido
+        :return: saldo em centavos no instante informado, zero antes da criação da conta
+        """
+        query = (
+            accounts.select()
+            .with_only_columns(accounts.c.balance, accounts.c.created_at)
+            .where(accounts.c.id == account_id)
+        )
+        account = await database.fetch_one(query)
+        if not account:
+            raise AccountNotFoundError
+        if at is None:
+            return account.balance
+
+        at = _utc(at)
+        if account.created_at is not None and at < _utc(account.created_at):
+            return 0
+        query = (
+            account_daily_balances.select()
+            .where(account_daily_balances.c.account_id == account_id, account_daily_balances.c.day <= at.date())
+            .order_by(account_daily_balances.c.day.desc())
+            .limit(1)
+        )
+        snapshot = await database.fetch_one(query)
+        if not snapshot:
+            return 0
+        if snapshot.day < at.date():
+            return snapshot.balance
+
+        # The snapshot holds the closing balance of the day: undo what happened after `at`
+        end_of_day = datetime.combine(at.date() + timedelta(days=1), time(), tzinfo=timezone.utc)
+        query = sa.select(sa.func.coalesce(sa.func.sum(_signed_amount()), 0)).where(
+            transactions.c.account_id == account_id,
+            transactions.c.timestamp > at,
+            transactions.c.timestamp < end_of_day,
+        )
+        # SUM over BIGINT is NUMERIC on Postgres
+        return snapshot.balance - int(await database.fetch_val(query))
+
+    @database.transaction()
+    async def backfill(self) -> int:
+        """
+        Reconstrói todos os saldos diários a partir do histórico de transações.
+        :return: quantidade de saldos diários gravados
+        """
+        await database.execute(account_daily_balances.delete())
+
+        # Opening balance of each account: current balance minus everything that was moved
+        query = (
+            sa.select(
+                accounts.c.id,
+                accounts.c.created_at,
+                (accounts.c.balance - sa.func.coalesce(sa.func.sum(_signed_amount()), 0)).label("opening"),
+            )
+            .select_from(accounts.outerjoin(transactions, transactions.c.account_id == accounts.c.id))
+            .group_by(accounts.c.id, accounts.c.created_at, accounts.c.balance)
+        )
+        balances: dict[int, int] = {}
+        rows: list[dict] = []
+        for row in await database.fetch_all(query):
+            balances[row.id] = int(row.opening)
+            if row.created_at is not None:
+                rows.append({"account_id": row.id, "day": _day(row.created_at), "balance": balances[row.id]})
+
+        if database.url.dialect == "postgresql":
+            tx_day = sa.cast(sa.func.timezone("UTC", transactions.c.timestamp), sa.Date)
+        else:
+            tx_day = sa.func.date(transactions.c.timestamp, type_=sa.Date)
+        count = await self.__upsert(rows)
+
+        # Walk the history by ranges of accounts; the connection can't run the upserts while
+        # a cursor is still open on it
+        account_ids = sorted(balances)
+        for start in range(0, len(account_ids), UPSERT_CHUNK_SIZE):
+            chunk = account_ids[start : start + UPSERT_CHUNK_SIZE]
+            query = (
+                sa.select(transactions.c.account_id, tx_day.label("day"), sa.func.sum(_signed_amount()).label("delta"))
+                .where(transactions.c.account_id.between(chunk[0], chunk[-1]))
+                .group_by(transactions.c.account_id, tx_day)
+                .order_by(transactions.c.account_id, tx_day)
+            )
+            rows = []
+            for row in await database.fetch_all(query):
+                balances[row.account_id] += int(row.delta)
+                rows.append({"account_id": row.account_id, "day": row.day, "balance": balances[row.account_id]})
+            count += await self.__upsert(rows)
+        return count
+
+    async def __upsert(self, rows: list[dict]) -> int:
+        # A day may appear more than once in a chunk; the latest balance wins
+        rows = list({(row["account_id"], row["day"]): row for row in rows}.values())
+        if len(rows) == 1:
+            await database.execute(UPSERT_DAILY_BALANCE, rows[0])
+            return 1
+
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            command = _upsert_command(database.url.dialect).values(rows[start : start + UPSERT_CHUNK_SIZE])
+            await database.execute(command)
+        return len(rows)
+
+
+def _signed_amount() -> sa.ColumnElement:
+    return sa.case(
+        (transactions.c.type == TransactionType.WITHDRAWAL, -transactions.c.amount), else_=transactions.c.amount
+    )
+
+
+def _utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _day(moment: datetime) -> date:
+    return _utc(moment).date()
@@ -0,0 +1,117 @@
+import asyncio
+from collections import deque
+
+from databases.interfaces import Record
+
+from src.exceptions import AccountNotFoundError, BusinessError
+from src.metrics import Histogram, registry
+from src.schemas.transaction import TransactionIn
+from src.services.transaction import ACCOUNT_NOT_FOUND, TransactionService
+
+Pending = tuple[TransactionIn, asyncio.Future]
+
+coalesced_transactions = registry.register(
+    Histogram(
+        "transactions_coalesced",
+        "Transactions applied together for one account in a single database transaction.",
+        buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+    )
+)
+
+
+class TransactionScheduler:
+    """
+    Serializa no processo as transações de cada conta e agrupa as rajadas de uma mesma conta.
+
+    Cada conta tem uma fila; o acesso a ela é protegido por um lock escolhido entre ``stripes`` locks
+    (lock striping, ``account_id % stripes``). Quem obtém o lock aplica de uma vez tudo o que já está na fila
+    da conta, até ``limit`` transações, em uma única transação do banco com um único UPDATE do saldo e um
+    INSERT multi-linha; as requisições agrupadas recebem o resultado sem ir ao banco.
+    """
+    def __init__(self, service: TransactionService, stripes: int, limit: int):
+        self.service = service
+        self.stripes = stripes
+        self.limit = limit
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._locks: list[asyncio.Lock] = []
+        self._queues: dict[int, deque[Pending]] = {}
+
+    async def submit(self, transaction: TransactionIn) -> Record:
+        """
+        Aplica uma transação, possivelmente agrupada com outras da mesma conta.
+        :param transaction: transação a aplicar
+        :return: a transação criada
+        """
+        lock = self.__lock(transaction.account_id)
+        pending = (transaction, self._loop.create_future())
+        self._queues.setdefault(transaction.account_id, deque()).append(pending)
+        try:
+            async with lock:
+                while not pending[1].done():
+                    group = self.__take(transaction.account_id)
+                    try:
+                        await self.__apply(group)
+                    except BaseException:
+                        # The other requests are still waiting for the lock: one of them applies their items
+                        self.__requeue(transaction.account_id, [item for item in group if item is not pending])
+                        raise
+        except BaseException:
+            # A cancelled request that wasn't applied yet must not be applied later by someone else
+            queue = self._queues.get(transaction.account_id)
+            if not pending[1].done() and queue and pending in queue:
+                queue.remove(pending)
+                if not queue:
+                    del self._queues[transaction.account_id]
+            raise
+        return pending[1].result()
+
+    def __lock(self, account_id: int) -> asyncio.Lock:
+        # Locks and futures are bound to the loop that uses them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._locks = [asyncio.Lock() for _ in range(self.stripes)]
+            self._queues = {}
+        return self._locks[account_id % self.stripes]
+
+    def __take(self, account_id: int) -> list[Pending]:
+        queue = self._queues[account_id]
+        group = [queue.popleft() for _ in range(min(self.limit, len(queue)))]
+        if not queue:
+            del self._queues[account_id]
+        return group
+
+    def __requeue(self, account_id: int, group: list[Pending]) -> None:
+        queue = self._queues.setdefault(account_id, deque())
+        queue.extendleft(reversed([item for item in group if not item[1].done()]))
+        if not queue:
+            del self._queues[account_id]
+
+    async def __apply(self, group: list[Pending]) -> None:
+        coalesced_transactions.observe(len(group))
+        if len(group) == 1:
+            await self.__apply_one(*group[0])
+            return
+
+        try:
+            results = await self.service.create_batch([transaction for transaction, _ in group])
+        except BusinessError:
+            # Another writer changed the balance between the read and the UPDATE: nothing was applied
+            for transaction, future in group:
+                await self.__apply_one(transaction, future)
+            return
+
+        for (_, future), result in zip(group, results):
+            if result["status"] == "created":
+                future.set_result(result["transaction"])
+            elif result["detail"] == ACCOUNT_NOT_FOUND:
+                future.set_exception(AccountNotFoundError())
+            else:
+                future.set_exception(BusinessError(result["detail"]))
+
+    async def __apply_one(self, transaction: TransactionIn, future: asyncio.Future) -> None:
+        try:
+            future.set_result(await self.service.create(transaction))
+        except (AccountNotFoundError, BusinessError) as exc:
+            future.set_exception(exc)
+
@@ -1,47 +1,390 @@
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+import sqlalchemy as sa
 from databases.interfaces import Record
 
-from src.database import database
+from src.cache import LRUCache
+from src.config import settings
+from src.database import PreparedStatement, database
 from src.exceptions import AccountNotFoundError, BusinessError
+from src.metrics import Counter, registry
 from src.models.account import accounts
 from src.models.transaction import TransactionType, transactions
 from src.schemas.transaction import TransactionIn
+from src.services.account import AccountService
+from src.services.balance import BalanceService, _utc
+
+BATCH_CHUNK_SIZE = 500
+
+# Hot statements, compiled once per dialect
+SELECT_TRANSACTIONS_PAGE = PreparedStatement(
+    transactions.select()
+    .where(transactions.c.account_id == sa.bindparam("account_id"))
+    .order_by(transactions.c.timestamp, transactions.c.id)
+    .limit(sa.bindparam("limit"))
+    .offset(sa.bindparam("skip"))
+)
+# Keyset pagination, served by ix_transactions_account_id_timestamp_id_type_amount
+SELECT_TRANSACTIONS_AFTER = PreparedStatement(
+    transactions.select()
+    .where(
+        transactions.c.account_id == sa.bindparam("account_id"),
+        sa.tuple_(transactions.c.timestamp, transactions.c.id)
+        > sa.tuple_(
+            sa.bindparam("after_timestamp", type_=transactions.c.timestamp.type),
+            sa.bindparam("after_id", type_=transactions.c.id.type),
+        ),
+    )
+    .order_by(transactions.c.timestamp, transactions.c.id)
+    .limit(sa.bindparam("limit"))
+)
+DEPOSIT = PreparedStatement(
+    accounts.update()
+    .where(accounts.c.id == sa.bindparam("account_id"))
+    .values(balance=accounts.c.balance + sa.bindparam("amount", type_=accounts.c.balance.type))
+    .returning(accounts.c.balance)
+)
+WITHDRAW = PreparedStatement(
+    accounts.update()
+    .where(accounts.c.id == sa.bindparam("account_id"), accounts.c.balance >= sa.bindparam("amount"))
+    .values(balance=accounts.c.balance - sa.bindparam("amount", type_=accounts.c.balance.type))
+    .returning(accounts.c.balance)
+)
+INSERT_TRANSACTION = PreparedStatement(
+    transactions.insert().returning(*transactions.c), column_keys=["account_id", "type", "amount"]
+)
+
+ACCOUNT_NOT_FOUND = "Account not found."
+LACK_OF_BALANCE = "Operation not carried out due to lack of balance"
+
+transactions_created = registry.register(
+    Counter("transactions_created", "Transactions applied to accounts by type.", ["type"])
+)
+withdrawals_rejected = registry.register(
+    Counter("withdrawals_rejected", "Withdrawals rejected for lack of balance.")
+)
+idempotent_replays = registry.register(
+    Counter("idempotent_replays", "Transactions answered from an already used Idempotency-Key.", ["source"])
+)
 
 
 class TransactionService:
-    async def read_all(self, account_id: int, limit: int, skip: int = 0) -> list[Record]:
-        query = transactions.select().where(transactions.c.account_id == account_id).limit(limit).offset(skip)
-        return await database.fetch_all(query)
+    def __init__(
+        self,
+        balance_service: BalanceService | None = None,
+        idempotency_cache: LRUCache | None = None,
+        account_service: AccountService | None = None,
+    ):
+        self.balance_service = balance_service or BalanceService()
+        self.idempotency_cache = idempotency_cache or LRUCache(maxsize=settings.idempotency_cache_size)
+        self.account_service = account_service or AccountService(self.balance_service)
+
+    async def read_all(
+        self, account_id: int, limit: int, skip: int = 0, after: tuple[datetime, int] | None = None
+    ) -> list[Record]:
+        if after is not None:
+            values = {"account_id": account_id, "after_timestamp": after[0], "after_id": after[1], "limit": limit}
+            return await database.fetch_all(SELECT_TRANSACTIONS_AFTER, values)
+        values = {"account_id": account_id, "skip": skip, "limit": limit}
+        return await database.fetch_all(SELECT_TRANSACTIONS_PAGE, values)
+
+    async def iterate(
+        self, account_id: int, start: datetime | None = None, end: datetime | None = None
+    ) -> AsyncIterator[Record]:
+        query = (
+            transactions.select()
+            .where(transactions.c.account_id == account_id)
+            .order_by(transactions.c.timestamp, transactions.c.id)
+        )
+        if start is not None:
+            query = query.where(transactions.c.timestamp >= start)
+        if end is not None:
+            query = query.where(transactions.c.timestamp < end)
+        async for row in database.iterate(query):
+            yield row
+
+    async def summarize(
+        self, account_id: int, start: datetime | None = None, end: datetime | None = None, bucket: str | None = None
+    ) -> dict:
+        """
+        Agrega as transações de uma conta no banco (``GROUP BY``), sem trazer as transações para a aplicação.
+        :param account_id: id da conta
+        :param start: início do intervalo (inclusivo; sem fuso é tratado como UTC)
+        :param end: fim do intervalo (exclusivo; sem fuso é tratado como UTC)
+        :param bucket: ``day`` ou ``month`` para agregar também por dia ou mês (UTC); só os totais quando omitido
+        :return: ``totals`` do intervalo e ``buckets`` com os agregados de cada período com movimento
+        """
+        columns = [
+            transactions.c.type,
+            sa.func.count().label("movements"),
+            sa.func.sum(transactions.c.amount).label("total"),
+            sa.func.min(transactions.c.amount).label("smallest"),
+            sa.func.max(transactions.c.amount).label("largest"),
+        ]
+        group_by = [transactions.c.type]
+        if bucket is not None:
+            period = _bucket_start(bucket).label("start")
+            columns.insert(0, period)
+            group_by.insert(0, period)
+        # Only (account_id, timestamp, type, amount) are read: an index-only scan of
+        # ix_transactions_account_id_timestamp_id_type_amount
+        query = sa.select(*columns).where(transactions.c.account_id == account_id).group_by(*group_by)
+        if start is not None:
+            query = query.where(transactions.c.timestamp >= _utc(start))
+        if end is not None:
+            query = query.where(transactions.c.timestamp < _utc(end))
+
+        totals = _empty_summary()
+        buckets: dict = {}
+        for row in await database.fetch_all(query):
+            _add_to_summary(totals, row)
+            if bucket is not None:
+                _add_to_summary(buckets.setdefault(row.start, {"start": row.start, **_empty_summary()}), row)
+        return {
+            "totals": _finish_summary(totals),
+            "buckets": [_finish_summary(buckets[period]) for period in sorted(buckets)],
+        }
 
-    @database.transaction()
     async def create(self, transaction: TransactionIn) -> Record:
-        query = accounts.select().where(accounts.c.id == transaction.account_id)
-        account = await database.fetch_one(query)
-        if not account:
-            raise AccountNotFoundError
-
-        if transaction.type == TransactionType.WITHDRAWAL:
-            balance = float(account.balance) - transaction.amount
-            if balance < 0:
-                raise BusinessError("Operation not carried out due to lack of balance")
-        else:
-            balance = float(account.balance) + transaction.amount
+        row = await self.__create(transaction)
+        # Cached accounts are dropped only once the new balance is committed
+        await self.account_service.invalidate([transaction.account_id])
+        return row
+
+    @database.transaction()
+    async def __create(self, transaction: TransactionIn) -> Record:
+        # Update account balance in a single conditional statement, so concurrent
+        # withdrawals can't overwrite each other or overdraw the account
+        balance = await self.__update_account_balance(transaction)
+        if balance is None:
+            query = accounts.select().with_only_columns(accounts.c.id).where(accounts.c.id == transaction.account_id)
+            if not await database.fetch_one(query):
+                raise AccountNotFoundError
+            withdrawals_rejected.inc()
+            raise BusinessError(LACK_OF_BALANCE)
 
         # Create transaction entry
-        transaction_id = await self.__register_transaction(transaction)
-        # Update account balance
-        await self.__update_account_balance(transaction.account_id, balance)
-
-        query = transactions.select().where(transactions.c.id == transaction_id)
-        return await database.fetch_one(query)
-
-    async def __update_account_balance(self, account_id: int, balance: float) -> None:
-        command = accounts.update().where(accounts.c.id == account_id).values(balance=balance)
-        await database.execute(command)
-
-    async def __register_transaction(self, transaction: TransactionIn) -> int:
-        command = transactions.insert().values(
-            account_id=transaction.account_id,
-            type=transaction.type,
-            amount=transaction.amount,
+        row = await self.__register_transaction(transaction)
+        await self.balance_service.record([(row.account_id, row.timestamp, balance.balance)])
+        transactions_created.inc(type=transaction.type)
+        return row
+
+    async def create_idempotent(self, transaction: TransactionIn, key: str) -> tuple[Record, bool]:
+        """
+        Cria uma transação identificada por uma chave de idempotência; repetições com a mesma chave
+        devolvem a transação original sem alterar o saldo da conta.
+        :param transaction: transação a aplicar
+        :param key: chave de idempotência, já prefixada com o usuário
+        :return: a transação e se ela já existia (repetição)
+        """
+        row = self.idempotency_cache.get(key)
+        if row is not None:
+            idempotent_replays.inc(source="cache")
+            replayed = True
+        else:
+            row, replayed = await self.__create_idempotent(transaction, key)
+            if replayed:
+                idempotent_replays.inc(source="database")
+            else:
+                await self.account_service.invalidate([transaction.account_id])
+            self.idempotency_cache.set(key, row)
+
+        if (row.account_id, row.type, row.amount) != (
+            transaction.account_id,
+            transaction.type,
+            transaction.amount,
+        ):
+            raise BusinessError("Idempotency-Key already used for a different transaction")
+        return row, replayed
+
+    @database.transaction()
+    async def __create_idempotent(self, transaction: TransactionIn, key: str) -> tuple[Record, bool]:
+        # The entry is inserted first: the unique key makes a concurrent duplicate wait for the first
+        # request and then skip the insert, so a duplicate never touches the account row
+        row = await self.__register_transaction(transaction, key)
+        if row is None:
+            query = transactions.select().where(transactions.c.idempotency_key == key)
+            existing = await database.fetch_one(query)
+            if not existing:
+                raise AccountNotFoundError
+            return existing, True
+
+        balance = await self.__update_account_balance(transaction)
+        if balance is None:
+            withdrawals_rejected.inc()
+            raise BusinessError(LACK_OF_BALANCE)
+        await self.balance_service.record([(row.account_id, row.timestamp, balance.balance)])
+        transactions_created.inc(type=transaction.type)
+        return row, False
+
+    async def create_batch(self, items: list[TransactionIn]) -> list[dict]:
+        """
+        Aplica um lote de transações em um único commit.
+
+        As transações são agrupadas por conta e aplicadas na ordem recebida; um saque sem saldo ou uma
+        conta inexistente rejeita apenas o item correspondente. Os itens aceitos são gravados com INSERTs
+        multi-linha e cada conta recebe um único UPDATE com o saldo líquido do lote.
+        :param items: transações a aplicar
+        :return: um resultado por item, na ordem de entrada, com ``status``, ``detail`` e ``transaction``
+        """
+        results = await self.__create_batch(items)
+        await self.account_service.invalidate(
+            {item.account_id for item, result in zip(items, results) if result["status"] == "created"}
+        )
+        return results
+
+    @database.transaction()
+    async def __create_batch(self, items: list[TransactionIn]) -> list[dict]:
+        results: list[dict] = [{"index": index, "status": "created", "detail": None} for index in range(len(items))]
+        by_account: dict[int, list[int]] = defaultdict(list)
+        for index, item in enumerate(items):
+            by_account[item.account_id].append(index)
+
+        balances = await self.__lock_account_balances(sorted(by_account))
+
+        accepted: list[int] = []
+        rejected = 0
+        deltas: dict[int, tuple[int, int]] = {}
+        for account_id, indexes in by_account.items():
+            if account_id not in balances:
+                for index in indexes:
+                    results[index].update(status="rejected", detail=ACCOUNT_NOT_FOUND)
+                continue
+
+            balance, net, low = balances[account_id], 0, 0
+            for index in indexes:
+                amount = items[index].amount
+                if items[index].type == TransactionType.WITHDRAWAL:
+                    if balance < amount:
+                        rejected += 1
+                        results[index].update(status="rejected", detail=LACK_OF_BALANCE)
+                        continue
+                    amount = -amount
+                balance += amount
+                net += amount
+                low = min(low, net)
+                accepted.append(index)
+
+            if net or low:
+                deltas[account_id] = (net, low)
+
+        accepted.sort()
+        last_timestamps: dict[int, datetime] = {}
+        for start in range(0, len(accepted), BATCH_CHUNK_SIZE):
+            chunk = accepted[start : start + BATCH_CHUNK_SIZE]
+            rows = [
+                {"account_id": items[index].account_id, "type": items[index].type, "amount": items[index].amount}
+                for index in chunk
+            ]
+            command = transactions.insert().values(rows).returning(*transactions.c)
+            created = sorted(await database.fetch_all(command), key=lambda row: row.id)
+            for index, row in zip(chunk, created):
+                results[index]["transaction"] = row
+                last_timestamps[row.account_id] = row.timestamp
+
+        movements = []
+        for account_id, (net, low) in deltas.items():
+            balance = await self.__apply_account_delta(account_id, net, low)
+            movements.append((account_id, last_timestamps[account_id], balance))
+        await self.balance_service.record(movements)
+
+        # Counted once the whole batch went through, so a rolled back batch isn't counted
+        for index in accepted:
+            transactions_created.inc(type=items[index].type)
+        withdrawals_rejected.inc(rejected)
+        return results
+
+    async def __lock_account_balances(self, account_ids: list[int]) -> dict[int, int]:
+        # Rows are locked in id order so concurrent batches over the same accounts can't deadlock
+        balances = {}
+        for start in range(0, len(account_ids), BATCH_CHUNK_SIZE):
+            query = (
+                accounts.select()
+                .with_only_columns(accounts.c.id, accounts.c.balance)
+                .where(accounts.c.id.in_(account_ids[start : start + BATCH_CHUNK_SIZE]))
+                .order_by(accounts.c.id)
+                .with_for_update()
+            )
+            for row in await database.fetch_all(query):
+                balances[row.id] = row.balance
+        return balances
+
+    async def __apply_account_delta(self, account_id: int, net: int, low: int) -> int:
+        # The guard keeps the account from going negative at any point of the batch, even if the
+        # balance changed after it was read (SQLite ignores FOR UPDATE)
+        command = (
+            accounts.update()
+            .where(accounts.c.id == account_id, accounts.c.balance + low >= 0)
+            .values(balance=accounts.c.balance + net)
+            .returning(accounts.c.balance)
+        )
+        balance = await database.fetch_val(command)
+        if balance is None:
+            raise BusinessError("Account balance changed during batch, no transaction was applied")
+        return balance
+
+    async def __update_account_balance(self, transaction: TransactionIn) -> Record | None:
+        command = WITHDRAW if transaction.type == TransactionType.WITHDRAWAL else DEPOSIT
+        values = {"account_id": transaction.account_id, "amount": transaction.amount}
+        return await database.fetch_one(command, values)
+
+    async def __register_transaction(self, transaction: TransactionIn, idempotency_key: str | None = None) -> Record:
+        if idempotency_key is None:
+            values = {"account_id": transaction.account_id, "type": transaction.type, "amount": transaction.amount}
+            return await database.fetch_one(INSERT_TRANSACTION, values)
+
+        if database.url.dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        # INSERT ... SELECT inserts nothing for an unknown account, and ON CONFLICT nothing for a used key
+        values = sa.select(
+            accounts.c.id,
+            sa.literal(transaction.type, transactions.c.type.type),
+            sa.literal(transaction.amount, transactions.c.amount.type),
+            sa.literal(idempotency_key, transactions.c.idempotency_key.type),
+        ).where(accounts.c.id == transaction.account_id)
+        command = (
+            insert(transactions)
+            .from_select(["account_id", "type", "amount", "idempotency_key"], values)
+            .on_conflict_do_nothing(index_elements=[transactions.c.idempotency_key])
+            .returning(*transactions.c)
         )
-        return await database.execute(command)
+        return await database.fetch_one(command)
+
+
+def _bucket_start(bucket: str) -> sa.ColumnElement:
+    # First day (UTC) of the day or month of each transaction
+    if database.url.dialect == "postgresql":
+        return sa.cast(sa.func.date_trunc(bucket, sa.func.timezone("UTC", transactions.c.timestamp)), sa.Date)
+    # SQLite keeps timestamps as UTC text
+    return sa.func.strftime("%Y-%m-01" if bucket == "month" else "%Y-%m-%d", transactions.c.timestamp, type_=sa.Date)
+
+
+def _empty_summary() -> dict:
+    return {"count": 0, "deposits": 0, "withdrawals": 0, "deposited": 0, "withdrawn": 0, "min": None, "max": None}
+
+
+def _add_to_summary(summary: dict, row: Record) -> None:
+    # SUM over BIGINT is NUMERIC on Postgres
+    total = int(row.total)
+    summary["count"] += row.movements
+    if row.type == TransactionType.WITHDRAWAL:
+        summary["withdrawals"] += row.movements
+        summary["withdrawn"] += total
+    else:
+        summary["deposits"] += row.movements
+        summary["deposited"] += total
+    summary["min"] = row.smallest if summary["min"] is None else min(summary["min"], row.smallest)
+    summary["max"] = row.largest if summary["max"] is None else max(summary["max"], row.largest)
+
+
+def _finish_summary(summary: dict) -> dict:
+    count, moved = summary["count"], summary["deposited"] + summary["withdrawn"]
+    summary["net"] = summary["deposited"] - summary["withdrawn"]
+    # Rounded to the nearest cent
+    summary["average"] = (2 * moved + count) // (2 * count) if count else None
+    return summary
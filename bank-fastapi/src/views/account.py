@@ -1,10 +1,14 @@
-from pydantic import AwareDatetime, BaseModel, NaiveDatetime, PositiveFloat
+from datetime import date
+
+from pydantic import AwareDatetime, BaseModel, NaiveDatetime
+
+from src.money import MoneyOut, PositiveMoneyOut
 
 
 class AccountOut(BaseModel):
     id: int
     user_id: int
-    balance: float
+    balance: MoneyOut
     created_at: AwareDatetime | NaiveDatetime
 
 
@@ -12,5 +16,34 @@ class TransactionOut(BaseModel):
     id: int
     account_id: int
     type: str
-    amount: PositiveFloat
+    amount: PositiveMoneyOut
     timestamp: AwareDatetime | NaiveDatetime
+
+
+class BalanceOut(BaseModel):
+    account_id: int
+    at: AwareDatetime | NaiveDatetime | None
+    balance: MoneyOut
+
+
+class SummaryTotalsOut(BaseModel):
+    count: int
+    deposits: int
+    withdrawals: int
+    deposited: MoneyOut
+    withdrawn: MoneyOut
+    net: MoneyOut
+    min: PositiveMoneyOut | None
+    max: PositiveMoneyOut | None
+    average: MoneyOut | None
+
+
+class SummaryBucketOut(SummaryTotalsOut):
+    start: date
+
+
+class SummaryOut(BaseModel):
+    account_id: int
+    bucket: str | None
+    totals: SummaryTotalsOut
+    buckets: list[SummaryBucketOut]
@@ -1,9 +1,26 @@
-from pydantic import AwareDatetime, BaseModel, NaiveDatetime, PositiveFloat
+from typing import Literal
+
+from pydantic import AwareDatetime, BaseModel, NaiveDatetime
+
+from src.money import PositiveMoneyOut
 
 
 class TransactionOut(BaseModel):
     id: int
     account_id: int
     type: str
-    amount: PositiveFloat
+    amount: PositiveMoneyOut
     timestamp: AwareDatetime | NaiveDatetime
+
+
+class TransactionBatchItemOut(BaseModel):
+    index: int
+    status: Literal["created", "rejected"]
+    detail: str | None = None
+    transaction: TransactionOut | None = None
+
+
+class TransactionBatchOut(BaseModel):
+    created: int
+    rejected: int
+    items: list[TransactionBatchItemOut]
@@ -0,0 +1,11 @@
+import pytest
+from src.database import engine, metadata
+from src.main import app  # noqa: F401 - registers every model in the metadata
+
+
+@pytest.fixture(scope="session", autouse=True)
+def clean_database():
+    # Tests share the database configured in DATABASE_URL: start every run from empty tables
+    with engine.begin() as connection:
+        for table in reversed(metadata.sorted_tables):
+            connection.execute(table.delete())
@@ -1,6 +1,10 @@
+import json
+
 import pytest
 from httpx import AsyncClient
+from src.database import database
 from src.main import app
+from src.services.account import account_cache_requests
 
 @pytest.mark.asyncio
 async def test_create_and_list_accounts():
@@ -24,3 +28,194 @@ async def test_create_and_list_accounts():
         contas = resp.json()
         assert any(acc["user_id"] == 456 for acc in contas)
 
+
+@pytest.mark.asyncio
+async def test_paginate_accounts_with_cursor():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 456})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+        for _ in range(3):
+            await ac.post("/accounts/", json={"user_id": 456, "balance": 10.0}, headers=headers)
+
+        full = (await ac.get("/accounts/?limit=1000", headers=headers)).json()
+        seen = []
+        resp = await ac.get("/accounts/?limit=2", headers=headers)
+        while True:
+            assert resp.status_code == 200
+            seen.extend(resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            resp = await ac.get(f"/accounts/?limit=2&cursor={cursor}", headers=headers)
+        assert seen == full
+        assert [account["id"] for account in seen] == sorted(account["id"] for account in full)
+
+        resp = await ac.get("/accounts/?limit=0", headers=headers)
+        assert resp.status_code == 422
+        resp = await ac.get("/accounts/?limit=1001", headers=headers)
+        assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_paginate_account_transactions_with_cursor():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 456})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+        account = (await ac.post("/accounts/", json={"user_id": 456, "balance": 10.0}, headers=headers)).json()
+        for amount in range(1, 6):
+            transaction = {"account_id": account["id"], "type": "deposit", "amount": amount}
+            await ac.post("/transactions/", json=transaction, headers=headers)
+
+        url = f"/accounts/{account['id']}/transactions?limit=2"
+        full = (await ac.get(f"/accounts/{account['id']}/transactions?limit=1000", headers=headers)).json()
+        seen = []
+        resp = await ac.get(url, headers=headers)
+        while True:
+            assert resp.status_code == 200
+            seen.extend(resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            resp = await ac.get(f"{url}&cursor={cursor}", headers=headers)
+        assert seen == full
+        assert [tx["amount"] for tx in seen[-5:]] == [1, 2, 3, 4, 5]
+
+        resp = await ac.get(f"{url}&cursor=invalid", headers=headers)
+        assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_account_statement():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 456})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+        account = (await ac.post("/accounts/", json={"user_id": 456, "balance": 10.0}, headers=headers)).json()
+        for tx_type in ("deposit", "withdrawal"):
+            await ac.post(
+                "/transactions/", json={"account_id": account["id"], "type": tx_type, "amount": 5.0}, headers=headers
+            )
+
+        resp = await ac.get(f"/accounts/{account['id']}/statement", headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [(line["type"], line["amount"]) for line in lines[-2:]] == [("deposit", 5.0), ("withdrawal", 5.0)]
+
+        resp = await ac.get(f"/accounts/{account['id']}/statement?format=csv", headers=headers)
+        rows = resp.text.splitlines()
+        assert rows[0] == "id,account_id,type,amount,timestamp"
+        assert len(rows) == len(lines) + 1
+
+        params = {"from": "2000-01-01T00:00:00", "to": "2000-01-02T00:00:00"}
+        resp = await ac.get(f"/accounts/{account['id']}/statement", params=params, headers=headers)
+        assert resp.text == ""
+
+        resp = await ac.get("/accounts/999999/statement", headers=headers)
+        assert resp.status_code == 404
+
+        # timestamp is NOT NULL: every exported transaction carries one
+        assert all(line["timestamp"] is not None for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_read_account_balance():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 456})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+        account = (await ac.post("/accounts/", json={"user_id": 456, "balance": 10.0}, headers=headers)).json()
+        transaction = {"account_id": account["id"], "type": "deposit", "amount": 5.0}
+        await ac.post("/transactions/", json=transaction, headers=headers)
+
+        resp = await ac.get(f"/accounts/{account['id']}/balance", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["balance"] == 15.0
+
+        resp = await ac.get(f"/accounts/{account['id']}/balance", params={"at": "2000-01-01T00:00:00"}, headers=headers)
+        assert resp.json() == {"account_id": account["id"], "at": "2000-01-01T00:00:00", "balance": 0.0}
+
+        resp = await ac.get("/accounts/999999/balance", headers=headers)
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_read_account_is_cached_and_invalidated_by_transactions():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 456})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+        account = (await ac.post("/accounts/", json={"user_id": 456, "balance": 10.0}, headers=headers)).json()
+        hits = account_cache_requests.value(result="hit")
+
+        assert (await ac.get(f"/accounts/{account['id']}", headers=headers)).json() == account
+        assert (await ac.get(f"/accounts/{account['id']}", headers=headers)).json() == account
+        assert account_cache_requests.value(result="hit") == hits + 1
+
+        transaction = {"account_id": account["id"], "type": "deposit", "amount": 5.0}
+        await ac.post("/transactions/", json=transaction, headers=headers)
+        resp = await ac.get(f"/accounts/{account['id']}", headers=headers)
+        assert resp.json()["balance"] == 15.0
+
+        resp = await ac.get("/accounts/999999", headers=headers)
+        assert resp.status_code == 404
+        assert "account_cache_hit_ratio" in (await ac.get("/metrics")).text
+
+
+@pytest.mark.asyncio
+async def test_read_account_summary():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 456})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+        account = (await ac.post("/accounts/", json={"user_id": 456, "balance": 10.0}, headers=headers)).json()
+        for tx_type, amount in (("deposit", 5.5), ("deposit", 2.0), ("withdrawal", 3.25)):
+            transaction = {"account_id": account["id"], "type": tx_type, "amount": amount}
+            await ac.post("/transactions/", json=transaction, headers=headers)
+
+        resp = await ac.get(f"/accounts/{account['id']}/summary", params={"bucket": "day"}, headers=headers)
+        assert resp.status_code == 200
+        summary = resp.json()
+        assert summary["bucket"] == "day"
+        assert summary["totals"] == {
+            "count": 3,
+            "deposits": 2,
+            "withdrawals": 1,
+            "deposited": 7.5,
+            "withdrawn": 3.25,
+            "net": 4.25,
+            "min": 2.0,
+            "max": 5.5,
+            "average": 3.58,
+        }
+        assert [bucket["count"] for bucket in summary["buckets"]] == [3]
+        assert summary["buckets"][0]["start"] == summary["buckets"][0]["start"][:10]
+
+        params = {"from": "2000-01-01T00:00:00", "to": "2000-01-02T00:00:00"}
+        resp = await ac.get(f"/accounts/{account['id']}/summary", params=params, headers=headers)
+        assert resp.json()["totals"]["count"] == 0
+        assert resp.json()["buckets"] == []
+
+        resp = await ac.get(f"/accounts/{account['id']}/summary", params={"bucket": "week"}, headers=headers)
+        assert resp.status_code == 422
+        resp = await ac.get("/accounts/999999/summary", headers=headers)
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_accounts_batch():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 456})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+        payload = [{"user_id": 456, "balance": 10.0}, {"user_id": 457, "balance": 20.5}]
+        resp = await ac.post("/accounts/batch", json=payload, headers=headers)
+        assert resp.status_code == 201
+        created = resp.json()
+        assert [(account["user_id"], account["balance"]) for account in created] == [(456, 10.0), (457, 20.5)]
+        assert (await ac.get(f"/accounts/{created[1]['id']}", headers=headers)).json() == created[1]
+
+        count = await database.fetch_val("SELECT COUNT(*) FROM accounts")
+        resp = await ac.post("/accounts/batch", json=[*payload, {"user_id": 458, "balance": 0}], headers=headers)
+        assert resp.status_code == 422
+        assert await database.fetch_val("SELECT COUNT(*) FROM accounts") == count
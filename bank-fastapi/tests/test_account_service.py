@@ -1,4 +1,5 @@
 import pytest
+from src.cache import CacheBackend, MemoryCacheBackend
 from src.services.account import AccountService
 from src.schemas.account import AccountIn
 from src.database import database
@@ -12,8 +13,62 @@ async def test_create_and_read_account(monkeypatch):
     account_in = AccountIn(user_id=1, balance=100.0)
     created = await service.create(account_in)
     assert created['user_id'] == 1
-    assert float(created['balance']) == 100.0
+    assert created['balance'] == 10000
 
     accounts = await service.read_all(limit=10)
     assert any(acc['user_id'] == 1 for acc in accounts)
 
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_backend_expires_and_evicts():
+    now = [0.0]
+    cache = MemoryCacheBackend(maxsize=2, ttl=10, clock=lambda: now[0])
+    await cache.set("a", {"id": 1})
+    await cache.set("b", {"id": 2})
+    assert await cache.get("a") == {"id": 1}
+
+    await cache.set("c", {"id": 3})  # "b" is the least recently used
+    assert await cache.get("b") is None
+
+    now[0] = 10
+    assert await cache.get("a") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 2, "evictions": 1}
+
+
+@pytest.mark.asyncio
+async def test_read_account_goes_through_the_cache():
+    service = AccountService(cache=MemoryCacheBackend(maxsize=10, ttl=60))
+    created = await service.create(AccountIn(user_id=1, balance=100.0))
+
+    account = await service.read(created["id"])
+    await database.execute("UPDATE accounts SET balance = 100 WHERE id = :id", {"id": created["id"]})
+    assert await service.read(created["id"]) == account
+
+    await service.invalidate([created["id"]])
+    assert (await service.read(created["id"]))["balance"] == 100
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("returning", [True, False])
+async def test_create_many_accounts(monkeypatch, returning):
+    monkeypatch.setattr("src.services.account._insert_returning", lambda: returning)
+    monkeypatch.setattr("src.services.account.BATCH_CHUNK_SIZE", 3)
+    items = [AccountIn(user_id=index + 1, balance=index + 1) for index in range(7)]
+
+    created = await AccountService().create_many(items)
+    assert [(row["user_id"], row["balance"]) for row in created] == [(index, index * 100) for index in range(1, 8)]
+    assert [row["id"] for row in created] == sorted({row["id"] for row in created})
+    assert all(row["created_at"] is not None for row in created)
+
+    query = "SELECT COUNT(*) FROM account_daily_balances WHERE account_id BETWEEN :first AND :last"
+    assert await database.fetch_val(query, {"first": created[0]["id"], "last": created[-1]["id"]}) == 7
+
+
+def test_incomplete_cache_backend_fails_when_instantiated():
+    class GetOnlyBackend(CacheBackend):
+        async def get(self, key: str) -> dict | None:
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
@@ -1,7 +1,9 @@
 import pytest
 from httpx import AsyncClient
 from src.main import app
+from src.security import JWTToken, TokenCache, jwt_cache_requests, token_cache
 import asyncio
+import time
 
 @pytest.mark.asyncio
 async def test_login():
@@ -11,3 +13,41 @@ async def test_login():
         data = response.json()
         assert "access_token" in data
 
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_cached():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        token = (await ac.post("/auth/login", json={"user_id": 123})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        before = token_cache.stats()
+        hits, misses = jwt_cache_requests.value(result="hit"), jwt_cache_requests.value(result="miss")
+        for _ in range(3):
+            assert (await ac.get("/accounts/?limit=1", headers=headers)).status_code == 200
+        after = token_cache.stats()
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 2
+        assert jwt_cache_requests.value(result="miss") == misses + 1
+        assert jwt_cache_requests.value(result="hit") == hits + 2
+
+        metrics = (await ac.get("/metrics")).text
+        assert 'jwt_cache_requests_total{result="hit"}' in metrics
+        assert "jwt_cache_hit_ratio" in metrics
+        assert "jwt_cache_entries" in metrics
+
+
+def test_token_cache_expires_and_evicts(monkeypatch):
+    cache = TokenCache(maxsize=2)
+    payload = {"iss": "i", "sub": 1, "aud": "a", "exp": 100.0, "iat": 0.0, "nbf": 0.0, "jti": "j"}
+    token = JWTToken.model_validate({"access_token": payload})
+
+    monkeypatch.setattr(time, "time", lambda: 50.0)
+    for key in ("a", "b", "c"):
+        cache.set(key, token)
+    assert cache.get("a") is None
+    assert cache.get("c") is token
+
+    monkeypatch.setattr(time, "time", lambda: 150.0)
+    assert cache.get("c") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 2, "evictions": 1}
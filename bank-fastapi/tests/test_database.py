@@ -0,0 +1,86 @@
+import pytest
+import sqlalchemy as sa
+from databases.backends.postgres import PostgresBackend
+from databases.backends.sqlite import SQLiteBackend
+import src.database as database_module
+from src.database import PreparedStatement, _with_prepared_statements, database, statement_label
+from src.models.account import accounts
+from src.models.transaction import TransactionType, transactions
+from src.services.account import SELECT_ACCOUNT
+from src.services.transaction import INSERT_TRANSACTION
+
+POSTGRES = PostgresBackend("postgresql://bank@localhost/bank")._dialect
+SQLITE = SQLiteBackend("sqlite:///bank.db")._dialect
+
+
+def test_prepared_statement_compiles_once_per_dialect():
+    statement = PreparedStatement(
+        accounts.select().where(accounts.c.user_id == sa.bindparam("user_id"), accounts.c.balance > 10)
+    )
+    postgres = statement.compile(POSTGRES)
+    assert statement.compile(POSTGRES) is postgres
+    assert "accounts.user_id = $2 AND accounts.balance > $1" in postgres.sql
+    assert postgres.bind({"user_id": 7})[1] == [10, 7]
+
+    sqlite = statement.compile(SQLITE)
+    assert "accounts.user_id = ? AND accounts.balance > ?" in sqlite.sql
+    assert sqlite.bind({"user_id": 7})[1] == [7, 10]
+    assert statement_label(statement.values(user_id=7)) == "select accounts"
+
+
+def test_prepared_insert_binds_columns_by_name_and_converts_values():
+    sql, args, *_ = INSERT_TRANSACTION.compile(POSTGRES).bind(
+        {"account_id": 1, "type": TransactionType.WITHDRAWAL, "amount": 500}
+    )
+    # Numbered in parameter name order, like the databases Postgres backend does
+    assert sql.startswith("INSERT INTO transactions (account_id, type, amount, timestamp) VALUES ($1, $3, $2, now())")
+    assert args == [1, 500, "WITHDRAWAL"]
+
+
+def test_prepared_statement_rejects_statements_it_cant_reuse():
+    with pytest.raises(ValueError):
+        PreparedStatement(accounts.select().where(accounts.c.id.in_([1, 2]))).compile(SQLITE)
+    with pytest.raises(ValueError):
+        PreparedStatement(accounts.insert(), column_keys=["user_id"]).compile(SQLITE)
+
+
+@pytest.mark.asyncio
+async def test_prepared_statement_returns_the_same_rows():
+    account_id = await database.execute(accounts.insert().values(user_id=42, balance=1234))
+    await database.execute(transactions.insert().values(account_id=account_id, type="deposit", amount=1234))
+
+    prepared = await database.fetch_one(SELECT_ACCOUNT, {"account_id": account_id})
+    compiled = await database.fetch_one(accounts.select().where(accounts.c.id == account_id))
+    assert dict(prepared._mapping) == dict(compiled._mapping)
+    assert prepared.balance == 1234
+    assert await database.fetch_one(SELECT_ACCOUNT, {"account_id": -1}) is None
+
+
+def test_prepared_statement_is_checked_against_the_backend_compilation(monkeypatch):
+    connection = _with_prepared_statements(SQLiteBackend("sqlite:///bank.db").connection())
+    statement = PreparedStatement(accounts.select().where(accounts.c.id == sa.bindparam("account_id")))
+    first = connection._compile(statement.values(account_id=3))
+    assert statement.compile(SQLITE).verified
+    assert connection._compile(statement.values(account_id=3))[:2] == first[:2] == (first[0], [3])
+
+    # A compiled form that no longer matches what the backend generates is dropped
+    diverging = PreparedStatement(accounts.select().where(accounts.c.id == sa.bindparam("account_id")))
+    monkeypatch.setattr(diverging.compile(SQLITE), "sql", "SELECT 1")
+    assert connection._compile(diverging.values(account_id=3))[:2] == first[:2]
+    assert diverging.compile(SQLITE) is None
+    assert connection._compile(diverging.values(account_id=4))[1] == [4]
+
+
+@pytest.mark.asyncio
+async def test_prepared_statement_falls_back_when_internals_are_missing(monkeypatch):
+    def missing_internals(*args, **kwargs):
+        raise AttributeError("_bind_processors")
+
+    monkeypatch.setattr(database_module, "CompiledStatement", missing_internals)
+    statement = PreparedStatement(
+        accounts.select().where(accounts.c.id == sa.bindparam("account_id")).limit(sa.bindparam("limit"))
+    )
+    account_id = await database.execute(accounts.insert().values(user_id=43, balance=10))
+    row = await database.fetch_one(statement, {"account_id": account_id, "limit": 1})
+    assert statement.compile(SQLITE) is None
+    assert row.user_id == 43
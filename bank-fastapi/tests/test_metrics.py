@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from src.database import database, pool, pool_acquire_timeouts
+from src.exceptions import PoolTimeoutError
+from src.main import app, errors
+from src.metrics import Metric, http_request_seconds
+from src.services.transaction import transactions_created, withdrawals_rejected
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_pool_telemetry():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await ac.post("/auth/login", json={"user_id": 1})
+        await database.fetch_val("SELECT 1")
+        response = await ac.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE db_pool_acquire_seconds histogram" in response.text
+    assert 'db_pool_acquire_seconds_bucket{le="+Inf"}' in response.text
+    assert "db_pool_connections_in_use 0" in response.text
+    assert "db_pool_waiting 0" in response.text
+
+
+@pytest.mark.asyncio
+async def test_pool_acquire_times_out_when_exhausted(monkeypatch):
+    monkeypatch.setattr(pool, "max_size", 1)
+    monkeypatch.setattr(pool, "acquire_timeout", 0.05)
+    monkeypatch.setattr(pool, "_loop", None)
+    timeouts = pool_acquire_timeouts.value()
+    holding = asyncio.Event()
+    done = asyncio.Event()
+
+    async def hold_connection():
+        async with database.connection():
+            holding.set()
+            await done.wait()
+
+    task = asyncio.create_task(hold_connection())
+    await holding.wait()
+    try:
+        assert pool.in_use == 1
+        with pytest.raises(PoolTimeoutError):
+            await database.fetch_val("SELECT 1")
+    finally:
+        done.set()
+        await task
+
+    assert pool_acquire_timeouts.value() == timeouts + 1
+    assert pool.in_use == 0 and pool.waiting == 0
+    assert await database.fetch_val("SELECT 1") == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_request_query_and_domain_metrics():
+    route = "/accounts/{id}/balance"
+    requests = http_request_seconds.count(method="GET", route=route, status="200")
+    deposits = transactions_created.value(type="deposit")
+    rejected = withdrawals_rejected.value()
+    business_errors = errors.value(error="BusinessError")
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        token = (await ac.post("/auth/login", json={"user_id": 1})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        account = (await ac.post("/accounts/", json={"user_id": 1, "balance": 10.0}, headers=headers)).json()
+        await ac.post(
+            "/transactions/", json={"account_id": account["id"], "type": "deposit", "amount": 5.0}, headers=headers
+        )
+        response = await ac.post(
+            "/transactions/", json={"account_id": account["id"], "type": "withdrawal", "amount": 50.0}, headers=headers
+        )
+        assert response.status_code == 409
+        await ac.get(f"/accounts/{account['id']}/balance", headers=headers)
+        text = (await ac.get("/metrics")).text
+
+    assert http_request_seconds.count(method="GET", route=route, status="200") == requests + 1
+    assert transactions_created.value(type="deposit") == deposits + 1
+    assert withdrawals_rejected.value() == rejected + 1
+    assert errors.value(error="BusinessError") == business_errors + 1
+    assert f'http_request_duration_seconds_count{{method="GET",route="{route}",status="200"}}' in text
+    assert 'db_query_duration_seconds_count{statement="update accounts"}' in text
+    assert 'db_query_duration_seconds_count{statement="insert transactions"}' in text
+    assert 'transactions_created_total{type="deposit"}' in text
+
+
+def test_metric_without_samples_fails_when_instantiated():
+    class Untyped(Metric):
+        pass
+
+    with pytest.raises(TypeError):
+        Untyped("untyped", "Metric without samples.")
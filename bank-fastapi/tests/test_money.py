@@ -0,0 +1,57 @@
+import os
+import random
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+from src.money import format_cents, from_cents, to_cents
+from src.schemas.transaction import TransactionIn
+from src.views.transaction import TransactionOut
+
+# MONEY_PROPERTY_OPERATIONS=10000000 runs the full property check (about a minute)
+OPERATIONS = int(os.environ.get("MONEY_PROPERTY_OPERATIONS", 200_000))
+
+
+@pytest.mark.parametrize(
+    "value, cents",
+    [(10, 1000), (0.1, 10), (19.99, 1999), (1234.5, 123450), ("0.07", 7), ("-3.5", -350), (Decimal("2.10"), 210)],
+)
+def test_to_cents(value, cents):
+    assert to_cents(value) == cents
+
+
+@pytest.mark.parametrize("value", [1.005, 0.001, "1.234", "abc", Decimal("0.005"), float("nan"), True, None])
+def test_to_cents_rejects_fractions_of_cents_and_non_numbers(value):
+    with pytest.raises(ValueError):
+        to_cents(value)
+
+
+def test_money_fields_keep_the_json_contract():
+    transaction = TransactionIn.model_validate({"account_id": 1, "type": "deposit", "amount": 19.99})
+    assert transaction.amount == 1999
+    with pytest.raises(ValidationError):
+        TransactionIn.model_validate({"account_id": 1, "type": "deposit", "amount": 0})
+
+    out = TransactionOut(id=1, account_id=1, type="deposit", amount=1999, timestamp="2024-01-01T00:00:00")
+    assert out.model_dump()["amount"] == 1999
+    assert '"amount":19.99' in out.model_dump_json()
+
+
+def test_integer_cents_do_not_drift():
+    rng = random.Random(2024)
+    balance = 0
+    exact = Decimal(0)
+    drifting = 0.0
+    for _ in range(OPERATIONS):
+        text = f"{rng.randrange(0, 100_000)}.{rng.randrange(0, 100):02d}"
+        sign = rng.choice((1, -1))
+        # Amounts arrive as JSON numbers, i.e. floats
+        balance += sign * to_cents(float(text))
+        exact += sign * Decimal(text)
+        drifting += sign * float(text)
+
+    assert Decimal(balance).scaleb(-2) == exact
+    assert format_cents(balance) == f"{exact:.2f}"
+    assert from_cents(balance) == float(exact)
+    # The same operations on floats do drift
+    assert drifting != float(exact)
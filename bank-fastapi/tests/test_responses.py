@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from src.config import settings
+from src.database import database
+from src.main import app
+from src.models.account import accounts
+from src.responses import RecordsJSON, _default
+from src.views.account import AccountOut, TransactionOut
+
+
+@pytest.mark.asyncio
+async def test_list_routes_return_the_same_json_as_the_response_model(monkeypatch):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_resp = await ac.post("/auth/login", json={"user_id": 789})
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+        payload = [{"user_id": 789, "balance": 0.1}, {"user_id": 789, "balance": 98765.43}]
+        account = (await ac.post("/accounts/batch", json=payload, headers=headers)).json()[0]
+        for amount, type_ in ((12.34, "deposit"), (0.05, "withdrawal"), (1000, "deposit")):
+            transaction = {"account_id": account["id"], "type": type_, "amount": amount}
+            await ac.post("/transactions/", json=transaction, headers=headers)
+
+        urls = ["/accounts/?limit=2", f"/accounts/{account['id']}/transactions?limit=2"]
+        fast = [await ac.get(url, headers=headers) for url in urls]
+        monkeypatch.setattr(settings, "fast_json_responses", False)
+        validated = [await ac.get(url, headers=headers) for url in urls]
+
+    for fast_resp, validated_resp in zip(fast, validated):
+        assert fast_resp.status_code == validated_resp.status_code == 200
+        assert fast_resp.headers["content-type"] == validated_resp.headers["content-type"]
+        assert fast_resp.headers["X-Next-Cursor"] == validated_resp.headers["X-Next-Cursor"]
+        assert fast_resp.content == validated_resp.content
+    assert [tx["amount"] for tx in fast[1].json()] == [12.34, 0.05]
+
+
+def test_list_routes_keep_their_openapi_schemas():
+    paths = app.openapi()["paths"]
+    for path, method, model in (
+        ("/accounts/", "get", "AccountOut"),
+        ("/accounts/batch", "post", "AccountOut"),
+        ("/accounts/{id}/transactions", "get", "TransactionOut"),
+    ):
+        responses = paths[path][method]["responses"]
+        status = "201" if method == "post" else "200"
+        schema = responses[status]["content"]["application/json"]["schema"]
+        assert schema["type"] == "array"
+        assert schema["items"] == {"$ref": f"#/components/schemas/{model}"}
+
+
+@pytest.mark.asyncio
+async def test_records_json_needs_every_field_in_the_result():
+    account_id = await database.execute(accounts.insert().values(user_id=790, balance=250))
+    rows = await database.fetch_all(accounts.select().where(accounts.c.id == account_id))
+    assert RecordsJSON(AccountOut).encode(rows).startswith(b'[{"id":%d,"user_id":790,"balance":2.5,' % account_id)
+    assert RecordsJSON(AccountOut).encode([]) == b"[]"
+    with pytest.raises(ValueError):
+        RecordsJSON(TransactionOut).encode(rows)
+
+
+def test_json_fallback_formats_datetimes_like_pydantic():
+    assert _default(datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=timezone.utc)) == "2024-01-02T03:04:05.000600Z"
+    assert _default(datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-3)))) == "2024-01-02T03:04:05-03:00"
+    assert _default(datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02T03:04:05"
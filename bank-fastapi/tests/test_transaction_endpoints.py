@@ -0,0 +1,93 @@
+import json
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from src.config import settings
+from src.main import app
+
+
+async def _login(ac: AsyncClient) -> dict[str, str]:
+    login_resp = await ac.post("/auth/login", json={"user_id": 789})
+    return {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_create_transactions_batch():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        headers = await _login(ac)
+        account = (await ac.post("/accounts/", json={"user_id": 789, "balance": 100.0}, headers=headers)).json()
+
+        batch = [
+            {"account_id": account["id"], "type": "deposit", "amount": 50.0},
+            {"account_id": account["id"], "type": "withdrawal", "amount": 500.0},
+            {"account_id": 999999, "type": "deposit", "amount": 10.0},
+            {"account_id": account["id"], "type": "withdrawal", "amount": 150.0},
+            {"account_id": account["id"], "type": "deposit", "amount": -1},
+        ]
+        resp = await ac.post("/transactions/batch", json=batch, headers=headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert (data["created"], data["rejected"]) == (2, 3)
+        assert [item["status"] for item in data["items"]] == ["created", "rejected", "rejected", "created", "rejected"]
+        assert data["items"][3]["transaction"]["account_id"] == account["id"]
+
+        # O saldo foi zerado, então o saque do NDJSON é rejeitado e apenas o depósito é aplicado
+        ndjson = "\n".join(
+            json.dumps({"account_id": account["id"], "type": tx_type, "amount": 10.0})
+            for tx_type in ("withdrawal", "deposit")
+        )
+        resp = await ac.post(
+            "/transactions/batch",
+            content=ndjson,
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 200
+        assert [item["status"] for item in resp.json()["items"]] == ["rejected", "created"]
+
+
+
+@pytest.mark.asyncio
+async def test_create_transactions_batch_enforces_limits(monkeypatch):
+    monkeypatch.setattr(settings, "transaction_batch_max_items", 2)
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        headers = await _login(ac)
+        account = (await ac.post("/accounts/", json={"user_id": 789, "balance": 10.0}, headers=headers)).json()
+        batch = [{"account_id": account["id"], "type": "deposit", "amount": 1.0}] * 3
+
+        resp = await ac.post("/transactions/batch", json=batch, headers=headers)
+        assert resp.status_code == 413
+        resp = await ac.post(
+            "/transactions/batch",
+            content="\n".join(json.dumps(item) for item in batch),
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 413
+
+        monkeypatch.setattr(settings, "transaction_batch_max_bytes", 100)
+        resp = await ac.post("/transactions/batch", json=batch[:2], headers=headers)
+        assert resp.status_code == 413
+        assert (await ac.get(f"/accounts/{account['id']}", headers=headers)).json()["balance"] == 10.0
+
+@pytest.mark.asyncio
+async def test_create_transaction_with_idempotency_key():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        headers = await _login(ac)
+        account = (await ac.post("/accounts/", json={"user_id": 789, "balance": 100.0}, headers=headers)).json()
+        payload = {"account_id": account["id"], "type": "withdrawal", "amount": 30.0}
+        key = uuid4().hex
+
+        first = await ac.post("/transactions/", json=payload, headers={**headers, "Idempotency-Key": key})
+        retry = await ac.post("/transactions/", json=payload, headers={**headers, "Idempotency-Key": key})
+        assert first.status_code == retry.status_code == 201
+        assert retry.json() == first.json()
+        assert "Idempotent-Replayed" not in first.headers
+        assert retry.headers["Idempotent-Replayed"] == "true"
+
+        other = await ac.post(
+            "/transactions/", json={**payload, "amount": 31.0}, headers={**headers, "Idempotency-Key": key}
+        )
+        assert other.status_code == 409
+
+        balance = (await ac.get(f"/accounts/{account['id']}/balance", headers=headers)).json()
+        assert balance["balance"] == 70.0
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from src.database import database
+from src.exceptions import AccountNotFoundError, BusinessError
+from src.schemas.account import AccountIn
+from src.schemas.transaction import TransactionIn
+from src.services.account import AccountService
+from src.services.scheduler import TransactionScheduler, coalesced_transactions
+from src.services.transaction import TransactionService
+
+
+@pytest.mark.asyncio
+async def test_submit_coalesces_bursts_for_the_same_account():
+    account = await AccountService().create(AccountIn(user_id=7, balance=100.0))
+    other = await AccountService().create(AccountIn(user_id=7, balance=1.0))
+    # One stripe, as the API does on SQLite: the accounts share the lock but keep separate queues
+    scheduler = TransactionScheduler(TransactionService(), stripes=1, limit=500)
+    groups = coalesced_transactions.count()
+
+    async def submit(transaction: TransactionIn):
+        try:
+            return await scheduler.submit(transaction)
+        except (AccountNotFoundError, BusinessError) as exc:
+            return exc
+
+    results = await asyncio.gather(
+        *(submit(TransactionIn(account_id=account["id"], type="withdrawal", amount=30.0)) for _ in range(5)),
+        *(submit(TransactionIn(account_id=other["id"], type="deposit", amount=1.0)) for _ in range(10)),
+        submit(TransactionIn(account_id=999999, type="deposit", amount=1.0)),
+    )
+
+    withdrawals, deposits, unknown = results[:5], results[5:15], results[15]
+    assert [type(result) for result in withdrawals].count(BusinessError) == 2
+    assert all(result.account_id == other["id"] for result in deposits)
+    assert len({result.id for result in deposits}) == 10
+    assert isinstance(unknown, AccountNotFoundError)
+    # Requests queued behind the lock are applied together
+    assert coalesced_transactions.count() - groups < 16
+
+    balances = await database.fetch_all(
+        "SELECT id, balance FROM accounts WHERE id IN (:a, :b) ORDER BY id", {"a": account["id"], "b": other["id"]}
+    )
+    assert [row["balance"] for row in balances] == [1000, 1100]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_submission_is_not_applied():
+    account = await AccountService().create(AccountIn(user_id=7, balance=1.0))
+    scheduler = TransactionScheduler(TransactionService(), stripes=1, limit=500)
+    deposit = TransactionIn(account_id=account["id"], type="deposit", amount=5.0)
+
+    first = asyncio.create_task(scheduler.submit(deposit))
+    second = asyncio.create_task(scheduler.submit(deposit))
+    await asyncio.sleep(0)
+    second.cancel()
+    await first
+    with pytest.raises(asyncio.CancelledError):
+        await second
+
+    row = await database.fetch_one("SELECT balance FROM accounts WHERE id = :id", {"id": account["id"]})
+    assert row["balance"] == 600
@@ -0,0 +1,209 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from src.cache import LRUCache
+from src.database import database
+from src.exceptions import AccountNotFoundError, BusinessError
+from src.models.transaction import TransactionType, transactions
+from src.schemas.account import AccountIn
+from src.schemas.transaction import TransactionIn
+from src.services.account import AccountService
+from src.services.balance import BalanceService
+from src.services.transaction import TransactionService
+
+
+@pytest.mark.asyncio
+async def test_create_deposit_and_withdrawal():
+    account = await AccountService().create(AccountIn(user_id=7, balance=100.0))
+    service = TransactionService()
+
+    deposit = await service.create(TransactionIn(account_id=account["id"], type="deposit", amount=50.0))
+    assert deposit["account_id"] == account["id"]
+    assert deposit["amount"] == 5000
+
+    withdrawal = await service.create(TransactionIn(account_id=account["id"], type="withdrawal", amount=150.0))
+    assert withdrawal["type"] == TransactionType.WITHDRAWAL
+
+    row = await database.fetch_one("SELECT balance FROM accounts WHERE id = :id", {"id": account["id"]})
+    assert row["balance"] == 0
+
+
+@pytest.mark.asyncio
+async def test_create_rejects_overdraft_and_unknown_account():
+    account = await AccountService().create(AccountIn(user_id=7, balance=10.0))
+    service = TransactionService()
+
+    with pytest.raises(BusinessError):
+        await service.create(TransactionIn(account_id=account["id"], type="withdrawal", amount=10.01))
+    with pytest.raises(AccountNotFoundError):
+        await service.create(TransactionIn(account_id=999999, type="deposit", amount=1.0))
+
+    row = await database.fetch_one("SELECT balance FROM accounts WHERE id = :id", {"id": account["id"]})
+    assert row["balance"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_concurrent_withdrawals_do_not_overdraw():
+    account = await AccountService().create(AccountIn(user_id=7, balance=100.0))
+    service = TransactionService()
+
+    async def withdraw():
+        try:
+            await service.create(TransactionIn(account_id=account["id"], type="withdrawal", amount=30.0))
+            return True
+        except BusinessError:
+            return False
+
+    results = await asyncio.gather(*(withdraw() for _ in range(5)))
+    assert results.count(True) == 3
+
+    row = await database.fetch_one("SELECT balance FROM accounts WHERE id = :id", {"id": account["id"]})
+    assert row["balance"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_daily_balance_snapshots():
+    account = await AccountService().create(AccountIn(user_id=7, balance=100.0))
+    service = TransactionService()
+    balances = BalanceService()
+
+    await service.create(TransactionIn(account_id=account["id"], type="deposit", amount=25.0))
+    await service.create_batch([TransactionIn(account_id=account["id"], type="withdrawal", amount=50.0)])
+
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+    assert await balances.read_at(account["id"]) == 7500
+    assert await balances.read_at(account["id"], tomorrow) == 7500
+
+    await balances.backfill()
+    assert await balances.read_at(account["id"], tomorrow) == 7500
+
+    with pytest.raises(AccountNotFoundError):
+        await balances.read_at(999999, tomorrow)
+
+
+@pytest.mark.asyncio
+async def test_daily_balance_within_the_day():
+    account = await AccountService().create(AccountIn(user_id=7, balance=100.0))
+    balances = BalanceService()
+    created_at = account["created_at"].replace(tzinfo=timezone.utc)
+    before_deposit = datetime.now(timezone.utc)
+
+    # Timestamps have second precision on SQLite: make sure the deposit lands after `before_deposit`
+    await asyncio.sleep(1.1)
+    await TransactionService().create(TransactionIn(account_id=account["id"], type="deposit", amount=25.0))
+
+    assert await balances.read_at(account["id"], before_deposit) == 10000
+    assert await balances.read_at(account["id"], datetime.now(timezone.utc)) == 12500
+    assert await balances.read_at(account["id"], created_at - timedelta(minutes=1)) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_batch_rolls_back_when_balance_changes(monkeypatch):
+    account = await AccountService().create(AccountIn(user_id=7, balance=10.0))
+    service = TransactionService()
+    last_id = await database.fetch_val("SELECT COALESCE(MAX(id), 0) FROM transactions")
+
+    # Simulates another writer draining the account between the balance read and the UPDATE
+    async def stale_balances(account_ids):
+        return {account_id: 100000 for account_id in account_ids}
+
+    monkeypatch.setattr(service, "_TransactionService__lock_account_balances", stale_balances)
+    with pytest.raises(BusinessError):
+        await service.create_batch(
+            [
+                TransactionIn(account_id=account["id"], type="deposit", amount=5.0),
+                TransactionIn(account_id=account["id"], type="withdrawal", amount=500.0),
+            ]
+        )
+
+    row = await database.fetch_one("SELECT balance FROM accounts WHERE id = :id", {"id": account["id"]})
+    assert row["balance"] == 1000
+    assert await database.fetch_val("SELECT COUNT(*) FROM transactions WHERE id > :id", {"id": last_id}) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_idempotent_applies_concurrent_duplicates_once():
+    account = await AccountService().create(AccountIn(user_id=7, balance=100.0))
+    # Without the in-process cache every duplicate goes to the database
+    service = TransactionService(idempotency_cache=LRUCache(maxsize=0))
+    transaction = TransactionIn(account_id=account["id"], type="withdrawal", amount=30.0)
+    key = f"7:{uuid4().hex}"
+
+    results = await asyncio.gather(*(service.create_idempotent(transaction, key) for _ in range(5)))
+    assert len({row.id for row, _ in results}) == 1
+    assert [replayed for _, replayed in results].count(False) == 1
+
+    row = await database.fetch_one("SELECT balance FROM accounts WHERE id = :id", {"id": account["id"]})
+    assert row["balance"] == 7000
+
+
+@pytest.mark.asyncio
+async def test_create_idempotent_rejections_do_not_consume_the_key():
+    account = await AccountService().create(AccountIn(user_id=7, balance=10.0))
+    service = TransactionService()
+    key = f"7:{uuid4().hex}"
+
+    with pytest.raises(AccountNotFoundError):
+        await service.create_idempotent(TransactionIn(account_id=999999, type="deposit", amount=1.0), key)
+    with pytest.raises(BusinessError):
+        await service.create_idempotent(TransactionIn(account_id=account["id"], type="withdrawal", amount=20.0), key)
+
+    await service.create(TransactionIn(account_id=account["id"], type="deposit", amount=15.0))
+    row, replayed = await service.create_idempotent(
+        TransactionIn(account_id=account["id"], type="withdrawal", amount=20.0), key
+    )
+    assert not replayed and row.idempotency_key == key
+
+
+@pytest.mark.asyncio
+async def test_summarize_aggregates_by_period_in_the_database():
+    account = await AccountService().create(AccountIn(user_id=7, balance=1.0))
+    rows = [
+        ("deposit", 1000, datetime(2024, 1, 31, 23, 59, 59)),
+        ("withdrawal", 250, datetime(2024, 1, 31, 10)),
+        ("deposit", 4000, datetime(2024, 2, 1, 0, 0, 0)),
+        ("deposit", 500, datetime(2024, 2, 15, 12)),
+        ("withdrawal", 100, datetime(2024, 3, 1)),
+    ]
+    await database.execute_many(
+        transactions.insert(),
+        [{"account_id": account["id"], "type": type, "amount": amount, "timestamp": at} for type, amount, at in rows],
+    )
+    service = TransactionService()
+
+    summary = await service.summarize(account["id"])
+    assert summary["buckets"] == []
+    assert summary["totals"] == {
+        "count": 5,
+        "deposits": 3,
+        "withdrawals": 2,
+        "deposited": 5500,
+        "withdrawn": 350,
+        "net": 5150,
+        "min": 100,
+        "max": 4000,
+        "average": 1170,
+    }
+
+    summary = await service.summarize(
+        account["id"], start=datetime(2024, 1, 1), end=datetime(2024, 3, 1, tzinfo=timezone.utc), bucket="month"
+    )
+    assert [(bucket["start"], bucket["count"], bucket["net"]) for bucket in summary["buckets"]] == [
+        (date(2024, 1, 1), 2, 750),
+        (date(2024, 2, 1), 2, 4500),
+    ]
+    assert summary["totals"]["count"] == 4
+
+    # 02:00 on February 1 in UTC+2 is midnight UTC: the deposit at that instant is left out
+    summary = await service.summarize(
+        account["id"], end=datetime(2024, 2, 1, 2, tzinfo=timezone(timedelta(hours=2))), bucket="day"
+    )
+    assert [(bucket["start"], bucket["deposited"], bucket["withdrawn"]) for bucket in summary["buckets"]] == [
+        (date(2024, 1, 31), 1000, 250)
+    ]
+
+    empty = await service.summarize(account["id"], start=datetime(2030, 1, 1), bucket="day")
+    assert empty["buckets"] == []
+    assert empty["totals"]["count"] == 0 and empty["totals"]["average"] is None
@@ -0,0 +1,102 @@
+"""
+Benchmark das operações de main_v2.Banco: índices por dicionário x listas com busca linear.
+
+Carrega N clientes (cada um com uma conta) e mede o tempo médio de cada operação do Banco.
+A versão com listas é a implementação anterior e é carregada com menos clientes, pois
+criar_cliente nela é O(n) e a carga inteira O(n²).
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.banco_v2 --clientes 1000000 --clientes-lista 20000
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from main_v2 import Banco, ContaCorrente, PessoaFisica
+
+
+class BancoLista(Banco):
+    """Implementação anterior: clientes e contas em listas, buscas com list comprehension."""
+
+    def __init__(self):
+        self.clientes = []
+        self.contas = []
+
+    def criar_cliente(self, nome, data_nascimento, cpf, endereco):
+        if self.filtrar_cliente(cpf):
+            return False, "Já existe cliente com esse CPF!"
+        cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
+        self.clientes.append(cliente)
+        return True, "Cliente criado com sucesso!"
+
+    def criar_conta(self, cpf):
+        cliente = self.filtrar_cliente(cpf)
+        if not cliente:
+            return False, "Cliente não encontrado, fluxo de criação de conta encerrado!"
+        conta = ContaCorrente.nova_conta(cliente=cliente, numero=len(self.contas) + 1)
+        self.contas.append(conta)
+        cliente.adicionar_conta(conta)
+        return True, "Conta criada com sucesso!"
+
+    def filtrar_cliente(self, cpf):
+        clientes_filtrados = [cliente for cliente in self.clientes if cliente.cpf == cpf]
+        return clientes_filtrados[0] if clientes_filtrados else None
+
+    def listar_contas(self):
+        return [str(conta) for conta in self.contas]
+
+
+def medir(banco, clientes, operacoes):
+    cpfs = [f"{i:011d}" for i in range(clientes)]
+    resultados = {}
+
+    inicio = time.perf_counter()
+    for cpf in cpfs:
+        banco.criar_cliente("Cliente", "01-01-1990", cpf, "Rua A, 1 - Centro - Cidade/UF")
+    resultados["criar_cliente"] = (time.perf_counter() - inicio) / clientes
+
+    inicio = time.perf_counter()
+    for cpf in cpfs:
+        banco.criar_conta(cpf)
+    resultados["criar_conta"] = (time.perf_counter() - inicio) / clientes
+
+    amostra = random.Random(42).choices(cpfs, k=operacoes)
+    for operacao, executar in (
+        ("filtrar_cliente", lambda cpf: banco.filtrar_cliente(cpf)),
+        ("depositar", lambda cpf: banco.depositar(cpf, 100)),
+        ("sacar", lambda cpf: banco.sacar(cpf, 10)),
+        ("exibir_extrato", lambda cpf: banco.exibir_extrato(cpf)),
+    ):
+        inicio = time.perf_counter()
+        for cpf in amostra:
+            executar(cpf)
+        resultados[operacao] = (time.perf_counter() - inicio) / operacoes
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=1_000_000)
+    parser.add_argument("--clientes-lista", type=int, default=20_000)
+    parser.add_argument("--operacoes", type=int, default=10_000)
+    args = parser.parse_args()
+
+    for nome, banco, clientes in (
+        ("listas", BancoLista(), args.clientes_lista),
+        ("índices", Banco(), args.clientes),
+    ):
+        operacoes = min(args.operacoes, clientes)
+        # Depósitos e saques imprimem mensagens; descartadas durante a medição
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            resultados = medir(banco, clientes, operacoes)
+
+        print(f"\n{nome} ({clientes:,} clientes, {operacoes:,} operações por tipo)")
+        for operacao, segundos in resultados.items():
+            print(f"  {operacao:<16}{segundos * 1e6:12.2f} µs/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark do diário persistente de main_v2.Banco: vazão de escrita e tempo de recuperação.
+
+Cria C clientes com uma conta cada e registra N depósitos aleatórios em um Banco aberto sobre
+um diretório temporário, medindo operações por segundo com o diário (group commit a cada
+`--lote` registros) e sem ele. Em seguida fecha o Banco e mede o tempo de Banco.abrir, que
+carrega o último snapshot e reaplica a cauda do diário.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.diario_v2 --operacoes 10000000 --clientes 100000
+"""
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from dinheiro import formatar
+from main_v2 import Banco
+
+
+def carregar(banco, clientes, operacoes):
+    cpfs = [f"{i:011d}" for i in range(clientes)]
+    for cpf in cpfs:
+        banco.criar_cliente("Cliente", "01-01-1990", cpf, "Rua A, 1 - Centro - Cidade/UF")
+        banco.criar_conta(cpf)
+
+    aleatorio = random.Random(42)
+    inicio = time.perf_counter()
+    for _ in range(operacoes):
+        banco.depositar(aleatorio.choice(cpfs), aleatorio.randint(1, 100_000))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operacoes", type=int, default=1_000_000)
+    parser.add_argument("--clientes", type=int, default=10_000)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument("--compactar-a-cada", type=int, default=1_000_000)
+    args = parser.parse_args()
+    diretorio = tempfile.mkdtemp(prefix="diario_v2-")
+
+    try:
+        # Depósitos imprimem mensagens; descartadas durante a medição
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            esperado = Banco()
+            memoria = carregar(esperado, args.clientes, args.operacoes)
+            banco = Banco.abrir(diretorio, lote=args.lote, compactar_a_cada=args.compactar_a_cada)
+            diario = carregar(banco, args.clientes, args.operacoes)
+            banco.fechar()
+
+        tamanho = sum(os.path.getsize(os.path.join(diretorio, nome)) for nome in os.listdir(diretorio))
+        inicio = time.perf_counter()
+        banco = Banco.abrir(diretorio)
+        recuperacao = time.perf_counter() - inicio
+        banco.fechar()
+        saldo = sum(conta.saldo for conta in banco.contas.values())
+        consistente = all(conta.saldo == esperado.contas[numero].saldo for numero, conta in banco.contas.items())
+    finally:
+        shutil.rmtree(diretorio)
+
+    print(f"{args.operacoes:,} depósitos em {args.clientes:,} contas (lote={args.lote:,})")
+    print(f"  sem diário     {args.operacoes / memoria:12,.0f} ops/s")
+    print(f"  com diário     {args.operacoes / diario:12,.0f} ops/s")
+    print(f"  recuperação    {recuperacao:12.2f} s ({tamanho / 2**20:,.1f} MiB em disco, saldo total R$ {formatar(saldo)})")
+    print(f"  consistente    {consistente}")
+
+
+if __name__ == "__main__":
+    main()
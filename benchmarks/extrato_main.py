@@ -0,0 +1,103 @@
+"""
+Benchmark do extrato de main.py: texto concatenado a cada operação x Extrato em colunas, formatado só na leitura.
+
+Registra N movimentações em uma conta e mede, para cada forma de guardar o extrato:
+
+- ``registrar``: tempo médio por movimentação (o texto é copiado inteiro a cada ``+=``, pois a conta
+  também o referencia);
+- ``memória``: bytes alocados para guardar o extrato (tracemalloc);
+- ``exibir``: montar todas as linhas do extrato, como exibir_extrato;
+- ``últimas 20`` e ``último dia``: as consultas que o Extrato responde sem percorrer as movimentações antigas.
+
+O Extrato é medido sem limite, com o limite padrão descartando as antigas e com o limite padrão
+gravando as antigas em disco.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.extrato_main --movimentacoes 1000 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import main
+from dinheiro import formatar
+
+INICIO = datetime(2024, 1, 1).timestamp()
+
+
+def registrar_texto(conta, valores):
+    for valor in valores:
+        conta["extrato"] += f"Depósito: R$ {formatar(valor)}\n"
+
+
+def registrar_extrato(conta, valores):
+    extrato = conta["extrato"]
+    for indice, valor in enumerate(valores):
+        # Uma movimentação por minuto
+        extrato.registrar(main.DEPOSITO, valor, INICIO + indice * 60)
+
+
+def medir(nome, novo_extrato, registrar, valores):
+    # Memória medida em uma execução à parte: o tracemalloc deixa as alocações bem mais lentas
+    conta = {"extrato": novo_extrato()}
+    tracemalloc.start()
+    registrar(conta, valores)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    conta = {"extrato": novo_extrato()}
+    inicio = time.perf_counter()
+    registrar(conta, valores)
+    segundos = time.perf_counter() - inicio
+
+    extrato = conta["extrato"]
+    consultas = {}
+    inicio = time.perf_counter()
+    if isinstance(extrato, str):
+        len(extrato.splitlines())
+        consultas["exibir"] = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        extrato.splitlines()[-20:]
+        consultas["últimas 20"] = time.perf_counter() - inicio
+    else:
+        sum(1 for _ in main.linhas_extrato(extrato))
+        consultas["exibir"] = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        list(main.linhas_extrato(extrato.ultimas(20)))
+        consultas["últimas 20"] = time.perf_counter() - inicio
+        ultima = datetime.fromtimestamp(INICIO + (len(valores) - 1) * 60)
+        inicio = time.perf_counter()
+        list(main.linhas_extrato(extrato.periodo(ultima.replace(hour=0, minute=0), ultima.replace(hour=23, minute=59))))
+        consultas["último dia"] = time.perf_counter() - inicio
+
+    colunas = [segundos / len(valores) * 1e6, memoria / 1024]
+    colunas += [consultas.get(chave, float("nan")) * 1000 for chave in ("exibir", "últimas 20", "último dia")]
+    print(f"  {nome:<22}" + "".join(f"{valor:>14,.2f}" for valor in colunas))
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movimentacoes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    cabecalho = ("registrar µs", "memória KiB", "exibir ms", "últimas 20 ms", "último dia ms")
+    for quantidade in args.movimentacoes:
+        valores = [indice % 100_000 + 1 for indice in range(quantidade)]
+        print(f"\n{quantidade:,} movimentações" + " " * 5 + "".join(f"{coluna:>14}" for coluna in cabecalho))
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo = os.path.join(pasta, "extrato.bin")
+            for nome, novo_extrato, registrar in (
+                ("texto", str, registrar_texto),
+                ("Extrato sem limite", lambda: main.Extrato(limite=quantidade + 1), registrar_extrato),
+                ("Extrato descartando", main.Extrato, registrar_extrato),
+                ("Extrato em disco", lambda: main.Extrato(arquivo=arquivo), registrar_extrato),
+            ):
+                medir(nome, novo_extrato, registrar, valores)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,88 @@
+"""
+Benchmark de memória do main_v2.Historico: colunas em arrays x lista de dicionários.
+
+Registra N transações em um histórico e mede, com tracemalloc, a memória alocada por
+transação e o tempo de registro e de renderização do extrato. A versão com dicionários é a
+implementação anterior, que guardava um dicionário com a data já formatada por transação.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.historico_v2 --transacoes 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+
+from dinheiro import formatar
+from main_v2 import Deposito, Historico, Saque
+
+
+class HistoricoDicionarios(Historico):
+    """Implementação anterior: um dicionário por transação, com a data formatada no registro."""
+
+    __slots__ = ("_transacoes",)
+
+    def __init__(self):
+        super().__init__()
+        self._transacoes = []
+
+    def __len__(self):
+        return len(self._transacoes)
+
+    def __iter__(self):
+        for transacao in self._transacoes:
+            yield transacao["tipo"], transacao["valor"], transacao["data"]
+
+    def adicionar_transacao(self, transacao):
+        self._transacoes.append(
+            {
+                "tipo": transacao.__class__.__name__,
+                "valor": transacao.valor,
+                "data": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),
+            }
+        )
+
+
+def registrar(historico, transacoes):
+    operacoes = [Deposito(100_25), Saque(10_50)]
+    for indice in range(transacoes):
+        historico.adicionar_transacao(operacoes[indice % 2])
+
+
+def medir(classe, transacoes):
+    # Memória medida em uma carga separada, pois o tracemalloc distorce os tempos
+    tracemalloc.start()
+    historico = classe()
+    registrar(historico, transacoes)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del historico
+
+    historico = classe()
+    inicio = time.perf_counter()
+    registrar(historico, transacoes)
+    registro = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    extrato = "".join(f"\n{tipo}:\n\tR$ {formatar(valor)}" for tipo, valor, _ in historico)
+    renderizacao = time.perf_counter() - inicio
+    assert extrato.count("\n") == transacoes * 2
+    return memoria / transacoes, registro / transacoes, renderizacao / transacoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacoes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    for nome, classe in (("dicionários", HistoricoDicionarios), ("colunas", Historico)):
+        memoria, registro, renderizacao = medir(classe, args.transacoes)
+        print(
+            f"{nome:<12}{memoria:10.1f} bytes/transação{registro * 1e6:10.2f} µs/registro"
+            f"{renderizacao * 1e6:10.2f} µs/linha do extrato"
+        )
+
+
+if __name__ == "__main__":
+    main()
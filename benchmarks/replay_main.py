@@ -0,0 +1,94 @@
+"""
+Benchmark da reprodução em lote de main.py: lojas indexadas por dicionário x listas com busca linear.
+
+Gera um log CSV com --clientes clientes (uma conta cada) seguidos de --operacoes depósitos, saques e
+extratos em contas sorteadas, e o reproduz com ``main.reproduzir_arquivo``, que grava os resultados e os
+saldos finais. A versão com listas (a implementação anterior de filtrar_cliente e contas_do_cliente) é
+medida sobre um log menor, pois cada operação nela percorre todos os clientes e contas.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.replay_main --clientes 100000 --operacoes 10000000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+import main
+
+
+def gerar_log(caminho, clientes, operacoes, semente=42):
+    sorteio = random.Random(semente)
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escrever = csv.writer(arquivo).writerow
+        escrever(main.CAMPOS)
+        for i in range(clientes):
+            escrever(("nu", f"{i:011d}", "Cliente", "01-01-1990", "Rua A, 1 - Centro - Cidade/UF", "", ""))
+        for i in range(clientes):
+            escrever(("nc", f"{i:011d}", "", "", "", "", ""))
+        for _ in range(operacoes):
+            numero = sorteio.randrange(clientes)
+            operacao = sorteio.choices(("d", "s", "e"), weights=(6, 3, 1))[0]
+            valor = f"{sorteio.randrange(1, 500)}.{sorteio.randrange(100):02d}" if operacao != "e" else ""
+            escrever((operacao, f"{numero:011d}", "", "", "", numero + 1, valor))
+    return 2 * clientes + operacoes
+
+
+class ListaIndexada(dict):
+    # Loja com a interface de dicionário usada por main.py, mas cujas buscas percorrem a lista
+    # inteira, como filtrar_cliente e contas_do_cliente faziam antes
+
+    def get(self, chave, padrao=None):
+        return next((valor for atual, valor in self.items() if atual == chave), padrao)
+
+    def __contains__(self, chave):
+        return self.get(chave) is not None
+
+
+def reproduzir(caminho, resultados, clientes=None, contas=None):
+    with open(caminho, newline="", encoding="utf-8") as entrada, \
+            open(resultados, "w", newline="", encoding="utf-8") as saida:
+        return main.reproduzir(main.ler_operacoes(entrada, "csv"), saida, clientes=clientes, contas=contas)
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=100_000)
+    parser.add_argument("--operacoes", type=int, default=1_000_000)
+    parser.add_argument("--clientes-lista", type=int, default=5_000)
+    parser.add_argument("--operacoes-lista", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        log, resultados, saldos = (os.path.join(pasta, nome) for nome in ("log.csv", "resultados.csv", "saldos.csv"))
+
+        inicio = time.perf_counter()
+        total = gerar_log(log, args.clientes, args.operacoes)
+        tamanho = os.path.getsize(log) / 1e6
+        print(f"log: {total:,} operações, {tamanho:,.0f} MB, gerado em {time.perf_counter() - inicio:.1f}s")
+
+        inicio = time.perf_counter()
+        estatisticas = main.reproduzir_arquivo(log, resultados, saldos)
+        total_segundos = time.perf_counter() - inicio
+        print(
+            f"índices: {estatisticas['operacoes']:,} operações ({estatisticas['falhas']:,} falhas) em "
+            f"{total_segundos:.1f}s com saldos finais, {estatisticas['operacoes_por_segundo']:,.0f} operações/s"
+        )
+
+        total = gerar_log(log, args.clientes_lista, args.operacoes_lista)
+        estatisticas = reproduzir(log, resultados, ListaIndexada(), ListaIndexada())
+        operacoes_por_segundo = estatisticas["operacoes_por_segundo"]
+        # Na versão com listas o custo de cada operação cresce linearmente com o número de clientes
+        estimativa = args.operacoes / operacoes_por_segundo * args.clientes / args.clientes_lista
+        print(
+            f"listas ({args.clientes_lista:,} clientes): {total:,} operações em {estatisticas['segundos']:.1f}s, "
+            f"{operacoes_por_segundo:,.0f} operações/s; {args.operacoes:,} operações sobre "
+            f"{args.clientes:,} clientes levariam ~{estimativa / 3600:,.1f}h"
+        )
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,63 @@
+"""
+Benchmark de ContaCorrente.sacar: contadores por tipo no Historico x varredura do histórico.
+
+Registra N saques em uma única conta e mede o tempo médio por saque. A versão com varredura
+é a implementação anterior, que percorria todas as transações a cada saque (O(n) por saque,
+O(n²) no total), e por isso é medida com menos operações.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.saques_v2 --saques 1000000 --saques-varredura 20000
+"""
+import argparse
+import contextlib
+import os
+import time
+
+from main_v2 import ContaCorrente, PessoaFisica, Saque
+
+
+class ContaCorrenteVarredura(ContaCorrente):
+    """Implementação anterior: conta os saques percorrendo o histórico inteiro."""
+
+    __slots__ = ()
+
+    def sacar(self, valor):
+        numero_saques = len([tipo for tipo, _, _ in self.historico if tipo == Saque.__name__])
+        if numero_saques >= self._limite_saques:
+            print("\n@@@ Operação falhou! Número máximo de saques excedido. @@@")
+            return False
+        return super(ContaCorrente, self).sacar(valor)
+
+
+def medir(classe, saques):
+    cliente = PessoaFisica(nome="Cliente", data_nascimento="01-01-1990", cpf="0", endereco="Rua A")
+    # Limites altos para que todos os saques sejam aceitos e registrados no histórico
+    conta = classe(numero=1, cliente=cliente, limite=10, limite_saques=saques)
+    conta._saldo = saques * 10
+
+    inicio = time.perf_counter()
+    for _ in range(saques):
+        Saque(10).registrar(conta)
+    segundos = time.perf_counter() - inicio
+    assert len(conta.historico.transacoes) == saques
+    return segundos / saques
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saques", type=int, default=1_000_000)
+    parser.add_argument("--saques-varredura", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for nome, classe, saques in (
+        ("varredura", ContaCorrenteVarredura, args.saques_varredura),
+        ("contadores", ContaCorrente, args.saques),
+    ):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            segundos = medir(classe, saques)
+        print(f"{nome:<12}{saques:>12,} saques{segundos * 1e6:12.2f} µs/saque")
+
+
+if __name__ == "__main__":
+    main()
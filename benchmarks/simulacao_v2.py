@@ -0,0 +1,107 @@
+"""
+Benchmark do BancoDistribuido (simulacao_v2): operações por segundo conforme o número de processos.
+
+Cria --clientes clientes (uma conta cada) e aplica --operacoes depósitos e saques aleatórios. Mede:
+
+- ``Banco``: um único main_v2.Banco no próprio processo, sem roteamento (referência);
+- ``roteador``: só o trabalho do processo principal (shard pelo CPF, lotes e serialização com pickle, sem
+  enviar): o teto de vazão do BancoDistribuido, qualquer que seja o número de processos;
+- ``N processos``: o BancoDistribuido com N shards, do primeiro lote até o resumo final.
+
+A criação dos clientes e das contas fica fora da medição. A escala depende de haver núcleos livres:
+com mais processos do que núcleos, os shards disputam a mesma CPU.
+
+Uso (a partir da raiz do repositório):
+
+    python -m benchmarks.simulacao_v2 --clientes 1000000 --operacoes 5000000 --processos 1 2 4 8
+"""
+import argparse
+import contextlib
+import os
+import pickle
+import random
+import time
+
+import diario_v2
+from main_v2 import Banco
+from simulacao_v2 import BancoDistribuido, shard_do_cpf
+
+
+def gerar(clientes, operacoes, semente=42):
+    rng = random.Random(semente)
+    cpfs = [f"{i:011d}" for i in range(clientes)]
+    cadastro = [(diario_v2.CLIENTE, "Cliente", "01-01-1990", cpf, "Rua A, 1 - Centro - Cidade/UF") for cpf in cpfs]
+    cadastro += [(diario_v2.CONTA, cpf) for cpf in cpfs]
+    movimentos = [
+        (diario_v2.DEPOSITO if rng.random() < 0.6 else diario_v2.SAQUE, rng.choice(cpfs), rng.randrange(1, 300_00))
+        for _ in range(operacoes)
+    ]
+    return cadastro, movimentos
+
+
+def medir_banco(cadastro, movimentos):
+    banco = Banco()
+    for _, nome, data_nascimento, cpf, endereco in cadastro[: len(cadastro) // 2]:
+        banco.criar_cliente(nome, data_nascimento, cpf, endereco)
+    for _, cpf in cadastro[len(cadastro) // 2 :]:
+        banco.criar_conta(cpf)
+
+    inicio = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for codigo, cpf, valor in movimentos:
+            if codigo == diario_v2.DEPOSITO:
+                banco.depositar(cpf, valor)
+            else:
+                banco.sacar(cpf, valor)
+    return time.perf_counter() - inicio
+
+
+def medir_roteador(movimentos, processos, lote):
+    lotes = [[] for _ in range(processos)]
+    inicio = time.perf_counter()
+    for operacao in movimentos:
+        destino = lotes[shard_do_cpf(operacao[1], processos)]
+        destino.append(operacao)
+        if len(destino) >= lote:
+            pickle.dumps(destino, pickle.HIGHEST_PROTOCOL)
+            destino.clear()
+    return time.perf_counter() - inicio
+
+
+def medir_distribuido(cadastro, movimentos, processos, lote):
+    with BancoDistribuido(processos=processos, lote=lote) as banco:
+        banco.executar(cadastro)
+        banco.resumo()
+
+        inicio = time.perf_counter()
+        banco.executar(movimentos)
+        resumo = banco.resumo()
+        segundos = time.perf_counter() - inicio
+    assert resumo["total_Deposito"] - resumo["total_Saque"] == resumo["saldo"]
+    return segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=200_000)
+    parser.add_argument("--operacoes", type=int, default=2_000_000)
+    parser.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--lote", type=int, default=10_000)
+    args = parser.parse_args()
+
+    cadastro, movimentos = gerar(args.clientes, args.operacoes)
+    print(f"{args.clientes:,} clientes, {args.operacoes:,} operações, {os.cpu_count()} núcleos, lotes de {args.lote:,}")
+    print(f"{'':<14}{'segundos':>10}{'ops/s':>14}{'x Banco':>10}")
+
+    referencia = medir_banco(cadastro, movimentos)
+    print(f"{'Banco':<14}{referencia:>10.2f}{args.operacoes / referencia:>14,.0f}{1:>10.2f}")
+    segundos = medir_roteador(movimentos, max(args.processos), args.lote)
+    print(f"{'roteador':<14}{segundos:>10.2f}{args.operacoes / segundos:>14,.0f}{referencia / segundos:>10.2f}")
+    for processos in sorted(set(args.processos)):
+        segundos = medir_distribuido(cadastro, movimentos, processos, args.lote)
+        nome = f"{processos} processos"
+        print(f"{nome:<14}{segundos:>10.2f}{args.operacoes / segundos:>14,.0f}{referencia / segundos:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
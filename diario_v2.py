@@ -0,0 +1,212 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+# Códigos das operações gravadas no diário
+CLIENTE = 1
+CONTA = 2
+DEPOSITO = 3
+SAQUE = 4
+
+# Cada registro: tamanho do corpo e CRC32 do corpo, seguidos do corpo (código da operação + campos)
+CABECALHO = struct.Struct("<II")
+TRANSACAO = struct.Struct("<Qqd")
+NUMERO_CONTA = struct.Struct("<Q")
+TAMANHO_TEXTO = struct.Struct("<H")
+
+ARQUIVO_SNAPSHOT = "snapshot.pkl"
+
+
+class Diario:
+    # Diário de escrita antecipada (write-ahead) do Banco, com snapshots compactados.
+    #
+    # Os registros são acumulados em memória e gravados com um único fsync a cada `lote`
+    # registros (group commit). Uma thread grava os pendentes quando o mais antigo completa
+    # `intervalo` segundos, mesmo que nenhuma outra operação chegue: uma queda perde no máximo os
+    # registros dos últimos `intervalo` segundos, mais a duração de um fsync. Com `intervalo` zero
+    # cada registro é sincronizado antes de registrar() retornar; sincronizar()/fechar() esvaziam
+    # o buffer na hora. A cada `compactar_a_cada` registros o estado inteiro é gravado em um
+    # snapshot e o diário recomeça vazio, de modo que a recuperação só relê a cauda. O diário da
+    # geração N contém o que aconteceu depois do snapshot N - 1.
+
+    def __init__(self, diretorio, lote=1000, intervalo=0.05, compactar_a_cada=1_000_000):
+        self.diretorio = diretorio
+        self.lote = lote
+        self.intervalo = intervalo
+        self.compactar_a_cada = compactar_a_cada
+        self._arquivo = None
+        self._geracao = 0
+        self._buffer = bytearray()
+        self._pendentes = 0
+        self._registros = 0
+        self._primeiro_pendente = 0.0
+        # Protege o buffer e o arquivo, compartilhados com a thread que sincroniza por tempo
+        self._condicao = threading.Condition()
+        self._thread = None
+        os.makedirs(diretorio, exist_ok=True)
+
+    @property
+    def precisa_compactar(self):
+        return self._registros >= self.compactar_a_cada
+
+    def recuperar(self, restaurar, aplicar):
+        # Restaura o último snapshot e reaplica os registros gravados depois dele, descartando um
+        # registro final incompleto ou corrompido; em seguida abre o diário para novas gravações
+        caminho = os.path.join(self.diretorio, ARQUIVO_SNAPSHOT)
+        if os.path.exists(caminho):
+            with open(caminho, "rb") as arquivo:
+                self._geracao, estado = pickle.load(arquivo)
+            restaurar(estado)
+
+        self._geracao += 1
+        for nome in os.listdir(self.diretorio):
+            # Diários já incorporados ao snapshot (queda durante a compactação)
+            if nome.startswith("diario-") and nome != self._nome_diario():
+                os.remove(os.path.join(self.diretorio, nome))
+
+        caminho = os.path.join(self.diretorio, self._nome_diario())
+        self._registros, tamanho_valido = _reaplicar(caminho, aplicar)
+        self._arquivo = open(caminho, "ab")
+        self._arquivo.truncate(tamanho_valido)
+        if self.intervalo > 0:
+            self._thread = threading.Thread(target=self._sincronizar_por_tempo, daemon=True)
+            self._thread.start()
+
+    def registrar(self, operacao, *campos):
+        corpo = bytes((operacao,)) + _codificar(operacao, campos)
+        with self._condicao:
+            if not self._buffer:
+                # Primeiro registro pendente: a thread passa a contar o intervalo a partir dele
+                self._primeiro_pendente = time.monotonic()
+                self._condicao.notify()
+            self._buffer += CABECALHO.pack(len(corpo), zlib.crc32(corpo))
+            self._buffer += corpo
+            self._pendentes += 1
+            self._registros += 1
+            if self._pendentes >= self.lote or self.intervalo <= 0:
+                self._gravar()
+
+    def sincronizar(self):
+        with self._condicao:
+            self._gravar()
+
+    def _gravar(self):
+        if self._buffer:
+            self._arquivo.write(self._buffer)
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._buffer.clear()
+        self._pendentes = 0
+
+    def _sincronizar_por_tempo(self):
+        with self._condicao:
+            while self._arquivo is not None:
+                if not self._buffer:
+                    self._condicao.wait()
+                    continue
+                espera = self._primeiro_pendente + self.intervalo - time.monotonic()
+                if espera > 0:
+                    self._condicao.wait(espera)
+                    continue
+                self._gravar()
+
+    def compactar(self, estado):
+        # Grava o estado completo do Banco em um novo snapshot e recomeça o diário
+        with self._condicao:
+            self._gravar()
+            self._compactar(estado)
+
+    def _compactar(self, estado):
+        caminho = os.path.join(self.diretorio, ARQUIVO_SNAPSHOT)
+        with open(caminho + ".tmp", "wb") as arquivo:
+            pickle.dump((self._geracao, estado), arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(caminho + ".tmp", caminho)
+        _sincronizar_diretorio(self.diretorio)
+
+        anterior = os.path.join(self.diretorio, self._nome_diario())
+        self._arquivo.close()
+        self._geracao += 1
+        self._arquivo = open(os.path.join(self.diretorio, self._nome_diario()), "ab")
+        os.remove(anterior)
+        self._registros = 0
+
+    def fechar(self):
+        with self._condicao:
+            if self._arquivo is None:
+                return
+            self._gravar()
+            self._arquivo.close()
+            self._arquivo = None
+            self._condicao.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _nome_diario(self):
+        return f"diario-{self._geracao:08d}.log"
+
+
+def _codificar(operacao, campos):
+    if operacao in (DEPOSITO, SAQUE):
+        return TRANSACAO.pack(*campos)
+    if operacao == CONTA:
+        numero, cpf = campos
+        return NUMERO_CONTA.pack(numero) + _codificar_texto(cpf)
+    return b"".join(_codificar_texto(campo) for campo in campos)
+
+
+def _codificar_texto(texto):
+    dados = texto.encode()
+    return TAMANHO_TEXTO.pack(len(dados)) + dados
+
+
+def _decodificar(corpo):
+    operacao = corpo[0]
+    if operacao in (DEPOSITO, SAQUE):
+        return (operacao, *TRANSACAO.unpack_from(corpo, 1))
+    posicao = 1
+    campos = []
+    if operacao == CONTA:
+        campos.append(NUMERO_CONTA.unpack_from(corpo, posicao)[0])
+        posicao += NUMERO_CONTA.size
+    while posicao < len(corpo):
+        (tamanho,) = TAMANHO_TEXTO.unpack_from(corpo, posicao)
+        posicao += TAMANHO_TEXTO.size
+        campos.append(bytes(corpo[posicao : posicao + tamanho]).decode())
+        posicao += tamanho
+    return (operacao, *campos)
+
+
+def _reaplicar(caminho, aplicar):
+    if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+        return 0, 0
+
+    registros = 0
+    with open(caminho, "rb") as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+        posicao = 0
+        while posicao + CABECALHO.size <= len(dados):
+            tamanho, crc = CABECALHO.unpack_from(dados, posicao)
+            inicio = posicao + CABECALHO.size
+            corpo = dados[inicio : inicio + tamanho]
+            # Registro final gravado pela metade ou corrompido: o diário termina antes dele
+            if len(corpo) < tamanho or zlib.crc32(corpo) != crc:
+                break
+            aplicar(*_decodificar(corpo))
+            registros += 1
+            posicao = inicio + tamanho
+    return registros, posicao
+
+
+def _sincronizar_diretorio(diretorio):
+    if hasattr(os, "O_DIRECTORY"):
+        descritor = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descritor)
+        finally:
+            os.close(descritor)
@@ -0,0 +1,42 @@
+import math
+import re
+from decimal import Decimal
+
+# Valores monetários são inteiros em centavos; reais só aparecem na entrada e na exibição
+CENTAVOS = 100
+
+_VALOR = re.compile(r"(-?)(\d+)(?:[.,](\d{1,2}))?")
+
+
+def centavos(valor):
+    # Converte um valor em reais (texto digitado, inteiro, Decimal ou float) em centavos, sem
+    # aritmética de ponto flutuante sobre o resultado; frações de centavo são recusadas
+    if type(valor) is str:
+        encontrado = _VALOR.fullmatch(valor.strip())
+        if not encontrado:
+            raise ValueError("valor inválido")
+        sinal, reais, fracao = encontrado.groups()
+        total = int(reais) * CENTAVOS + int((fracao or "").ljust(2, "0"))
+        return -total if sinal else total
+    if type(valor) is int:
+        return valor * CENTAVOS
+    if type(valor) is float:
+        # Aceito só se for exatamente o float mais próximo de um número inteiro de centavos
+        if not math.isfinite(valor):
+            raise ValueError("valor inválido")
+        total = round(valor * CENTAVOS)
+        if total / CENTAVOS != valor:
+            raise ValueError("valor com mais de duas casas decimais")
+        return total
+    if isinstance(valor, Decimal) and valor.is_finite():
+        total = valor.scaleb(2)
+        if total != total.to_integral_value():
+            raise ValueError("valor com mais de duas casas decimais")
+        return int(total)
+    raise ValueError("valor inválido")
+
+
+def formatar(valor):
+    # Centavos em reais com duas casas decimais: 123450 -> "1234.50"
+    reais, resto = divmod(abs(valor), CENTAVOS)
+    return f"{'-' if valor < 0 else ''}{reais}.{resto:02d}"
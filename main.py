@@ -1,6 +1,17 @@
 # Sistema bancário simples com clientes, contas e operações
 
-from typing import List, Dict, Optional
+import csv
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from dinheiro import centavos, formatar
 
 
 def menu() -> str:
@@ -19,11 +30,29 @@ def menu() -> str:
 
 # ----------------------------- Clientes ----------------------------- #
 
-def filtrar_cliente(cpf: str, clientes: List[Dict]) -> Optional[Dict]:
-    return next((c for c in clientes if c["cpf"] == cpf), None)
+# Clientes indexados pelo CPF e contas pelo número; cada cliente guarda as próprias contas
+
+def filtrar_cliente(cpf: str, clientes: Dict[str, Dict]) -> Optional[Dict]:
+    return clientes.get(cpf)
+
 
+def cadastrar_cliente(
+    cpf: str, nome: str, data_nascimento: str, endereco: str, clientes: Dict[str, Dict]
+) -> Tuple[bool, str]:
+    if cpf in clientes:
+        return False, "Já existe cliente com esse CPF."
+
+    clientes[cpf] = {
+        "cpf": cpf,
+        "nome": nome,
+        "data_nascimento": data_nascimento,
+        "endereco": endereco,
+        "contas": [],
+    }
+    return True, "Cliente criado com sucesso."
 
-def criar_cliente(clientes: List[Dict]) -> None:
+
+def criar_cliente(clientes: Dict[str, Dict]) -> None:
     cpf = input("Informe o CPF (somente números): ").strip()
     if filtrar_cliente(cpf, clientes):
         print("\nJá existe cliente com esse CPF.")
@@ -35,26 +64,19 @@ def criar_cliente(clientes: List[Dict]) -> None:
         "Informe o endereço (logradouro, nro - bairro - cidade/UF): "
     ).strip()
 
-    clientes.append(
-        {
-            "cpf": cpf,
-            "nome": nome,
-            "data_nascimento": data_nascimento,
-            "endereco": endereco,
-        }
-    )
-    print("\nCliente criado com sucesso.")
+    _, mensagem = cadastrar_cliente(cpf, nome, data_nascimento, endereco, clientes)
+    print(f"\n{mensagem}")
 
 
 # ----------------------------- Contas ----------------------------- #
 
-def listar_contas(contas: List[Dict], clientes: List[Dict]) -> None:
+def listar_contas(contas: Dict[int, Dict], clientes: Dict[str, Dict]) -> None:
     if not contas:
         print("\nNão há contas cadastradas.")
         return
 
     print("\n=========== LISTA DE CONTAS ===========")
-    for conta in contas:
+    for conta in contas.values():
         cliente = filtrar_cliente(conta["cliente_cpf"], clientes)
         nome = cliente["nome"] if cliente else "<desconhecido>"
         print(
@@ -66,42 +88,66 @@ def listar_contas(contas: List[Dict], clientes: List[Dict]) -> None:
 essa_conta_inexistente = "\nOperação falhou! Conta inexistente para este CPF."
 
 
-def criar_conta(
+def abrir_conta(
     agencia: str,
     numero_conta: int,
-    clientes: List[Dict],
-    contas: List[Dict],
+    cpf: str,
+    clientes: Dict[str, Dict],
+    contas: Dict[int, Dict],
+    diretorio_extratos: Optional[str] = None,
+    extrato_completo: bool = False,
 ) -> Optional[Dict]:
-    cpf = input("Informe o CPF do cliente: ").strip()
     cliente = filtrar_cliente(cpf, clientes)
-
     if not cliente:
-        print("\nCliente não encontrado, crie o cliente antes de criar a conta.")
         return None
 
+    arquivo_extrato = None
+    if diretorio_extratos:
+        arquivo_extrato = os.path.join(diretorio_extratos, f"extrato_{agencia}_{numero_conta}.bin")
+
     conta = {
         "agencia": agencia,
         "numero": numero_conta,
         "cliente_cpf": cpf,
-        "saldo": 0.0,
-        "extrato": "",
-        "limite": 500.0,
+        # Valores em centavos
+        "saldo": 0,
+        "extrato": Extrato(None if extrato_completo else LIMITE_EXTRATO, arquivo_extrato),
+        "limite": 500_00,
         "numero_saques": 0,
         "limite_saques": 3,
     }
-    contas.append(conta)
+    contas[numero_conta] = conta
+    cliente["contas"].append(conta)
+    return conta
+
+
+def criar_conta(
+    agencia: str,
+    numero_conta: int,
+    clientes: Dict[str, Dict],
+    contas: Dict[int, Dict],
+) -> Optional[Dict]:
+    cpf = input("Informe o CPF do cliente: ").strip()
+    # No menu o extrato guarda todas as movimentações: sem arquivo, o limite descartaria as mais antigas
+    conta = abrir_conta(agencia, numero_conta, cpf, clientes, contas, extrato_completo=True)
+
+    if not conta:
+        print("\nCliente não encontrado, crie o cliente antes de criar a conta.")
+        return None
+
     print(
-        f"\nConta criada com sucesso. Agência {agencia}, Conta {numero_conta} para {cliente['nome']}."
+        f"\nConta criada com sucesso. Agência {agencia}, Conta {numero_conta} para {clientes[cpf]['nome']}."
     )
     return conta
 
 
-def contas_do_cliente(cpf: str, contas: List[Dict]) -> List[Dict]:
-    return [c for c in contas if c["cliente_cpf"] == cpf]
+def contas_do_cliente(cpf: str, clientes: Dict[str, Dict]) -> List[Dict]:
+    cliente = filtrar_cliente(cpf, clientes)
+    return cliente["contas"] if cliente else []
 
 
-def selecionar_conta_por_cliente(cpf: str, contas: List[Dict]) -> Optional[Dict]:
-    contas_cliente = contas_do_cliente(cpf, contas)
+def selecionar_conta_por_cliente(cpf: str, clientes: Dict[str, Dict]) -> Optional[Dict]:
+    contas_cliente = contas_do_cliente(cpf, clientes)
     if not contas_cliente:
         print("\nCliente não possui contas.")
         return None
@@ -125,49 +171,315 @@ def selecionar_conta_por_cliente(cpf: str, contas: List[Dict]) -> Optional[Dict]
     return conta
 
 
+# ----------------------------- Extrato ----------------------------- #
+
+# Movimentações por tipo
+DEPOSITO = 0
+SAQUE = 1
+TIPOS = ("Depósito", "Saque")
+
+# Movimentações mantidas em memória por conta; as mais antigas vão para o disco ou são descartadas
+LIMITE_EXTRATO = 1000
+
+# Registro de uma movimentação no arquivo do extrato: tipo, valor em centavos e data (segundos desde a época)
+MOVIMENTACAO = struct.Struct("<Bqd")
+
+
+class Extrato:
+    # Movimentações de uma conta em colunas compactas (tipo, valor e data), formatadas só quando lidas.
+    #
+    # Guarda em memória no máximo `limite` movimentações (None: todas). Ao passar do limite, a metade
+    # mais antiga é acrescentada ao `arquivo` (registros de tamanho fixo, em ordem) ou, sem arquivo,
+    # descartada; as descartadas continuam contadas em len(). As datas nunca diminuem, de modo que as
+    # consultas por período fazem busca binária na memória e no arquivo e só leem as movimentações pedidas.
+    __slots__ = ("_tipos", "_valores", "_datas", "limite", "arquivo", "_em_disco", "_descartadas")
+
+    def __init__(self, limite: Optional[int] = LIMITE_EXTRATO, arquivo: Optional[str] = None):
+        self._tipos = array("B")
+        self._valores = array("q")
+        self._datas = array("d")
+        self.limite = limite
+        self.arquivo = arquivo
+        self._em_disco = 0
+        self._descartadas = 0
+
+    def __len__(self) -> int:
+        return self._descartadas + self._em_disco + len(self._tipos)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, float]]:
+        # Tuplas (tipo, valor, data) das movimentações disponíveis, das mais antigas às mais recentes
+        yield from self._ler_disco(0, self._em_disco)
+        yield from zip(self._tipos, self._valores, self._datas)
+
+    @property
+    def descartadas(self) -> int:
+        return self._descartadas
+
+    def registrar(self, tipo: int, valor: int, data: Optional[float] = None) -> None:
+        data = time.time() if data is None else data
+        if self._datas and data < self._datas[-1]:
+            # Relógio voltou: mantém a ordem das datas para a busca por período
+            data = self._datas[-1]
+        self._tipos.append(tipo)
+        self._valores.append(valor)
+        self._datas.append(data)
+        if self.limite is not None and len(self._tipos) > self.limite:
+            self._liberar_memoria()
+
+    def ultimas(self, quantidade: int) -> Iterator[Tuple[int, int, float]]:
+        em_memoria = len(self._tipos)
+        do_disco = min(max(quantidade - em_memoria, 0), self._em_disco)
+        yield from self._ler_disco(self._em_disco - do_disco, self._em_disco)
+        inicio = max(em_memoria - quantidade, 0)
+        yield from zip(self._tipos[inicio:], self._valores[inicio:], self._datas[inicio:])
+
+    def periodo(self, inicio: datetime, fim: datetime) -> Iterator[Tuple[int, int, float]]:
+        # Movimentações com inicio <= data < fim
+        inicio, fim = inicio.timestamp(), fim.timestamp()
+        if self._em_disco and (not self._datas or inicio < self._datas[0]):
+            primeira = self._buscar_disco(inicio)
+            yield from self._ler_disco(primeira, self._buscar_disco(fim, primeira))
+        primeira, ultima = bisect_left(self._datas, inicio), bisect_left(self._datas, fim)
+        yield from zip(self._tipos[primeira:ultima], self._valores[primeira:ultima], self._datas[primeira:ultima])
+
+    def _liberar_memoria(self) -> None:
+        quantidade = len(self._tipos) // 2
+        if self.arquivo:
+            antigas = zip(self._tipos[:quantidade], self._valores[:quantidade], self._datas[:quantidade])
+            registros = b"".join(MOVIMENTACAO.pack(tipo, valor, data) for tipo, valor, data in antigas)
+            with open(self.arquivo, "ab" if self._em_disco else "wb") as arquivo:
+                arquivo.write(registros)
+            self._em_disco += quantidade
+        else:
+            self._descartadas += quantidade
+        del self._tipos[:quantidade]
+        del self._valores[:quantidade]
+        del self._datas[:quantidade]
+
+    def _ler_disco(self, primeira: int, ultima: int) -> Iterator[Tuple[int, int, float]]:
+        if primeira >= ultima:
+            return
+        with open(self.arquivo, "rb") as arquivo:
+            arquivo.seek(primeira * MOVIMENTACAO.size)
+            yield from MOVIMENTACAO.iter_unpack(arquivo.read((ultima - primeira) * MOVIMENTACAO.size))
+
+    def _buscar_disco(self, data: float, primeira: int = 0) -> int:
+        # Posição da primeira movimentação em disco com data >= data
+        ultima = self._em_disco
+        with open(self.arquivo, "rb") as arquivo:
+            while primeira < ultima:
+                meio = (primeira + ultima) // 2
+                arquivo.seek(meio * MOVIMENTACAO.size)
+                if MOVIMENTACAO.unpack(arquivo.read(MOVIMENTACAO.size))[2] < data:
+                    primeira = meio + 1
+                else:
+                    ultima = meio
+        return primeira
+
+
+def linhas_extrato(movimentacoes: Iterable[Tuple[int, int, float]], com_data: bool = False) -> Iterator[str]:
+    for tipo, valor, data in movimentacoes:
+        if com_data:
+            yield f"{datetime.fromtimestamp(data):%d-%m-%Y %H:%M:%S}  {TIPOS[tipo]}: R$ {formatar(valor)}"
+        else:
+            yield f"{TIPOS[tipo]}: R$ {formatar(valor)}"
+
+
 # ----------------------------- Operações ----------------------------- #
 
-def depositar(conta: Dict, valor: float) -> None:
+# Depósitos e saques devolvem (sucesso, mensagem) sem imprimir: o menu mostra a mensagem e a
+# reprodução em lote a grava no arquivo de resultados
+
+def depositar(conta: Dict, valor: int) -> Tuple[bool, str]:
     if valor > 0:
         conta["saldo"] += valor
-        conta["extrato"] += f"Depósito: R$ {valor:.2f}\n"
-        print("\nDepósito realizado com sucesso.")
-    else:
-        print("\nOperação falhou! O valor informado é inválido.")
+        conta["extrato"].registrar(DEPOSITO, valor)
+        return True, "Depósito realizado com sucesso."
+    return False, "Operação falhou! O valor informado é inválido."
 
 
-def sacar(conta: Dict, valor: float) -> None:
+def sacar(conta: Dict, valor: int) -> Tuple[bool, str]:
     excedeu_saldo = valor > conta["saldo"]
     excedeu_limite = valor > conta["limite"]
     excedeu_saques = conta["numero_saques"] >= conta["limite_saques"]
 
     if excedeu_saldo:
-        print("\nOperação falhou! Você não tem saldo suficiente.")
+        return False, "Operação falhou! Você não tem saldo suficiente."
     elif excedeu_limite:
-        print("\nOperação falhou! O valor do saque excede o limite.")
+        return False, "Operação falhou! O valor do saque excede o limite."
     elif excedeu_saques:
-        print("\nOperação falhou! Número máximo de saques excedido.")
+        return False, "Operação falhou! Número máximo de saques excedido."
     elif valor > 0:
         conta["saldo"] -= valor
-        conta["extrato"] += f"Saque: R$ {valor:.2f}\n"
+        conta["extrato"].registrar(SAQUE, valor)
         conta["numero_saques"] += 1
-        print("\nSaque realizado com sucesso.")
-    else:
-        print("\nOperação falhou! O valor informado é inválido.")
+        return True, "Saque realizado com sucesso."
+    return False, "Operação falhou! O valor informado é inválido."
 
 
-def exibir_extrato(conta: Dict) -> None:
+def exibir_extrato(conta: Dict, ultimas: Optional[int] = None) -> None:
+    # Imprime uma movimentação por vez, sem montar o extrato inteiro em um texto
+    extrato = conta["extrato"]
     print("\n================ EXTRATO ================")
-    print("Não foram realizadas movimentações." if not conta["extrato"] else conta["extrato"])
-    print(f"\nSaldo: R$ {conta['saldo']:.2f}")
+    if not extrato:
+        print("Não foram realizadas movimentações.")
+    else:
+        if extrato.descartadas and ultimas is None:
+            print(f"({extrato.descartadas} movimentações mais antigas não estão mais disponíveis)")
+        movimentacoes = extrato if ultimas is None else extrato.ultimas(ultimas)
+        for linha in linhas_extrato(movimentacoes):
+            print(linha)
+        print()
+    print(f"\nSaldo: R$ {formatar(conta['saldo'])}")
     print("========================================")
 
 
+# ----------------------------- Reprodução em lote ----------------------------- #
+
+# Um log de operações (CSV com cabeçalho ou JSONL) é lido como fluxo, uma linha por vez, e aplicado às
+# mesmas funções do menu. Campos: operacao (nu, nc, d, s ou e, os códigos do menu), cpf, nome,
+# data_nascimento, endereco, conta e valor; cada operação usa só os campos de que precisa
+
+CAMPOS = ("operacao", "cpf", "nome", "data_nascimento", "endereco", "conta", "valor")
+
+
+def ler_operacoes(arquivo: TextIO, formato: str) -> Iterator[Dict]:
+    if formato == "jsonl":
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                # Linha malformada: registrada como operação inválida sem interromper a leitura
+                yield {}
+        return
+
+    leitor = csv.reader(arquivo)
+    cabecalho = next(leitor, [])
+    for linha in leitor:
+        yield dict(zip(cabecalho, linha))
+
+
+def _conta_do_registro(registro: Dict, contas: Dict[int, Dict]) -> Optional[Dict]:
+    # A conta precisa existir e, se o CPF vier no registro, pertencer a esse cliente
+    conta = contas.get(int(registro.get("conta") or 0))
+    cpf = registro.get("cpf")
+    if conta and cpf and conta["cliente_cpf"] != cpf:
+        return None
+    return conta
+
+
+def aplicar_operacao(
+    registro: Dict,
+    agencia: str,
+    clientes: Dict[str, Dict],
+    contas: Dict[int, Dict],
+    diretorio_extratos: Optional[str] = None,
+) -> Tuple[bool, str]:
+    operacao = registro.get("operacao")
+
+    if operacao == "d" or operacao == "s":
+        conta = _conta_do_registro(registro, contas)
+        if not conta:
+            return False, "Conta não encontrada para o cliente informado."
+        valor = centavos(registro.get("valor", ""))
+        return depositar(conta, valor) if operacao == "d" else sacar(conta, valor)
+
+    if operacao == "nu":
+        return cadastrar_cliente(
+            registro.get("cpf", ""),
+            registro.get("nome", ""),
+            registro.get("data_nascimento", ""),
+            registro.get("endereco", ""),
+            clientes,
+        )
+
+    if operacao == "nc":
+        numero = len(contas) + 1
+        if not abrir_conta(agencia, numero, registro.get("cpf", ""), clientes, contas, diretorio_extratos):
+            return False, "Cliente não encontrado."
+        return True, f"Conta {numero} criada com sucesso."
+
+    if operacao == "e":
+        conta = _conta_do_registro(registro, contas)
+        if not conta:
+            return False, "Conta não encontrada para o cliente informado."
+        movimentacoes = len(conta["extrato"])
+        return True, f"Saldo: R$ {formatar(conta['saldo'])} ({movimentacoes} movimentações)"
+
+    return False, "Operação inválida."
+
+
+def reproduzir(
+    operacoes: Iterable[Dict],
+    resultados: TextIO,
+    agencia: str = "0001",
+    clientes: Optional[Dict[str, Dict]] = None,
+    contas: Optional[Dict[int, Dict]] = None,
+    diretorio_extratos: Optional[str] = None,
+) -> Dict:
+    # Grava uma linha de resultado por operação (linha, operacao, resultado, mensagem); uma linha
+    # malformada vira uma falha no arquivo de resultados e não interrompe a reprodução. Com
+    # diretorio_extratos, as movimentações que passam de LIMITE_EXTRATO por conta vão para o disco
+    clientes = {} if clientes is None else clientes
+    contas = {} if contas is None else contas
+    escrever = csv.writer(resultados).writerow
+    escrever(("linha", "operacao", "resultado", "mensagem"))
+
+    total = falhas = 0
+    inicio = time.perf_counter()
+    for total, registro in enumerate(operacoes, start=1):
+        try:
+            sucesso, mensagem = aplicar_operacao(registro, agencia, clientes, contas, diretorio_extratos)
+        except (ValueError, TypeError, AttributeError) as erro:
+            sucesso, mensagem = False, f"Registro inválido: {erro}"
+        if not sucesso:
+            falhas += 1
+        operacao = registro.get("operacao") if isinstance(registro, dict) else ""
+        escrever((total, operacao, "ok" if sucesso else "falhou", mensagem))
+    segundos = time.perf_counter() - inicio
+
+    return {
+        "clientes": clientes,
+        "contas": contas,
+        "operacoes": total,
+        "falhas": falhas,
+        "segundos": segundos,
+        "operacoes_por_segundo": total / segundos if segundos else 0.0,
+    }
+
+
+def gravar_saldos(contas: Dict[int, Dict], arquivo: TextIO) -> None:
+    escrever = csv.writer(arquivo).writerow
+    escrever(("agencia", "conta", "cpf", "saldo"))
+    for conta in contas.values():
+        escrever((conta["agencia"], conta["numero"], conta["cliente_cpf"], formatar(conta["saldo"])))
+
+
+def reproduzir_arquivo(
+    caminho: str,
+    resultados: str,
+    saldos: str,
+    formato: Optional[str] = None,
+    diretorio_extratos: Optional[str] = None,
+) -> Dict:
+    formato = formato or ("jsonl" if caminho.endswith((".jsonl", ".ndjson")) else "csv")
+    if diretorio_extratos:
+        os.makedirs(diretorio_extratos, exist_ok=True)
+    with open(caminho, newline="", encoding="utf-8") as entrada, \
+            open(resultados, "w", newline="", encoding="utf-8") as saida:
+        estatisticas = reproduzir(ler_operacoes(entrada, formato), saida, diretorio_extratos=diretorio_extratos)
+    with open(saldos, "w", newline="", encoding="utf-8") as saida:
+        gravar_saldos(estatisticas["contas"], saida)
+    return estatisticas
+
+
 # ----------------------------- Fluxo principal ----------------------------- #
 
 def main() -> None:
-    clientes: List[Dict] = []
-    contas: List[Dict] = []
+    clientes: Dict[str, Dict] = {}
+    contas: Dict[int, Dict] = {}
     AGENCIA = "0001"
     proximo_numero_conta = 1
 
@@ -187,31 +499,31 @@ def main() -> None:
 
         elif opcao == "d":
             cpf = input("Informe o CPF do titular da conta: ").strip()
-            conta = selecionar_conta_por_cliente(cpf, contas)
+            conta = selecionar_conta_por_cliente(cpf, clientes)
             if not conta:
                 continue
             try:
-                valor = float(input("Informe o valor do depósito: ").strip())
+                valor = centavos(input("Informe o valor do depósito: ").strip())
             except ValueError:
                 print("\nOperação falhou! O valor informado é inválido.")
                 continue
-            depositar(conta, valor)
+            print(f"\n{depositar(conta, valor)[1]}")
 
         elif opcao == "s":
             cpf = input("Informe o CPF do titular da conta: ").strip()
-            conta = selecionar_conta_por_cliente(cpf, contas)
+            conta = selecionar_conta_por_cliente(cpf, clientes)
             if not conta:
                 continue
             try:
-                valor = float(input("Informe o valor do saque: ").strip())
+                valor = centavos(input("Informe o valor do saque: ").strip())
             except ValueError:
                 print("\nOperação falhou! O valor informado é inválido.")
                 continue
-            sacar(conta, valor)
+            print(f"\n{sacar(conta, valor)[1]}")
 
         elif opcao == "e":
             cpf = input("Informe o CPF do titular da conta: ").strip()
-            conta = selecionar_conta_por_cliente(cpf, contas)
+            conta = selecionar_conta_por_cliente(cpf, clientes)
             if not conta:
                 continue
             exibir_extrato(conta)
@@ -223,5 +535,32 @@ def main() -> None:
             print("\nOperação inválida, por favor selecione novamente a operação desejada.")
 
 
+def linha_de_comando(argumentos: List[str]) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="main.py", description="Reproduz um log de operações em lote.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    reproduzir_parser = sub.add_parser("reproduzir", help="aplica um log CSV ou JSONL de operações")
+    reproduzir_parser.add_argument("log", help="arquivo .csv (com cabeçalho) ou .jsonl")
+    reproduzir_parser.add_argument("--formato", choices=("csv", "jsonl"), help="padrão: pela extensão do arquivo")
+    reproduzir_parser.add_argument("--resultados", default="resultados.csv")
+    reproduzir_parser.add_argument("--saldos", default="saldos.csv")
+    reproduzir_parser.add_argument(
+        "--extratos", help="diretório para as movimentações mais antigas dos extratos (padrão: descartá-las)"
+    )
+    args = parser.parse_args(argumentos)
+
+    estatisticas = reproduzir_arquivo(args.log, args.resultados, args.saldos, args.formato, args.extratos)
+    print(
+        f"{estatisticas['operacoes']:,} operações ({estatisticas['falhas']:,} falhas) em "
+        f"{estatisticas['segundos']:.2f}s: {estatisticas['operacoes_por_segundo']:,.0f} operações/s"
+    )
+    print(f"Resultados em {args.resultados}, saldos finais de {len(estatisticas['contas']):,} contas em {args.saldos}")
+
+
 if __name__ == "__main__":
-    main()
+    # Sem argumentos, o menu interativo; "python main.py reproduzir log.csv" reproduz um log em lote
+    if len(sys.argv) > 1:
+        linha_de_comando(sys.argv[1:])
+    else:
+        main()
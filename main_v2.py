@@ -1,21 +1,30 @@
+import sys
 import textwrap
 from abc import ABC, abstractmethod
+from array import array
 from datetime import datetime
 
+import diario_v2
+from dinheiro import centavos, formatar
+
 
 class Cliente:
+    __slots__ = ("endereco", "contas")
+
     def __init__(self, endereco):
         self.endereco = endereco
         self.contas = []
 
     def realizar_transacao(self, conta, transacao):
-        transacao.registrar(conta)
+        return transacao.registrar(conta)
 
     def adicionar_conta(self, conta):
         self.contas.append(conta)
 
 
 class PessoaFisica(Cliente):
+    __slots__ = ("nome", "data_nascimento", "cpf")
+
     def __init__(self, nome, data_nascimento, cpf, endereco):
         super().__init__(endereco)
         self.nome = nome
@@ -24,6 +33,9 @@ class PessoaFisica(Cliente):
 
 
 class Conta:
+    # Saldo e valores das transações em centavos (inteiros)
+    __slots__ = ("_saldo", "_numero", "_agencia", "_cliente", "_historico")
+
     def __init__(self, numero, cliente):
         self._saldo = 0
         self._numero = numero
@@ -84,15 +96,15 @@ class Conta:
 
 
 class ContaCorrente(Conta):
-    def __init__(self, numero, cliente, limite=500, limite_saques=3):
+    __slots__ = ("_limite", "_limite_saques")
+
+    def __init__(self, numero, cliente, limite=500_00, limite_saques=3):
         super().__init__(numero, cliente)
         self._limite = limite
         self._limite_saques = limite_saques
 
     def sacar(self, valor):
-        numero_saques = len(
-            [transacao for transacao in self.historico.transacoes if transacao["tipo"] == Saque.__name__]
-        )
+        numero_saques = self.historico.quantidade_no_dia(Saque.__name__)
 
         excedeu_limite = valor > self._limite
         excedeu_saques = numero_saques >= self._limite_saques
@@ -117,24 +129,78 @@ class ContaCorrente(Conta):
 
 
 class Historico:
-    def __init__(self):
-        self._transacoes = []
+    # Histórico em colunas (código do tipo, valor em centavos e data em segundos desde a época),
+    # cada uma em um array compacto; as transações só são formatadas quando lidas
+    __slots__ = ("_tipos", "_valores", "_datas", "_relogio", "_quantidades", "_totais", "_dia", "_quantidades_dia")
+
+    # Tipos de transação indexados pelo código gravado na coluna de tipos (e nos snapshots): códigos
+    # fixos, os mesmos para todas as contas
+    TIPOS = ("Deposito", "Saque")
+    CODIGOS = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+    def __init__(self, relogio=datetime.now):
+        self._tipos = array("B")
+        self._valores = array("q")
+        self._datas = array("d")
+        self._relogio = relogio
+        # Contadores acumulados por tipo de transação, e os do dia corrente
+        self._quantidades = {}
+        self._totais = {}
+        self._dia = None
+        self._quantidades_dia = {}
+
+    def __len__(self):
+        return len(self._tipos)
+
+    def __iter__(self):
+        # Tuplas (tipo, valor, data em segundos desde a época), sem formatar a data
+        tipos = self.TIPOS
+        for codigo, valor, data in zip(self._tipos, self._valores, self._datas):
+            yield tipos[codigo], valor, data
 
     @property
     def transacoes(self):
-        return self._transacoes
-
-    def adicionar_transacao(self, transacao):
-        self._transacoes.append(
-            {
-                "tipo": transacao.__class__.__name__,
-                "valor": transacao.valor,
-                "data": datetime.now().strftime("%d-%m-%Y %H:%M:%s"),
-            }
-        )
+        return [
+            {"tipo": tipo, "valor": valor, "data": datetime.fromtimestamp(data).strftime("%d-%m-%Y %H:%M:%S")}
+            for tipo, valor, data in self
+        ]
+
+    def adicionar_transacao(self, transacao, agora=None):
+        tipo = transacao.__class__.__name__
+        codigo = self.CODIGOS.get(tipo)
+        if codigo is None:
+            raise ValueError(f"Tipo de transação desconhecido: {tipo}")
+        valor = transacao.valor
+        agora = agora or self._relogio()
+        self._tipos.append(codigo)
+        self._valores.append(valor)
+        self._datas.append(agora.timestamp())
+
+        self._quantidades[tipo] = self._quantidades.get(tipo, 0) + 1
+        self._totais[tipo] = self._totais.get(tipo, 0) + valor
+        if agora.date() != self._dia:
+            self._dia = agora.date()
+            self._quantidades_dia = {}
+        self._quantidades_dia[tipo] = self._quantidades_dia.get(tipo, 0) + 1
+
+    def ultima_transacao(self):
+        return self.TIPOS[self._tipos[-1]], self._valores[-1], self._datas[-1]
+
+    def quantidade(self, tipo):
+        return self._quantidades.get(tipo, 0)
+
+    def total(self, tipo):
+        return self._totais.get(tipo, 0)
+
+    def quantidade_no_dia(self, tipo):
+        if self._relogio().date() != self._dia:
+            return 0
+        return self._quantidades_dia.get(tipo, 0)
 
 
 class Transacao(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def valor(self):
@@ -147,6 +213,8 @@ class Transacao(ABC):
 
 
 class Saque(Transacao):
+    __slots__ = ("_valor",)
+
     def __init__(self, valor):
         self._valor = valor
 
@@ -159,9 +227,12 @@ class Saque(Transacao):
 
         if sucesso_transacao:
             conta.historico.adicionar_transacao(self)
+        return sucesso_transacao
 
 
 class Deposito(Transacao):
+    __slots__ = ("_valor",)
+
     def __init__(self, valor):
         self._valor = valor
 
@@ -174,33 +245,56 @@ class Deposito(Transacao):
 
         if sucesso_transacao:
             conta.historico.adicionar_transacao(self)
+        return sucesso_transacao
 
 
 class Banco:
-    def __init__(self):
-        self.clientes = []
-        self.contas = []
+    def __init__(self, diario=None):
+        # Índices: CPF -> cliente e número -> conta
+        self.clientes = {}
+        self.contas = {}
+        self._proximo_numero_conta = 1
+        self._diario = diario
+
+    @classmethod
+    def abrir(cls, diretorio, **opcoes):
+        # Recupera o Banco persistido em `diretorio` (snapshot + cauda do diário) e passa a
+        # registrar nele cada operação
+        banco = cls()
+        diario = diario_v2.Diario(diretorio, **opcoes)
+        diario.recuperar(banco._restaurar, banco._reaplicar)
+        banco._diario = diario
+        return banco
+
+    def fechar(self):
+        if self._diario:
+            self._diario.fechar()
 
     def criar_cliente(self, nome, data_nascimento, cpf, endereco):
-        if self.filtrar_cliente(cpf):
+        if cpf in self.clientes:
             return False, "Já existe cliente com esse CPF!"
         cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
-        self.clientes.append(cliente)
+        self.clientes[cpf] = cliente
+        self._registrar(diario_v2.CLIENTE, nome, data_nascimento, cpf, endereco)
         return True, "Cliente criado com sucesso!"
 
     def criar_conta(self, cpf):
         cliente = self.filtrar_cliente(cpf)
         if not cliente:
             return False, "Cliente não encontrado, fluxo de criação de conta encerrado!"
-        numero_conta = len(self.contas) + 1
+        numero_conta = self._proximo_numero_conta
+        self._proximo_numero_conta += 1
         conta = ContaCorrente.nova_conta(cliente=cliente, numero=numero_conta)
-        self.contas.append(conta)
+        self.contas[numero_conta] = conta
         cliente.adicionar_conta(conta)
+        self._registrar(diario_v2.CONTA, numero_conta, cpf)
         return True, "Conta criada com sucesso!"
 
     def filtrar_cliente(self, cpf):
-        clientes_filtrados = [cliente for cliente in self.clientes if cliente.cpf == cpf]
-        return clientes_filtrados[0] if clientes_filtrados else None
+        return self.clientes.get(cpf)
+
+    def filtrar_conta(self, numero):
+        return self.contas.get(numero)
 
     def recuperar_conta_cliente(self, cliente, indice=0):
         if not cliente.contas:
@@ -219,7 +313,8 @@ class Banco:
         if not conta:
             return False, erro
         transacao = Deposito(valor)
-        cliente.realizar_transacao(conta, transacao)
+        if cliente.realizar_transacao(conta, transacao):
+            self._registrar_transacao(diario_v2.DEPOSITO, conta)
         return True, "Depósito realizado!"
 
     def sacar(self, cpf, valor, conta_indice=0):
@@ -230,7 +325,8 @@ class Banco:
         if not conta:
             return False, erro
         transacao = Saque(valor)
-        cliente.realizar_transacao(conta, transacao)
+        if cliente.realizar_transacao(conta, transacao):
+            self._registrar_transacao(diario_v2.SAQUE, conta)
         return True, "Saque realizado!"
 
     def exibir_extrato(self, cpf, conta_indice=0):
@@ -240,18 +336,53 @@ class Banco:
         conta, erro = self.recuperar_conta_cliente(cliente, conta_indice)
         if not conta:
             return False, erro
-        transacoes = conta.historico.transacoes
-        extrato = ""
-        if not transacoes:
+        if not conta.historico:
             extrato = "Não foram realizadas movimentações."
         else:
-            for transacao in transacoes:
-                extrato += f"\n{transacao['tipo']}:\n\tR$ {transacao['valor']:.2f}"
-        saldo = f"\nSaldo:\n\tR$ {conta.saldo:.2f}"
+            extrato = "".join(f"\n{tipo}:\n\tR$ {formatar(valor)}" for tipo, valor, _ in conta.historico)
+        saldo = f"\nSaldo:\n\tR$ {formatar(conta.saldo)}"
         return True, f"{extrato}{saldo}"
 
     def listar_contas(self):
-        return [str(conta) for conta in self.contas]
+        return [str(conta) for conta in self.contas.values()]
+
+    def _registrar(self, operacao, *campos):
+        if not self._diario:
+            return
+        self._diario.registrar(operacao, *campos)
+        if self._diario.precisa_compactar:
+            self._diario.compactar((self.clientes, self.contas, self._proximo_numero_conta))
+
+    def _registrar_transacao(self, operacao, conta):
+        if self._diario:
+            _, valor, data = conta.historico.ultima_transacao()
+            self._registrar(operacao, conta.numero, valor, data)
+
+    def _restaurar(self, estado):
+        self.clientes, self.contas, self._proximo_numero_conta = estado
+
+    def _reaplicar(self, operacao, *campos):
+        # Operações do diário já foram validadas quando gravadas: são aplicadas sem novas regras
+        if operacao == diario_v2.CLIENTE:
+            nome, data_nascimento, cpf, endereco = campos
+            self.clientes[cpf] = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
+        elif operacao == diario_v2.CONTA:
+            numero, cpf = campos
+            cliente = self.clientes[cpf]
+            conta = ContaCorrente.nova_conta(cliente=cliente, numero=numero)
+            self.contas[numero] = conta
+            cliente.adicionar_conta(conta)
+            self._proximo_numero_conta = max(self._proximo_numero_conta, numero + 1)
+        else:
+            numero, valor, data = campos
+            conta = self.contas[numero]
+            if operacao == diario_v2.DEPOSITO:
+                transacao = Deposito(valor)
+                conta._saldo += valor
+            else:
+                transacao = Saque(valor)
+                conta._saldo -= valor
+            conta.historico.adicionar_transacao(transacao, datetime.fromtimestamp(data))
 
 
 def menu():
@@ -268,8 +399,9 @@ def menu():
     return input(textwrap.dedent(menu))
 
 
-def main():
-    banco = Banco()
+def main(diretorio=None):
+    # Com um diretório, o Banco é persistido nele e recuperado na próxima execução
+    banco = Banco.abrir(diretorio) if diretorio else Banco()
 
     while True:
         opcao = menu()
@@ -286,7 +418,7 @@ def main():
                 conta_indice = int(input("Escolha o número da conta: "))
             else:
                 conta_indice = 0
-            valor = float(input("Informe o valor do depósito: "))
+            valor = centavos(input("Informe o valor do depósito: "))
             sucesso, msg = banco.depositar(cpf, valor, conta_indice)
             print(f"\n{'===' if sucesso else '@@@'} {msg} {'===' if sucesso else '@@@'}")
 
@@ -302,7 +434,7 @@ def main():
                 conta_indice = int(input("Escolha o número da conta: "))
             else:
                 conta_indice = 0
-            valor = float(input("Informe o valor do saque: "))
+            valor = centavos(input("Informe o valor do saque: "))
             sucesso, msg = banco.sacar(cpf, valor, conta_indice)
             print(f"\n{'===' if sucesso else '@@@'} {msg} {'===' if sucesso else '@@@'}")
 
@@ -343,11 +475,13 @@ def main():
                 print(textwrap.dedent(conta))
 
         elif opcao == "q":
+            banco.fechar()
             break
 
         else:
             print("\n@@@ Operação inválida, por favor selecione novamente a operação desejada. @@@")
 
 
-main()
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
 
@@ -0,0 +1,156 @@
+import contextlib
+import multiprocessing
+import os
+import zlib
+
+import diario_v2
+from main_v2 import Banco
+
+# Mensagens de controle enviadas aos processos, além dos lotes de operações
+RESUMO = "resumo"
+EXTRATOS = "extratos"
+
+TIPOS = ("Deposito", "Saque")
+
+
+def shard_do_cpf(cpf, shards):
+    # CRC32 em vez de hash(): o hash de str muda a cada processo (PYTHONHASHSEED)
+    return zlib.crc32(cpf.encode()) % shards
+
+
+def _executar_shard(conexao):
+    # Processo dono de um shard: aplica os lotes recebidos ao seu Banco, na ordem em que chegam,
+    # e só responde às mensagens de controle. As falhas de saque impressas pelas contas são descartadas
+    banco = Banco()
+    depositar, sacar = banco.depositar, banco.sacar
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        while True:
+            mensagem = conexao.recv()
+            if mensagem is None:
+                break
+            if type(mensagem) is list:
+                for operacao in mensagem:
+                    codigo = operacao[0]
+                    if codigo == diario_v2.DEPOSITO:
+                        depositar(operacao[1], operacao[2])
+                    elif codigo == diario_v2.SAQUE:
+                        sacar(operacao[1], operacao[2])
+                    elif codigo == diario_v2.CLIENTE:
+                        banco.criar_cliente(*operacao[1:])
+                    elif codigo == diario_v2.CONTA:
+                        banco.criar_conta(operacao[1])
+            elif mensagem[0] == RESUMO:
+                conexao.send(_resumir(banco))
+            elif mensagem[0] == EXTRATOS:
+                conexao.send({cpf: banco.exibir_extrato(cpf)[1] for cpf in mensagem[1]})
+    conexao.close()
+
+
+def _resumir(banco):
+    resumo = {"clientes": len(banco.clientes), "contas": len(banco.contas), "saldo": 0}
+    for tipo in TIPOS:
+        resumo[f"quantidade_{tipo}"] = 0
+        resumo[f"total_{tipo}"] = 0
+    for conta in banco.contas.values():
+        resumo["saldo"] += conta.saldo
+        for tipo in TIPOS:
+            resumo[f"quantidade_{tipo}"] += conta.historico.quantidade(tipo)
+            resumo[f"total_{tipo}"] += conta.historico.total(tipo)
+    return resumo
+
+
+class BancoDistribuido:
+    # Banco particionado pelo CPF em `processos` shards, cada um com um Banco próprio em outro processo.
+    #
+    # As operações de um cliente vão sempre para o mesmo shard e são acumuladas em lotes de `lote`
+    # operações por shard; um lote cheio é enviado por um Pipe, que bloqueia quando o processo está
+    # atrasado (contenção natural). A ordem entre operações do mesmo cliente é mantida; entre shards
+    # não há ordem. Os números das contas são sequenciais dentro de cada shard, por isso clientes são
+    # identificados pelo CPF. resumo() e extratos() esvaziam os lotes e juntam as respostas dos shards.
+
+    def __init__(self, processos=None, lote=10_000):
+        self.processos = processos or os.cpu_count() or 1
+        self.lote = lote
+        self._lotes = [[] for _ in range(self.processos)]
+        self._conexoes = []
+        self._workers = []
+        for _ in range(self.processos):
+            conexao, conexao_shard = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_executar_shard, args=(conexao_shard,), daemon=True)
+            worker.start()
+            conexao_shard.close()
+            self._conexoes.append(conexao)
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    def criar_cliente(self, nome, data_nascimento, cpf, endereco):
+        self.enviar((diario_v2.CLIENTE, nome, data_nascimento, cpf, endereco))
+
+    def criar_conta(self, cpf):
+        self.enviar((diario_v2.CONTA, cpf))
+
+    def depositar(self, cpf, valor):
+        self.enviar((diario_v2.DEPOSITO, cpf, valor))
+
+    def sacar(self, cpf, valor):
+        self.enviar((diario_v2.SAQUE, cpf, valor))
+
+    def enviar(self, operacao):
+        # O CPF é o segundo campo das operações de conta e o quarto da criação de cliente
+        cpf = operacao[3] if operacao[0] == diario_v2.CLIENTE else operacao[1]
+        shard = shard_do_cpf(cpf, self.processos)
+        lote = self._lotes[shard]
+        lote.append(operacao)
+        if len(lote) >= self.lote:
+            self._conexoes[shard].send(lote)
+            self._lotes[shard] = []
+
+    def executar(self, operacoes):
+        enviar = self.enviar
+        for operacao in operacoes:
+            enviar(operacao)
+
+    def esvaziar(self):
+        for shard, lote in enumerate(self._lotes):
+            if lote:
+                self._conexoes[shard].send(lote)
+                self._lotes[shard] = []
+
+    def resumo(self):
+        # Totais de todos os shards somados, e os de cada shard em "shards"
+        self.esvaziar()
+        for conexao in self._conexoes:
+            conexao.send((RESUMO,))
+        resumos = [conexao.recv() for conexao in self._conexoes]
+        total = {chave: sum(resumo[chave] for resumo in resumos) for chave in resumos[0]}
+        total["shards"] = resumos
+        return total
+
+    def extratos(self, cpfs):
+        # Extrato (texto de Banco.exibir_extrato) de cada CPF, pedido ao shard dono de cada um
+        self.esvaziar()
+        por_shard = [[] for _ in range(self.processos)]
+        for cpf in cpfs:
+            por_shard[shard_do_cpf(cpf, self.processos)].append(cpf)
+        for conexao, cpfs_shard in zip(self._conexoes, por_shard):
+            conexao.send((EXTRATOS, cpfs_shard))
+        extratos = {}
+        for conexao in self._conexoes:
+            extratos.update(conexao.recv())
+        return extratos
+
+    def fechar(self):
+        if not self._workers:
+            return
+        self.esvaziar()
+        for conexao in self._conexoes:
+            conexao.send(None)
+            conexao.close()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
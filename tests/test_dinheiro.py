@@ -0,0 +1,63 @@
+import os
+import random
+from decimal import Decimal
+
+import pytest
+
+import main
+from dinheiro import centavos, formatar
+from main_v2 import Banco
+
+# DINHEIRO_OPERACOES=10000000 roda a verificação completa
+OPERACOES = int(os.environ.get("DINHEIRO_OPERACOES", 50_000))
+
+
+@pytest.mark.parametrize(
+    "valor, esperado",
+    [("10", 1000), ("10,5", 1050), (" 0.07 ", 7), ("-3.50", -350), (12, 1200), (0.1, 10), (Decimal("2.10"), 210)],
+)
+def test_centavos(valor, esperado):
+    assert centavos(valor) == esperado
+
+
+@pytest.mark.parametrize("valor", ["1.005", "abc", "", 1.005, float("inf"), Decimal("0.001"), True, None])
+def test_centavos_recusa_fracoes_de_centavo_e_textos_invalidos(valor):
+    with pytest.raises(ValueError):
+        centavos(valor)
+
+
+def test_formatar():
+    assert [formatar(valor) for valor in (0, 7, 1050, -350, 123456789)] == [
+        "0.00",
+        "0.07",
+        "10.50",
+        "-3.50",
+        "1234567.89",
+    ]
+
+
+def test_saldo_nao_acumula_erro(capsys):
+    rng = random.Random(2024)
+    banco = Banco()
+    banco.criar_cliente("Ana", "01-01-1990", "1", "Rua A")
+    banco.criar_conta("1")
+    conta = banco.filtrar_conta(1)
+    conta._limite_saques = OPERACOES
+    conta_v1 = {"saldo": 0, "extrato": main.Extrato(), "limite": 500_00, "numero_saques": 0, "limite_saques": OPERACOES}
+    esperado = Decimal(0)
+
+    for _ in range(OPERACOES):
+        texto = f"{rng.randrange(0, 500)}.{rng.randrange(1, 100):02d}"
+        valor = centavos(texto)
+        if rng.random() < 0.6 or valor > conta.saldo:
+            banco.depositar("1", valor)
+            main.depositar(conta_v1, valor)
+            esperado += Decimal(texto)
+        else:
+            banco.sacar("1", valor)
+            main.sacar(conta_v1, valor)
+            esperado -= Decimal(texto)
+        capsys.readouterr()
+
+    assert formatar(conta.saldo) == formatar(conta_v1["saldo"]) == f"{esperado:.2f}"
+    assert conta.historico.total("Deposito") - conta.historico.total("Saque") == conta.saldo
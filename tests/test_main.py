@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import main
+
+LOG = """operacao,cpf,nome,data_nascimento,endereco,conta,valor
+nu,1,Ana,01-01-1990,Rua A,,
+nu,1,Ana,01-01-1990,Rua A,,
+nc,1,,,,,
+nc,2,,,,,
+d,1,,,,1,100.50
+s,1,,,,1,20
+s,2,,,,1,10
+d,1,,,,1,abc
+e,1,,,,1,
+x,1,,,,,
+"""
+
+
+def ler_csv(texto):
+    return list(csv.reader(io.StringIO(texto)))
+
+
+def test_lojas_indexadas_por_cpf_e_numero():
+    clientes, contas = {}, {}
+    assert main.cadastrar_cliente("1", "Ana", "01-01-1990", "Rua A", clientes)[0] is True
+    assert main.cadastrar_cliente("1", "Ana", "01-01-1990", "Rua A", clientes)[0] is False
+    main.abrir_conta("0001", 1, "1", clientes, contas)
+    main.abrir_conta("0001", 2, "1", clientes, contas)
+
+    assert main.abrir_conta("0001", 3, "2", clientes, contas) is None
+    assert main.filtrar_cliente("1", clientes)["nome"] == "Ana"
+    assert [conta["numero"] for conta in main.contas_do_cliente("1", clientes)] == [1, 2]
+    assert main.contas_do_cliente("2", clientes) == []
+    assert contas[2]["cliente_cpf"] == "1"
+
+
+def test_reproduzir_csv_grava_resultados_e_saldos():
+    resultados, saldos = io.StringIO(), io.StringIO()
+    estatisticas = main.reproduzir(main.ler_operacoes(io.StringIO(LOG), "csv"), resultados)
+    main.gravar_saldos(estatisticas["contas"], saldos)
+
+    linhas = ler_csv(resultados.getvalue())
+    assert linhas[0] == ["linha", "operacao", "resultado", "mensagem"]
+    assert [linha[2] for linha in linhas[1:]] == [
+        "ok", "falhou", "ok", "falhou", "ok", "ok", "falhou", "falhou", "ok", "falhou"
+    ]
+    assert linhas[3][3] == "Conta 1 criada com sucesso."
+    assert linhas[8][3].startswith("Registro inválido")
+    assert linhas[9][3] == "Saldo: R$ 80.50 (2 movimentações)"
+    assert estatisticas["operacoes"] == 10
+    assert estatisticas["falhas"] == 5
+    assert ler_csv(saldos.getvalue()) == [["agencia", "conta", "cpf", "saldo"], ["0001", "1", "1", "80.50"]]
+
+
+def test_reproduzir_jsonl_aceita_linhas_malformadas():
+    log = "\n".join(
+        [
+            json.dumps({"operacao": "nu", "cpf": "1", "nome": "Ana"}),
+            json.dumps({"operacao": "nc", "cpf": "1"}),
+            "{não é json",
+            "",
+            json.dumps({"operacao": "d", "cpf": "1", "conta": 1, "valor": "10.05"}),
+        ]
+    )
+    resultados = io.StringIO()
+    estatisticas = main.reproduzir(main.ler_operacoes(io.StringIO(log), "jsonl"), resultados)
+
+    assert [linha[2] for linha in ler_csv(resultados.getvalue())[1:]] == ["ok", "ok", "falhou", "ok"]
+    assert estatisticas["contas"][1]["saldo"] == 10_05
+
+
+def test_linha_de_comando_reproduz_arquivo(tmp_path, capsys):
+    log = tmp_path / "log.csv"
+    log.write_text(LOG, encoding="utf-8")
+    resultados, saldos = tmp_path / "resultados.csv", tmp_path / "saldos.csv"
+
+    main.linha_de_comando(["reproduzir", str(log), "--resultados", str(resultados), "--saldos", str(saldos)])
+
+    assert "10 operações (5 falhas)" in capsys.readouterr().out
+    assert len(ler_csv(resultados.read_text(encoding="utf-8"))) == 11
+    assert ler_csv(saldos.read_text(encoding="utf-8"))[1] == ["0001", "1", "1", "80.50"]
+
+
+def test_extrato_ultimas_e_periodo_com_movimentacoes_em_disco(tmp_path):
+    extrato = main.Extrato(limite=4, arquivo=str(tmp_path / "extrato.bin"))
+    inicio = datetime(2024, 1, 1).timestamp()
+    for dia in range(10):
+        extrato.registrar(main.DEPOSITO if dia % 2 == 0 else main.SAQUE, (dia + 1) * 100, inicio + dia * 86400)
+
+    assert len(extrato) == 10
+    assert extrato.descartadas == 0
+    assert [valor for _, valor, _ in extrato] == [valor * 100 for valor in range(1, 11)]
+    assert [valor for _, valor, _ in extrato.ultimas(3)] == [800, 900, 1000]
+    assert [valor for _, valor, _ in extrato.ultimas(7)] == [valor * 100 for valor in range(4, 11)]
+    assert [valor for _, valor, _ in extrato.periodo(datetime(2024, 1, 2), datetime(2024, 1, 5))] == [200, 300, 400]
+    assert [valor for _, valor, _ in extrato.periodo(datetime(2024, 1, 8), datetime(2025, 1, 1))] == [800, 900, 1000]
+    assert list(main.linhas_extrato(extrato.ultimas(2))) == ["Depósito: R$ 9.00", "Saque: R$ 10.00"]
+
+
+def test_extrato_sem_arquivo_descarta_as_mais_antigas():
+    extrato = main.Extrato(limite=4)
+    for valor in range(1, 11):
+        extrato.registrar(main.DEPOSITO, valor, 1000.0 - valor)
+
+    assert len(extrato) == 10
+    assert extrato.descartadas == 6
+    assert [valor for _, valor, _ in extrato] == [7, 8, 9, 10]
+    # Datas fora de ordem são mantidas não decrescentes
+    assert {data for _, _, data in extrato} == {999.0}
+
+
+def test_exibir_extrato_imprime_as_movimentacoes(capsys):
+    clientes, contas = {}, {}
+    main.cadastrar_cliente("1", "Ana", "01-01-1990", "Rua A", clientes)
+    conta = main.abrir_conta("0001", 1, "1", clientes, contas)
+    main.exibir_extrato(conta)
+    assert "Não foram realizadas movimentações." in capsys.readouterr().out
+
+    main.depositar(conta, 100_00)
+    main.sacar(conta, 30_50)
+    main.exibir_extrato(conta)
+    saida = capsys.readouterr().out
+    assert "Depósito: R$ 100.00\nSaque: R$ 30.50\n" in saida
+    assert "Saldo: R$ 69.50" in saida
+
+    main.exibir_extrato(conta, ultimas=1)
+    assert "Depósito" not in capsys.readouterr().out
+
+
+def test_contas_do_menu_guardam_o_extrato_completo(monkeypatch):
+    clientes, contas = {}, {}
+    main.cadastrar_cliente("1", "Ana", "01-01-1990", "Rua A", clientes)
+    monkeypatch.setattr("builtins.input", lambda _: "1")
+    conta = main.criar_conta("0001", 1, clientes, contas)
+    for valor in range(1, main.LIMITE_EXTRATO * 2 + 1):
+        conta["extrato"].registrar(main.DEPOSITO, valor)
+
+    assert conta["extrato"].descartadas == 0
+    assert [valor for _, valor, _ in conta["extrato"]] == list(range(1, main.LIMITE_EXTRATO * 2 + 1))
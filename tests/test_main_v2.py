@@ -0,0 +1,176 @@
+import shutil
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from main_v2 import Banco, ContaCorrente, Deposito, Historico, PessoaFisica, Saque
+
+
+class Relogio:
+    def __init__(self, agora):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+def criar_conta(relogio):
+    cliente = PessoaFisica(nome="Ana", data_nascimento="01-01-1990", cpf="1", endereco="Rua A")
+    conta = ContaCorrente.nova_conta(cliente=cliente, numero=1)
+    conta.historico._relogio = relogio
+    return conta
+
+
+def test_historico_mantem_contadores_e_totais_por_tipo():
+    conta = criar_conta(Relogio(datetime(2024, 1, 1, 10)))
+    Deposito(1000_00).registrar(conta)
+    Saque(100_00).registrar(conta)
+    Saque(50_00).registrar(conta)
+
+    assert conta.historico.quantidade("Deposito") == 1
+    assert conta.historico.quantidade("Saque") == 2
+    assert conta.historico.total("Saque") == 150_00
+    assert conta.saldo == 850_00
+
+
+def test_historico_rejeita_tipo_de_transacao_desconhecido():
+    class Estorno(Deposito):
+        pass
+
+    conta = criar_conta(Relogio(datetime(2024, 1, 1, 10)))
+    with pytest.raises(ValueError):
+        conta.historico.adicionar_transacao(Estorno(10_00))
+    assert len(conta.historico) == 0
+    assert Historico.TIPOS == ("Deposito", "Saque")
+
+def test_limite_de_saques_e_por_dia():
+    relogio = Relogio(datetime(2024, 1, 1, 10))
+    conta = criar_conta(relogio)
+    Deposito(1000_00).registrar(conta)
+
+    for _ in range(4):
+        Saque(10_00).registrar(conta)
+    assert conta.historico.quantidade_no_dia("Saque") == 3
+    assert conta.saldo == 970_00
+
+    relogio.agora += timedelta(days=1)
+    assert conta.historico.quantidade_no_dia("Saque") == 0
+    Saque(10_00).registrar(conta)
+    assert conta.saldo == 960_00
+    assert conta.historico.quantidade("Saque") == 4
+
+
+def test_banco_busca_clientes_e_contas_por_indice():
+    banco = Banco()
+    assert banco.criar_cliente("Ana", "01-01-1990", "1", "Rua A") == (True, "Cliente criado com sucesso!")
+    assert banco.criar_cliente("Ana", "01-01-1990", "1", "Rua A")[0] is False
+    banco.criar_conta("1")
+    banco.criar_conta("1")
+
+    assert banco.filtrar_cliente("1").nome == "Ana"
+    assert banco.filtrar_cliente("2") is None
+    assert [conta.numero for conta in banco.filtrar_cliente("1").contas] == [1, 2]
+    assert banco.filtrar_conta(2).cliente.cpf == "1"
+
+
+def test_historico_formata_transacoes_somente_na_leitura():
+    relogio = Relogio(datetime(2024, 1, 1, 10, 30, 15))
+    conta = criar_conta(relogio)
+    Deposito(10_10).registrar(conta)
+    Saque(30).registrar(conta)
+
+    assert len(conta.historico) == 2
+    assert conta.historico.transacoes == [
+        {"tipo": "Deposito", "valor": 10_10, "data": "01-01-2024 10:30:15"},
+        {"tipo": "Saque", "valor": 30, "data": "01-01-2024 10:30:15"},
+    ]
+    assert conta.historico.total("Deposito") == 10_10
+
+
+def test_exibir_extrato():
+    banco = Banco()
+    banco.criar_cliente("Ana", "01-01-1990", "1", "Rua A")
+    banco.criar_conta("1")
+    assert banco.exibir_extrato("1") == (True, "Não foram realizadas movimentações.\nSaldo:\n\tR$ 0.00")
+
+    banco.depositar("1", 100_00)
+    banco.sacar("1", 40_00)
+    assert banco.exibir_extrato("1") == (
+        True,
+        "\nDeposito:\n\tR$ 100.00\nSaque:\n\tR$ 40.00\nSaldo:\n\tR$ 60.00",
+    )
+
+
+def carregar_banco(diretorio, **opcoes):
+    banco = Banco.abrir(str(diretorio), **opcoes)
+    banco.criar_cliente("Ana", "01-01-1990", "1", "Rua A")
+    banco.criar_cliente("Bia", "02-02-1990", "2", "Rua B")
+    banco.criar_conta("1")
+    banco.criar_conta("2")
+    banco.depositar("1", 100_50)
+    banco.sacar("1", 50)
+    banco.depositar("2", 30_00)
+    banco.sacar("2", 1000_00)  # recusado: não é registrado no diário
+    return banco
+
+
+def test_banco_recupera_operacoes_do_diario(tmp_path):
+    carregar_banco(tmp_path).fechar()
+
+    banco = Banco.abrir(str(tmp_path))
+    assert sorted(banco.clientes) == ["1", "2"]
+    assert banco.filtrar_conta(1).saldo == 100_00
+    assert banco.filtrar_conta(2).saldo == 30_00
+    assert banco.filtrar_conta(1).historico.quantidade_no_dia("Saque") == 1
+    assert banco.filtrar_conta(2).cliente is banco.filtrar_cliente("2")
+
+    banco.criar_conta("1")
+    assert banco.filtrar_cliente("1").contas[1].numero == 3
+
+
+def test_banco_recupera_snapshot_e_cauda_do_diario(tmp_path):
+    banco = carregar_banco(tmp_path, compactar_a_cada=5)
+    banco.depositar("2", 5_00)
+    banco.fechar()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["diario-00000002.log", "snapshot.pkl"]
+
+    banco = Banco.abrir(str(tmp_path))
+    assert banco.filtrar_conta(1).saldo == 100_00
+    assert banco.filtrar_conta(2).saldo == 35_00
+    assert len(banco.filtrar_conta(2).historico) == 2
+
+
+def test_banco_descarta_registro_incompleto_no_fim_do_diario(tmp_path):
+    carregar_banco(tmp_path).fechar()
+    diario = tmp_path / "diario-00000001.log"
+    tamanho = diario.stat().st_size
+    with open(diario, "r+b") as arquivo:
+        arquivo.truncate(tamanho - 3)
+
+    banco = Banco.abrir(str(tmp_path))
+    # O último depósito da conta 2 estava no registro truncado
+    assert banco.filtrar_conta(2).saldo == 0
+    banco.depositar("2", 7_00)
+    banco.fechar()
+
+    banco = Banco.abrir(str(tmp_path))
+    assert banco.filtrar_conta(2).saldo == 7_00
+    assert banco.filtrar_conta(1).saldo == 100_00
+
+
+def test_diario_sincroniza_o_fim_da_rajada_sem_novas_operacoes(tmp_path):
+    banco = carregar_banco(tmp_path / "banco", lote=1000, intervalo=0.01)
+    diario = tmp_path / "banco" / "diario-00000001.log"
+    prazo = time.monotonic() + 5
+    while banco._diario._pendentes and time.monotonic() < prazo:
+        time.sleep(0.01)
+
+    # Cópia do diário com o banco ainda aberto, como ficaria no disco após uma queda
+    (tmp_path / "queda").mkdir()
+    shutil.copy(diario, tmp_path / "queda" / diario.name)
+    banco.fechar()
+    recuperado = Banco.abrir(str(tmp_path / "queda"))
+    assert recuperado.filtrar_conta(1).saldo == 100_00
+    assert recuperado.filtrar_conta(2).saldo == 30_00
+    recuperado.fechar()
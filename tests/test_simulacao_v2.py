@@ -0,0 +1,52 @@
+import random
+
+import diario_v2
+from main_v2 import Banco
+from simulacao_v2 import BancoDistribuido, shard_do_cpf
+
+
+def operacoes(clientes, quantidade, semente=7):
+    rng = random.Random(semente)
+    cpfs = [f"{i:011d}" for i in range(clientes)]
+    for cpf in cpfs:
+        yield diario_v2.CLIENTE, "Cliente", "01-01-1990", cpf, "Rua A"
+        yield diario_v2.CONTA, cpf
+    for _ in range(quantidade):
+        codigo = diario_v2.DEPOSITO if rng.random() < 0.6 else diario_v2.SAQUE
+        yield codigo, rng.choice(cpfs), rng.randrange(1, 300_00)
+
+
+def test_shard_do_cpf_e_estavel():
+    assert shard_do_cpf("12345678900", 4) == shard_do_cpf("12345678900", 4)
+    assert {shard_do_cpf(f"{i:011d}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_banco_distribuido_junta_totais_e_extratos_dos_shards(capsys):
+    banco = Banco()
+    for operacao in operacoes(50, 2000):
+        codigo, campos = operacao[0], operacao[1:]
+        if codigo == diario_v2.CLIENTE:
+            banco.criar_cliente(*campos)
+        elif codigo == diario_v2.CONTA:
+            banco.criar_conta(*campos)
+        elif codigo == diario_v2.DEPOSITO:
+            banco.depositar(*campos)
+        else:
+            banco.sacar(*campos)
+    capsys.readouterr()
+
+    with BancoDistribuido(processos=3, lote=64) as distribuido:
+        distribuido.executar(operacoes(50, 2000))
+        resumo = distribuido.resumo()
+        extratos = distribuido.extratos(["00000000000", "00000000049", "99999999999"])
+
+    assert resumo["clientes"] == 50
+    assert resumo["contas"] == 50
+    assert len(resumo["shards"]) == 3
+    assert resumo["saldo"] == sum(conta.saldo for conta in banco.contas.values())
+    for tipo in ("Deposito", "Saque"):
+        assert resumo[f"quantidade_{tipo}"] == sum(conta.historico.quantidade(tipo) for conta in banco.contas.values())
+        assert resumo[f"total_{tipo}"] == sum(conta.historico.total(tipo) for conta in banco.contas.values())
+    assert resumo["total_Deposito"] - resumo["total_Saque"] == resumo["saldo"]
+    assert extratos["00000000049"] == banco.exibir_extrato("00000000049")[1]
+    assert extratos["99999999999"] == "Cliente não encontrado!"